@@ -1,13 +1,28 @@
 import streamlit as st
 import pandas as pd
 import math
-import time
-import re
+import os
 import plotly.express as px
-from migros_scraper import google_sheets_baglan, calistir
+import time
+from datetime import datetime
+import migros_olcum as olcum
+from migros_depo import depo_olustur, depo_filigrani, DEPO_TURU
+from zamanlayici import durum_oku, calisiyor_mu, arka_planda_baslat, GUNLUK_DOSYASI
+from migros_arama import AramaIndeksi
+import migros_gorsel
+import migros_alarm
+from migros_birim import birim_fiyat_metni
+from migros_vitrin import VitrinSorgusu
+from migros_seri import seri_deposu, gunluk_seri
+from migros_onbellek import PaylasilanVeri
+from migros_anlik import anlik_oku
 
 # --- SAYFA AYARLARI ---
 st.set_page_config(page_title="Migros Fiyat Analiz", page_icon="🛒", layout="wide")
+# Paylaşılan çerçevelerin oturumlara sığ kopya verilebilmesi için yazma anında kopyalama (pandas 3'te varsayılan)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True
+_cizim_baslangici = time.perf_counter()
 
 # --- STATE YÖNETİMİ ---
 if 'theme' not in st.session_state: st.session_state.theme = 'light'
@@ -17,8 +32,8 @@ if 'pagination_idx' not in st.session_state: st.session_state.pagination_idx = 0
 
 # --- NAVİGASYON ---
 def toggle_theme(): st.session_state.theme = 'dark' if st.session_state.theme == 'light' else 'light'
-def go_to_detail(urun_adi):
-    st.session_state.selected_product = urun_adi
+def go_to_detail(urun_id):
+    st.session_state.selected_product = urun_id
     st.session_state.page = 'detail'
 def go_home():
     st.session_state.selected_product = None
@@ -108,6 +123,7 @@ st.markdown(f"""
     }}
     .p-price {{ font-size: 18px; font-weight: 800; color: #ff6000; }}
     .p-old {{ font-size: 12px; text-decoration: line-through; color: #999; margin-right: 5px; }}
+    .p-unit {{ font-size: 11px; color: #999; display: block; height: 14px; }}
     
     /* DEĞİŞİM ETİKETLERİ */
     .badge-down {{ background: #dcfce7; color: #166534; padding: 2px 6px; border-radius: 4px; font-size: 11px; font-weight: bold; display: block; text-align: center; margin-top: 5px; }}
@@ -122,68 +138,156 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # --- FONKSİYONLAR ---
-def temizle_ve_cevir(val):
+# Toplam dosyası olmayan (Sheets) depoda detay grafiği için geçmişten yalnızca bu kolonlar okunur; vitrin ürün özetinden gelir
+GEREKLI_KOLONLAR = ("Tarih", "Ürün ID", "Satış Fiyatı")
+# 0 = tüm geçmiş; aksi halde yalnızca son N günün bölümleri okunur
+GECMIS_GUN = int(os.environ.get("MIGROS_GECMIS_GUN", "0"))
+
+# Vitrin seçenekleri -> sorgu motoru anahtarları
+FILTRE_SECENEKLERI = {"Tümü": None, "📉 Fiyatı Düşenler": "dusen", "📈 Fiyatı Artanlar": "artan"}
+SIRALAMA_SECENEKLERI = {"Akıllı": "akilli", "Fiyat Artan": "fiyat_artan", "Fiyat Azalan": "fiyat_azalan",
+                        "En İyi Fiyat (₺/kg, ₺/L)": "en_iyi"}
+
+# Tarama dışında değişebilen Sheets deposu en geç bu kadar saniyede bir yeniden yüklenir
+YENILEME_SANIYESI = 600
+
+def veri_surumu_hesapla():
+    # Paylaşılan verilerin anahtarı: son başarılı taramanın zamanı. Depo ondan sonra tarama dışında değiştiyse
+    # (`--sheets-ice-aktar`, hiç tarama kaydı yok) yerel deponun değiştirilme zamanı eklenir; Sheets deposunda
+    # tarama kaydı YENILEME_SANIYESI'nden eskiyse zaman dilimi eklenir. Tarama sürerken yarım veri yüklenmesin
+    # diye sürüm değişmez.
+    son = durum_oku().get("son_basarili")
+    if calisiyor_mu(): return son
+    son_zaman = datetime.fromisoformat(son).timestamp() if son else 0
+    filigran = depo_filigrani()
+    if filigran is not None:
+        # son_basarili saniyeye yuvarlanır; taramanın kendi yazımları ondan en fazla bir saniye sonra olabilir
+        if son and filigran < son_zaman + 1: return son
+        return f"{son or ''}+{datetime.fromtimestamp(filigran).isoformat(timespec='seconds')}"
+    if DEPO_TURU != "sheets" or (son and time.time() - son_zaman < YENILEME_SANIYESI): return son
+    return f"{son or ''}+{int(time.time() // YENILEME_SANIYESI)}"
+
+# Paylaşılan veriler süreç başına bir kez tutulur ve `surum` (bkz. veri_surumu_hesapla) ile anahtarlanır.
+# Yeni tarama bitince eski veri sunulurken yenisi arka planda yüklenir; oturumlar kopya değil görünüm alır.
+# Önce taramanın yazdığı bellek eşlemeli anlık görüntü (aynı sürümse) denenir; yoksa depodan yüklenip kurulur.
+def _gecmis_yukle(surum):
+    baslangic = pd.Timestamp.now().normalize() - pd.Timedelta(days=GECMIS_GUN) if GECMIS_GUN else None
+    anlik = anlik_oku(surum)
+    if anlik is not None and anlik.gecmis is not None:
+        return anlik.gecmis if baslangic is None else anlik.gecmis[anlik.gecmis["Tarih"] >= baslangic]
+    depo = depo_olustur()
+    if depo is None: return pd.DataFrame()
+    return depo.oku(kolonlar=list(GEREKLI_KOLONLAR), baslangic=baslangic)
+
+def _vitrin_yukle(surum):
+    # Ürün başına son/önceki fiyat, en düşük, ortalama (tarama sırasında güncellenir); arama indeksi ve vitrin
+    # sıralamaları aynı yüklemede bir kez kurulur
+    anlik = anlik_oku(surum)
+    if anlik is not None and not anlik.ozet.empty: return anlik.ozet, anlik.vitrin
+    depo = depo_olustur()
+    ozet = depo.ozet() if depo is not None else pd.DataFrame()
+    if ozet.empty: return ozet, None
+    return ozet, VitrinSorgusu(ozet, AramaIndeksi(ozet["Ürün Adı"].tolist(), ozet.index.tolist()))
+
+@st.cache_resource
+def paylasilan_veriler():
+    return {"vitrin": PaylasilanVeri("vitrin", _vitrin_yukle), "gecmis": PaylasilanVeri("gecmis", _gecmis_yukle)}
+
+def veri_getir(surum=None):
+    # Toplam dosyası olmayan depoda ham geçmiş (yalnızca GEREKLI_KOLONLAR)
+    return paylasilan_veriler()["gecmis"].getir(surum)[1]
+
+def vitrin_getir(surum=None):
+    # (sunulan sürüm, ürün özeti, vitrin sorgu motoru); ilk yükleme başarısızsa boş özet
     try:
-        if pd.isna(val) or val == "": return 0.0
-        s = str(val).replace('TL', '').replace('₺', '').strip()
-        s = s.replace('.', '').replace(',', '.')
-        return float(s)
-    except: return 0.0
-
-def linki_duzelt(link):
-    if not isinstance(link, str): return "#"
-    link = link.strip()
-    if "-p-" in link:
-        match = re.search(r"(.*-p-[a-z0-9]+)(-\d+)$", link)
-        if match: return match.group(1) 
-    return link
-
-@st.cache_data(ttl=600)
-def veri_getir():
-    client = google_sheets_baglan()
-    if not client: return pd.DataFrame()
+        sunulan, (ozet, sorgu) = paylasilan_veriler()["vitrin"].getir(surum)
+        return sunulan, ozet, sorgu
+    except Exception:
+        return None, pd.DataFrame(), None
+
+@st.cache_data(ttl=YENILEME_SANIYESI, max_entries=512)
+def _seri_getir(urun_id, ilk, son, surum):
+    # Detay grafiği: ürünün günlük/haftalık toplamları (ofset indeksiyle doğrudan okunur, en fazla GRAFIK_NOKTASI satır)
+    olcum.iskalandi()
+    depo = depo_olustur()
+    if depo is None: return gunluk_seri(pd.DataFrame())
     try:
-        try: sheet = client.worksheet("Ana_Veritabani")
-        except: sheet = client.sheet1
-        data = sheet.get_all_values()
-        if not data: return pd.DataFrame()
-        headers = data.pop(0)
-        df = pd.DataFrame(data, columns=headers)
-        df.columns = df.columns.str.strip()
-        
-        for c in ["Etiket Fiyatı", "Satış Fiyatı", "İndirim %"]:
-            if c in df.columns: df[c] = df[c].apply(temizle_ve_cevir)
-        if "Tarih" in df.columns: df["Tarih"] = pd.to_datetime(df["Tarih"], errors='coerce')
-        if "Link" in df.columns: df["Link"] = df["Link"].apply(linki_duzelt)
-        return df
-    except: return pd.DataFrame()
+        seriler = seri_deposu(depo)
+        if seriler is not None: return seriler.urun_serisi(urun_id, ilk, son)
+        df_raw = veri_getir(surum)
+        return gunluk_seri(df_raw[df_raw["Ürün ID"] == urun_id] if not df_raw.empty else df_raw)
+    except: return gunluk_seri(pd.DataFrame())
+
+def seri_getir(urun_id, ilk, son, surum=None):
+    with olcum.onbellek_olc("seri_getir"):
+        return _seri_getir(urun_id, ilk, son, surum)
+
+@st.cache_resource
+def metrik_sunucusu():
+    # MIGROS_METRIK_PORTU verilmişse pano süreci /metrics uç noktasını bir kez açar; port başka bir pano sürecindeyse None
+    return olcum.metrik_sunucusu_baslat() if olcum.METRIK_PORTU else None
+
+@st.cache_resource
+def gorsel_sunucusu():
+    # MIGROS_GORSEL_PORTU verilmişse küçük görsel önbelleği pano süreciyle birlikte bir kez başlatılır; port başka bir
+    # pano sürecindeyse None (o süreç sunar). Çok süreçli kurulumda `migros_gorsel.py --sun` ayrı servis olarak çalışır.
+    return migros_gorsel.sunucu_baslat() if migros_gorsel.GORSEL_PORTU else None
+
+def cizim_bitti(sayfa):
+    # Her yeniden çizimin süresi; metrik dosyası en fazla 10 sn'de bir yazılır
+    olcum.gozlemle("migros_pano_cizim_saniye", time.perf_counter() - _cizim_baslangici, "Pano yeniden çizim süresi", sayfa=sayfa)
+    try: olcum.metrikleri_yaz("pano", en_az_aralik=10)
+    except OSError: pass
+
+@st.fragment(run_every=5)
+def tarama_durumu_paneli(veri_surumu):
+    # Arka plandaki taramayı sayfanın geri kalanını bloklamadan izler
+    durum = durum_oku()
+    if calisiyor_mu():
+        toplam = durum.get("kategori_toplam") or 1
+        biten = durum.get("kategori_biten", 0)
+        st.progress(min(biten / toplam, 1.0), text=f"🤖 Tarama sürüyor: {biten}/{toplam} kategori, {durum.get('urun', 0)} ürün")
+    elif durum.get("durum") == "hata":
+        st.error(f"❌ Son tarama hata verdi: {durum.get('hata')} (ayrıntı: `{GUNLUK_DOSYASI}`)")
+    elif durum.get("durum") == "calisiyor":
+        st.warning(f"⚠️ Son tarama yarıda kaldı (ayrıntı: `{GUNLUK_DOSYASI}`).")
+    elif durum.get("durum") == "eksik":
+        eksik = (durum.get("istatistik") or {}).get("eksik_kategoriler", [])
+        st.warning(f"⚠️ Son taramada {len(eksik)} kategori eksik kaldı.")
+    elif durum.get("son_basarili"):
+        st.caption(f"✅ Son tarama: {durum['son_basarili']} ({durum.get('urun', 0)} ürün)")
+    # Yeni tarama bittiyse (ya da depo değiştiyse) veri arka planda yüklenir; yüklenince tüm sayfa yeniden çizilir
+    guncel = veri_surumu_hesapla()
+    if guncel != veri_surumu and paylasilan_veriler()["vitrin"].hazirla(guncel) == guncel:
+        st.rerun(scope="app")
+
+def taramayi_baslat(devam=False):
+    if arka_planda_baslat(devam): st.toast("🚀 Tarama arka planda başlatıldı.")
+    else: st.toast("⏳ Zaten çalışan bir tarama var.")
 
 # --- VERİ HAZIRLIĞI ---
-df_raw = veri_getir()
+metrik_sunucusu()
+gorsel_sunucusu()
+# `veri_surumu` sunulan verinin sürümüdür; yeni tarama yüklenene kadar bir öncekinde kalabilir
+veri_surumu, df_vitrin, sorgu = vitrin_getir(veri_surumu_hesapla())
 
 # Veri Kontrolü
-if df_raw.empty:
+if df_vitrin.empty:
     st.error("Veritabanı boş veya okunamadı. Lütfen 'Verileri Güncelle' butonunu kullanın.")
-    if st.button("🚀 Verileri Güncelle"):
-        calistir()
-        st.rerun()
+    if st.button("🚀 Verileri Güncelle", disabled=calisiyor_mu()):
+        taramayi_baslat()
+    tarama_durumu_paneli(veri_surumu)
+    cizim_bitti("bos")
     st.stop()
 
-# Analiz (Fiyat Değişim Hesabı)
-df_sorted = df_raw.sort_values(["Ürün Adı", "Tarih"])
-df_sorted['Önceki Fiyat'] = df_sorted.groupby("Ürün Adı")["Satış Fiyatı"].shift(1)
-df_vitrin = df_sorted.drop_duplicates("Ürün Adı", keep='last')
-df_vitrin['Fiyat Farkı'] = df_vitrin['Satış Fiyatı'] - df_vitrin['Önceki Fiyat']
-
 # =======================================================
 # EKRAN: DETAY SAYFASI
 # =======================================================
 if st.session_state.page == 'detail':
-    urun_adi = st.session_state.selected_product
-    gecmis = df_raw[df_raw["Ürün Adı"] == urun_adi].sort_values("Tarih")
-    
-    if gecmis.empty: go_home(); st.rerun()
-    son = gecmis.iloc[-1]
+    urun_id = st.session_state.selected_product
+    if urun_id not in df_vitrin.index: go_home(); st.rerun()
+    son = df_vitrin.loc[urun_id]
+    seri = seri_getir(urun_id, son['İlk Görülme'], son['Son Görülme'], veri_surumu)
 
     # Üst Bar
     c1, c2 = st.columns([1, 10])
@@ -194,7 +298,7 @@ if st.session_state.page == 'detail':
     
     col_img, col_info = st.columns([4, 6], gap="large")
     with col_img:
-        st.image(son['Resim'], use_container_width=True)
+        st.image(migros_gorsel.gorsel_adresi(son['Resim'], 640), use_container_width=True)
     with col_info:
         st.markdown(f"## {son['Ürün Adı']}")
         st.caption(f"📂 {son['Kategori']}")
@@ -203,18 +307,29 @@ if st.session_state.page == 'detail':
         if son['İndirim %'] > 0:
             st.markdown(f"<span style='text-decoration:line-through; color:#999; font-size:20px'>{son['Etiket Fiyatı']:.2f} TL</span>", unsafe_allow_html=True)
         st.markdown(f"<span style='color:#ff6000; font-size:40px; font-weight:800'>{son['Satış Fiyatı']:.2f} TL</span>", unsafe_allow_html=True)
+        if birim_fiyat_metni(son['Birim Fiyat'], son['Birim']): st.caption(f"⚖️ {birim_fiyat_metni(son['Birim Fiyat'], son['Birim'])}")
         
         st.markdown("<br>", unsafe_allow_html=True)
         st.link_button("🛒 Migros Sitesine Git", son['Link'], type="primary", use_container_width=True)
+        if migros_alarm.izleniyor_mu(urun_id):
+            st.caption("🔔 Bu ürün izleniyor: fiyatı düştüğünde alarm üretilir.")
+        elif st.button("🔔 Fiyatı Düşünce Haber Ver", use_container_width=True):
+            migros_alarm.kural_ekle(ad=str(son['Ürün Adı']), urunler=[urun_id])
+            st.rerun()
         
         # İstatistik
-        st.info(f"📊 Ortalama: {gecmis['Satış Fiyatı'].mean():.2f} TL | En Düşük: {gecmis['Satış Fiyatı'].min():.2f} TL")
+        st.info(f"📊 Ortalama: {son['Ortalama']:.2f} TL | En Düşük: {son['En Düşük']:.2f} TL")
 
     # Grafik
     st.divider()
     st.markdown("### 📉 Fiyat Geçmişi")
-    fig = px.line(gecmis, x="Tarih", y="Satış Fiyatı", markers=True)
+    fig = px.line(seri, x="Dönem", y="Kapanış", markers=len(seri) <= 60, labels={"Dönem": "Tarih", "Kapanış": "Satış Fiyatı"})
     fig.update_traces(line_color="#ff6000", line_width=4)
+    if (seri["En Yüksek"] > seri["En Düşük"]).any():
+        # Dönem içindeki en düşük / en yüksek fiyat bandı
+        fig.add_scatter(x=seri["Dönem"], y=seri["En Yüksek"], mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip")
+        fig.add_scatter(x=seri["Dönem"], y=seri["En Düşük"], mode="lines", line=dict(width=0), fill="tonexty",
+                        fillcolor="rgba(255,96,0,0.15)", showlegend=False, hoverinfo="skip")
     grid_c = "#333" if is_dark else "#eee"
     text_c = "#eee" if is_dark else "#333"
     fig.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", font_color=text_c, yaxis=dict(gridcolor=grid_c))
@@ -241,66 +356,52 @@ else:
         arama = c_search.text_input("🔍 Ürün Ara", placeholder="Ne aramıştınız?")
         
         # Kategoriler
-        tum_kategoriler = sorted(df_raw["Kategori"].astype(str).unique().tolist()) if "Kategori" in df_raw.columns else []
-        kategori = c_cat.selectbox("Kategori", ["Tümü"] + tum_kategoriler)
+        kategori = c_cat.selectbox("Kategori", ["Tümü"] + sorgu.kategoriler)
         
         # Filtreler (Yatay Radyo Butonu - CSS ile Tab gibi görünür)
-        filtre_modu = c_filter.radio("Filtrele:", ["Tümü", "📉 Fiyatı Düşenler", "📈 Fiyatı Artanlar"], horizontal=True, label_visibility="collapsed")
+        filtre_modu = c_filter.radio("Filtrele:", list(FILTRE_SECENEKLERI), horizontal=True, label_visibility="collapsed")
         
         # Sıralama
-        sirala = c_sort.selectbox("Sıralama", ["Akıllı", "Fiyat Artan", "Fiyat Azalan"], label_visibility="collapsed")
+        sirala = c_sort.selectbox("Sıralama", list(SIRALAMA_SECENEKLERI), label_visibility="collapsed")
 
-    # --- FİLTRELEME MANTIĞI ---
-    df = df_vitrin.copy()
-    
-    # Filtre Modu
-    if "Düşenler" in filtre_modu:
-        df = df[df['Önceki Fiyat'].notna() & (df['Fiyat Farkı'] < -0.01)]
-    elif "Artanlar" in filtre_modu:
-        df = df[df['Önceki Fiyat'].notna() & (df['Fiyat Farkı'] > 0.01)]
-        
-    # Arama & Kategori
-    if arama: df = df[df["Ürün Adı"].str.contains(arama, case=False)]
-    if kategori != "Tümü": df = df[df["Kategori"] == kategori]
-    
-    # Sıralama
-    if sirala == "Fiyat Artan": df = df.sort_values("Satış Fiyatı")
-    elif sirala == "Fiyat Azalan": df = df.sort_values("Satış Fiyatı", ascending=False)
-    else: df = df.sort_values(["İndirim %", "Ürün Adı"], ascending=[False, True])
+    # --- SORGU ---
+    # Filtre/arama/kategori/sıralama tek sorguda önceden sıralanmış indekslere karşı çözülür; sonuç konumları
+    # saklandığı için sayfa değiştirmek yalnızca 24 satırı okur
+    konumlar = sorgu.sorgula(FILTRE_SECENEKLERI[filtre_modu], arama, None if kategori == "Tümü" else kategori,
+                             SIRALAMA_SECENEKLERI[sirala])
 
     # --- LİSTELEME ---
     st.write("") # Boşluk
-    st.markdown(f"**📦 {len(df)} Ürün Bulundu**")
+    st.markdown(f"**📦 {len(konumlar)} Ürün Bulundu**")
     
-    if df.empty:
+    if not len(konumlar):
         st.info("Bu kriterlere uygun ürün bulunamadı.")
     else:
         # Sayfalama
         SAYFA_BASI = 24
-        total_pages = math.ceil(len(df) / SAYFA_BASI)
+        total_pages = math.ceil(len(konumlar) / SAYFA_BASI)
         
         # Sayfa güvenliği
         if st.session_state.pagination_idx >= total_pages: st.session_state.pagination_idx = 0
         if st.session_state.pagination_idx < 0: st.session_state.pagination_idx = 0
         
-        start = st.session_state.pagination_idx * SAYFA_BASI
-        end = start + SAYFA_BASI
-        page_data = df.iloc[start:end]
+        page_data = sorgu.sayfa(konumlar, st.session_state.pagination_idx, SAYFA_BASI)
 
         cols = st.columns(4)
-        for i, row in enumerate(page_data.to_dict('records')):
+        for i, row in enumerate(page_data.reset_index().to_dict('records')):
             with cols[i % 4]:
                 # HTML KART YAPISI (CSS ile şekillenir)
                 with st.container():
                     st.markdown(f"""
                     <div class="product-card-container">
                         <div class="img-box">
-                            <img src="{row['Resim']}">
+                            <img src="{migros_gorsel.gorsel_adresi(row['Resim'])}" loading="lazy">
                         </div>
                         <div class="p-title" title="{row['Ürün Adı']}">{row['Ürün Adı']}</div>
                         <div>
                             {'<span class="p-old">' + str(int(row['Etiket Fiyatı'])) + '</span>' if row['İndirim %'] > 0 else ''}
                             <span class="p-price">{row['Satış Fiyatı']:.2f} ₺</span>
+                            <span class="p-unit">{birim_fiyat_metni(row['Birim Fiyat'], row['Birim'])}</span>
                         </div>
                         {f'<div class="badge-down">⬇ {abs(row["Fiyat Farkı"]):.2f} TL Düştü</div>' if (pd.notna(row['Önceki Fiyat']) and row['Fiyat Farkı'] < -0.01) else ''}
                         {f'<div class="badge-up">⬆ {row["Fiyat Farkı"]:.2f} TL Arttı</div>' if (pd.notna(row['Önceki Fiyat']) and row['Fiyat Farkı'] > 0.01) else ''}
@@ -308,7 +409,7 @@ else:
                     """, unsafe_allow_html=True)
                     
                     if st.button("İncele", key=f"btn_{i}_{row['Link']}", use_container_width=True):
-                        go_to_detail(row['Ürün Adı'])
+                        go_to_detail(row['Ürün ID'])
                         st.rerun()
                 st.markdown("<br>", unsafe_allow_html=True)
 
@@ -329,8 +430,13 @@ else:
     # --- FOOTER: GÜNCELLEME BUTONU ---
     st.divider()
     with st.expander("⚙️ Yönetici Ayarları (Veri Güncelleme)"):
-        if st.button("🚀 Verileri Şimdi Güncelle (Bu işlem 3-5 dk sürebilir)"):
-            with st.spinner("Robot çalışıyor..."):
-                calistir()
-                st.cache_data.clear()
-                st.rerun()
+        # Tarama ayrı bir süreçte çalışır; pano bu sırada kullanılmaya devam eder
+        if st.button("🚀 Verileri Şimdi Güncelle (arka planda 3-5 dk sürebilir)", disabled=calisiyor_mu()):
+            taramayi_baslat()
+        # Yarıda kalan taramayı kontrol noktasından sürdürür; yalnızca eksik sayfalar çekilir
+        if durum_oku().get("durum") in ("calisiyor", "eksik", "hata") and not calisiyor_mu():
+            if st.button("↩️ Yarım Kalan Taramayı Tamamla", use_container_width=True):
+                taramayi_baslat(devam=True)
+        tarama_durumu_paneli(veri_surumu)
+
+cizim_bitti("detay" if st.session_state.page == "detail" else "vitrin")
@@ -0,0 +1,55 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migros_arama import AramaIndeksi
+
+# Ürün adı üretmek için Türkçe karakterli kelime havuzu
+MARKALAR = ["Pınar", "Sütaş", "İçim", "Ülker", "Eti", "Torku", "Şölen", "Dimes", "Migros", "Tadım", "Doğadan", "Çaykur", "Öncü", "Tat", "Uno"]
+URUNLER = ["Süt", "Yoğurt", "Ayran", "Peynir", "Kaşar", "Bisküvi", "Çikolata", "Gofret", "Meyve Suyu", "Şampuan", "Deterjan",
+           "Makarna", "Pirinç", "Un", "Şeker", "Çay", "Kahve", "Zeytin", "Salça", "Işık Ampul", "İnce Belen Bisküvi"]
+NITELIKLER = ["Yarım Yağlı", "Tam Yağlı", "Light", "Laktozsuz", "Organik", "Sütlü", "Bitter", "Fındıklı", "Kakaolu", "Klasik", "Ekonomik"]
+MIKTARLAR = ["200 Ml", "500 Ml", "1 L", "1,5 L", "250 Gr", "500 Gr", "1 Kg", "6x200 Ml", "10'lu", "2 Kg"]
+SORGULAR = ["süt", "SUT", "yogurt", "çikolata bitter", "pinar yarim", "ISIK", "şampuan", "bisküv", "kasar", "çikolta", "makarna 500"]
+
+def urun_adlari(adet, tohum=42):
+    rnd = random.Random(tohum)
+    return [f"{rnd.choice(MARKALAR)} {rnd.choice(NITELIKLER)} {rnd.choice(URUNLER)} {rnd.choice(MIKTARLAR)} {rnd.randint(1, 5000)}" for _ in range(adet)]
+
+def sure_olc(fonksiyon, tekrar):
+    sureler = []
+    for _ in range(tekrar):
+        bas = time.perf_counter()
+        fonksiyon()
+        sureler.append((time.perf_counter() - bas) * 1000)
+    return {"medyan_ms": round(float(np.median(sureler)), 3), "p95_ms": round(float(np.percentile(sureler, 95)), 3)}
+
+def olc(adet, tekrar):
+    adlar = pd.Series(urun_adlari(adet))
+    bas = time.perf_counter()
+    indeks = AramaIndeksi(adlar.tolist())
+    kurulum_ms = (time.perf_counter() - bas) * 1000
+    sonuc = {"urun": adet, "indeks_kurulum_ms": round(kurulum_ms, 1), "sorgular": {}}
+    for sorgu in SORGULAR:
+        sonuc["sorgular"][sorgu] = {
+            "str_contains": sure_olc(lambda: adlar[adlar.str.contains(sorgu, case=False)], tekrar),
+            "indeks": sure_olc(lambda: indeks.ara(sorgu), tekrar),
+            "str_contains_sonuc": int(adlar.str.contains(sorgu, case=False).sum()),
+            "indeks_sonuc": len(indeks.ara(sorgu)),
+        }
+    return sonuc
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ürün arama: str.contains ve AramaIndeksi karşılaştırması")
+    parser.add_argument("--boyutlar", default="20000,300000", help="Virgülle ayrılmış ürün sayıları")
+    parser.add_argument("--tekrar", type=int, default=20)
+    args = parser.parse_args()
+    sonuclar = [olc(int(b), args.tekrar) for b in args.boyutlar.split(",")]
+    print(json.dumps(sonuclar, ensure_ascii=False, indent=2))
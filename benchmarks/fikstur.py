@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migros_http import HttpOturumu
+from migros_scraper import API_TABANI, KATEGORILER, urunleri_ayikla
+
+# Kaydedilmiş yanıtlar: <dizin>/<slug>/<sayfa>.json (sunucunun döndürdüğü ham gövde)
+VARSAYILAN_DIZIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fikstur")
+BOS_SAYFA = json.dumps({"data": {"searchInfo": {"storeProductInfos": []}}}).encode()
+
+ROZETLER = ["3 Al 2 Öde", "Money İndirimi", "2. Ürün %50", "Hediye Çeki", "12,90 TL", "Sanal Market", "99,95"]
+ADLAR = ["Pınar Süt 1 L", "Sütaş Yoğurt 500 Gr", "Ülker Çikolata 80 Gr", "Eti Bisküvi 3x150 Gr", "Doğadan Çay 20'li",
+         "Çaykur Rize Çayı 1 Kg", "Tat Salça 830 Gr", "Uno Ekmek 500 Gr", "Torku Gofret 36 Gr", "Sırma Su 5 Lt"]
+
+def sentetik_fikstur(dizin, kategoriler=None, sayfa=5, urun=30, tohum=42):
+    # Kayıt yokken kullanılacak, gerçek yanıt yapısını taklit eden sayfalar üretir
+    rnd = random.Random(tohum)
+    kategoriler = kategoriler or KATEGORILER
+    for k, slug in enumerate(kategoriler):
+        os.makedirs(os.path.join(dizin, slug), exist_ok=True)
+        for p in range(1, sayfa + 1):
+            urunler = []
+            for i in range(urun):
+                fiyat = rnd.randint(500, 50000)
+                urunler.append({
+                    "id": f"{slug}-{p}-{i}", "name": f"{rnd.choice(ADLAR)} {p * 100 + i}",
+                    "regularPrice": fiyat, "shownPrice": fiyat - rnd.choice([0, 0, fiyat // 10, fiyat // 3]),
+                    "badges": [{"value": v} for v in rnd.sample(ROZETLER, rnd.randint(0, 3))],
+                    "images": [{"urls": {"PRODUCT_DETAIL": f"https://images.migrosone.com/{slug}/{p}/{i}.jpg"}}],
+                    # Ürün kodu kategori/sayfa/sıra başına tekil (sabit genişlikte, kategoriler arası çakışmaz)
+                    "prettyName": f"urun-{slug}-{p}-{i}-p-{k:03x}{p:03x}{i:04x}",
+                })
+            govde = {"data": {"searchInfo": {"storeProductInfos": urunler, "hitCount": sayfa * urun, "pageCount": sayfa}}}
+            with open(os.path.join(dizin, slug, f"{p}.json"), "w", encoding="utf-8") as f:
+                json.dump(govde, f, ensure_ascii=False)
+    return dizin
+
+def kaydet(dizin, kategoriler=None, api_tabani=None):
+    # Canlı API'den kategorilerin tüm sayfalarını ham haliyle kaydeder (sonraki ölçümler çevrimdışı tekrarlanır)
+    oturum = HttpOturumu()
+    api_tabani = api_tabani or API_TABANI
+    for slug in kategoriler or KATEGORILER:
+        os.makedirs(os.path.join(dizin, slug), exist_ok=True)
+        page = 1
+        while True:
+            durum_kodu, data = oturum.get_json(f"{api_tabani}/rest/search/screens/{slug}?page={page}")
+            if durum_kodu != 200 or not urunleri_ayikla(data, slug): break
+            with open(os.path.join(dizin, slug, f"{page}.json"), "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            print(f"💾 {slug} | Sayfa {page}")
+            page += 1
+
+def sunucu_baslat(dizin, gecikme=0.0):
+    # /rest/search/screens/<slug>?page=N isteklerini kayıtlı dosyalardan yanıtlar; (adres, sunucu) döndürür
+    onbellek = {}
+
+    class Yanitlayici(BaseHTTPRequestHandler):
+        def log_message(self, *args): pass
+
+        def do_GET(self):
+            adres = urlsplit(self.path)
+            slug = adres.path.rstrip("/").rsplit("/", 1)[-1]
+            sayfa = parse_qs(adres.query).get("page", ["1"])[0]
+            yol = os.path.join(dizin, slug, f"{sayfa}.json")
+            if yol not in onbellek:
+                try:
+                    with open(yol, "rb") as f: onbellek[yol] = f.read()
+                except OSError:
+                    onbellek[yol] = BOS_SAYFA
+            govde = onbellek[yol]
+            if gecikme: time.sleep(gecikme)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(govde)))
+            self.end_headers()
+            self.wfile.write(govde)
+
+    sunucu = ThreadingHTTPServer(("127.0.0.1", 0), Yanitlayici)
+    sunucu.daemon_threads = True
+    threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{sunucu.server_address[1]}", sunucu
+
+def kategorileri_listele(dizin):
+    return sorted(d for d in os.listdir(dizin) if os.path.isdir(os.path.join(dizin, d)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arama API fikstürleri: kaydet, sentetik üret veya yerelden sun")
+    parser.add_argument("islem", choices=["kaydet", "sentetik", "sun"])
+    parser.add_argument("--dizin", default=VARSAYILAN_DIZIN)
+    parser.add_argument("--kategoriler", default="", help="Virgülle ayrılmış slug listesi (varsayılan: tümü)")
+    parser.add_argument("--gecikme", type=float, default=0.0, help="'sun' için yanıt başına yapay gecikme (sn)")
+    args = parser.parse_args()
+    kategoriler = [k for k in args.kategoriler.split(",") if k] or None
+    if args.islem == "kaydet":
+        kaydet(args.dizin, kategoriler)
+    elif args.islem == "sentetik":
+        sentetik_fikstur(args.dizin, kategoriler)
+    else:
+        adres, sunucu = sunucu_baslat(args.dizin, args.gecikme)
+        print(f"MIGROS_API_TABANI={adres}")
+        try: threading.Event().wait()
+        except KeyboardInterrupt: sunucu.shutdown()
@@ -0,0 +1,277 @@
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import math
+import os
+import platform
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fikstur import sentetik_fikstur, sunucu_baslat, kategorileri_listele
+from migros_http import HttpOturumu
+from migros_scraper import veri_cek, urunu_normalize, kampanya_temizle, urunleri_ayikla
+from migros_birim import birimleri_coz
+from migros_depo import (KOLONLAR, ParquetDepo, bolumlere_yaz, tiplere_cevir, urun_id_doldur, sheets_cercevesi,
+                         sheets_satirlari, tr_format, ozet_hesapla, ozet_guncelle)
+from migros_seri import SeriDeposu
+from migros_parca import IsKuyrugu, isci_havuzu, birlestir, havuzu_kapat
+from migros_vitrin import VitrinSorgusu
+from migros_arama import AramaIndeksi
+from migros_anlik import anlik_yaz, anlik_oku
+
+# app.py'deki veri_getir'in okuduğu kolonlar
+GEREKLI_KOLONLAR = ["Tarih", "Ürün ID", "Satış Fiyatı"]
+# Sheets'in hücre sınırı (10M) 1M satırı zaten taşımaz; metin ayrıştırma bu boyuta kadar ölçülür
+SHEETS_SINIRI = 100_000
+
+def sure_olc(fonksiyon, tekrar):
+    sureler = []
+    for _ in range(tekrar):
+        bas = time.perf_counter()
+        fonksiyon()
+        sureler.append((time.perf_counter() - bas) * 1000)
+    return {"medyan_ms": round(float(np.median(sureler)), 3), "p95_ms": round(float(np.percentile(sureler, 95)), 3),
+            "en_az_ms": round(float(min(sureler)), 3)}
+
+class Olcer:
+    # Her aşamayı `tekrar` kez ölçer; profil dizini verilmişse bir kez de cProfile altında çalıştırıp
+    # <dizin>/<ad>.prof ve en pahalı çağrıları içeren <dizin>/<ad>.txt yazar
+    def __init__(self, tekrar, profil_dizini=None):
+        self.tekrar = tekrar
+        self.profil_dizini = profil_dizini
+
+    def __call__(self, ad, fonksiyon, tekrar=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            sonuc = sure_olc(fonksiyon, tekrar or self.tekrar)
+            if self.profil_dizini:
+                os.makedirs(self.profil_dizini, exist_ok=True)
+                profil = cProfile.Profile()
+                profil.runcall(fonksiyon)
+                profil.dump_stats(os.path.join(self.profil_dizini, f"{ad}.prof"))
+                with open(os.path.join(self.profil_dizini, f"{ad}.txt"), "w", encoding="utf-8") as f:
+                    pstats.Stats(profil, stream=f).sort_stats("cumulative").print_stats(30)
+        print(f"⏱️ {ad}: {sonuc['medyan_ms']} ms", file=sys.stderr)
+        return sonuc
+
+# --- TARAMA (FİKSTÜR SUNUCUSU) ---
+def tarama_olc(olc, fikstur_dizini, eszamanli, gecikme=0.0):
+    adres, sunucu = sunucu_baslat(fikstur_dizini, gecikme)
+    kategoriler = kategorileri_listele(fikstur_dizini)
+    sayac = {}
+
+    def tara():
+        oturum = HttpOturumu(eszamanli=eszamanli)
+        oturum.sinirlayici.aralik = 0.0  # yerel sunucuda hız sınırı ölçümü bozmasın
+        sayac["urun"] = sum(len(veri_cek(slug, oturum, adres)) for slug in kategoriler)
+        sayac.update(oturum.istatistik())
+
+    try:
+        sonuc = {"kategori": len(kategoriler), "veri_cek": olc("veri_cek", tara)}
+    finally:
+        sunucu.shutdown()
+    sonuc.update(urun=sayac["urun"], istek=sayac["istek"], bayt=sayac["bayt"])
+    return sonuc
+
+# --- PARÇALI TARAMA (İŞÇİ SÜREÇLER) ---
+def parcali_olc(olc, fikstur_dizini, gecici_dizin, isciler, gecikme=0.0):
+    # Aynı fikstürü 1..N işçi süreçle tarayıp tek taramaya birleştirir (birleştirme dahil). "soguk" işçi süreçlerin
+    # başlatıldığı ilk taramadır; "sicak" aynı süreç havuzuyla tekrarlanan taramalardır (zamanlayıcıdaki gibi)
+    adres, sunucu = sunucu_baslat(fikstur_dizini, gecikme)
+    kategoriler = kategorileri_listele(fikstur_dizini)
+    sonuc = {"kategori": len(kategoriler)}
+    sayac = {}
+    try:
+        for isci in isciler:
+            def tara():
+                kok = tempfile.mkdtemp(dir=gecici_dizin)
+                kuyruk = IsKuyrugu.olustur("olcum", datetime.now().replace(second=0, microsecond=0), kategoriler, kok=kok)
+                # Yerel sunucuda hız sınırı ölçümü bozmasın
+                istatistikler = isci_havuzu(kuyruk, isci, saniyede=1e9, api_tabani=adres)
+                df, _ = birlestir(kuyruk, ParquetDepo(os.path.join(kok, "depo")))
+                sayac.update(urun=len(df), birim=sum(i["birim"] for i in istatistikler))
+            sonuc[f"isci_{isci}"] = {"soguk": olc(f"parcali_{isci}_soguk", tara, tekrar=1), "sicak": olc(f"parcali_{isci}", tara)}
+    finally:
+        sunucu.shutdown()
+        havuzu_kapat()
+    sonuc.update(sayac)
+    return sonuc
+
+# --- NORMALİZASYON ---
+def ham_urunler(fikstur_dizini, adet):
+    urunler = []
+    for slug in kategorileri_listele(fikstur_dizini):
+        klasor = os.path.join(fikstur_dizini, slug)
+        for ad in sorted(os.listdir(klasor)):
+            with open(os.path.join(klasor, ad), encoding="utf-8") as f:
+                data = json.load(f)
+            urunler.extend((slug, u) for u in urunleri_ayikla(data, slug))
+    # Kayıtlı ürünler istenen adede kadar tekrarlanır
+    return (urunler * math.ceil(adet / max(1, len(urunler))))[:adet]
+
+def normalize_olc(olc, fikstur_dizini, adet):
+    urunler = ham_urunler(fikstur_dizini, adet)
+    adlar = [u.get("name", "") for _, u in urunler]
+    rozetler = [u.get("badges", []) for _, u in urunler]
+    fiyatlar = [u.get("shownPrice", 0) / 100 for _, u in urunler]
+    return {
+        "urun": len(urunler),
+        "urunu_normalize": olc("urunu_normalize", lambda: [urunu_normalize(u, slug) for slug, u in urunler]),
+        "kampanya_temizle": olc("kampanya_temizle", lambda: [kampanya_temizle(b) for b in rozetler]),
+        "birimleri_coz": olc("birimleri_coz", lambda: birimleri_coz(pd.Series(adlar))),
+        "tr_format": olc("tr_format", lambda: [tr_format(f) for f in fiyatlar]),
+    }
+
+# --- GEÇMİŞ ÖLÇEKLERİ ---
+def sentetik_gecmis(satir, tohum=42):
+    # `satir` satırlık geçmiş: ~30 taramada tekrar görülen ürünler, taramalar arasında ara sıra fiyat değişir
+    rnd = np.random.default_rng(tohum)
+    urun = max(100, satir // 30)
+    tarama = math.ceil(satir / urun)
+    kimlik = np.tile(np.arange(urun), tarama)[:satir]
+    tarama_no = np.repeat(np.arange(tarama), urun)[:satir]
+    taban = rnd.uniform(5, 500, urun).round(2)
+    oynama = np.where(rnd.random(satir) < 0.1, rnd.uniform(0.8, 1.1, satir), 1.0)
+    satis = (taban[kimlik] * oynama).round(2)
+    etiket = np.maximum(satis, taban[kimlik])
+    kategoriler = np.array([f"kategori-c-{i}" for i in range(16)])
+    kimlik_metni = pd.Series(kimlik).map(lambda i: f"{i:x}").to_numpy()
+    df = pd.DataFrame({
+        "Tarih": pd.Timestamp("2026-01-01") + pd.to_timedelta(tarama_no * 6, unit="h"),
+        "Ürün Adı": pd.Series(kimlik).map(lambda i: f"Ürün {i} 500 Gr").to_numpy(),
+        "Etiket Fiyatı": etiket,
+        "Satış Fiyatı": satis,
+        "İndirim Tipi": np.where(etiket > satis, "3 Al 2 Öde", ""),
+        "İndirim %": ((etiket - satis) / etiket * 100).round(1),
+        "Durum": np.where(etiket > satis, "FIRSAT", "Normal"),
+        "Stok": "Var",
+        "Birim Fiyat": 0.0,
+        "Birim": "GR",
+        "Kategori": kategoriler[kimlik % 16],
+        "Resim": np.char.add("https://images.migrosone.com/", kimlik_metni.astype(str)),
+        "Link": np.char.add("https://www.migros.com.tr/urun-p-", kimlik_metni.astype(str)),
+        "Ürün ID": kimlik_metni,
+    })
+    return tiplere_cevir(df[KOLONLAR])
+
+def vitrin_sorgusu(ozet):
+    # Sorgu motorundan önceki vitrin yolu (karşılaştırma için): tüm özeti kopyalayıp "Fiyatı Düşenler" filtresi,
+    # "Akıllı" sıralama, ilk sayfa
+    df = ozet.copy()
+    df = df[df["Önceki Fiyat"].notna() & (df["Fiyat Farkı"] < -0.01)]
+    return df.sort_values(["İndirim %", "Ürün Adı"], ascending=[False, True]).iloc[:24]
+
+def olcek_olc(olc, satir, gecici_dizin):
+    gecmis = sentetik_gecmis(satir)
+    dizin = os.path.join(gecici_dizin, f"depo_{satir}")
+    bolumlere_yaz(gecmis, os.path.join(dizin, "gecmis"))
+    depo = ParquetDepo(dizin)
+    son_tarama = gecmis[gecmis["Tarih"] == gecmis["Tarih"].max()]
+    onceki = gecmis[gecmis["Tarih"] < gecmis["Tarih"].max()]
+    onceki_ozet = ozet_hesapla(onceki)
+    ozet = ozet_hesapla(gecmis)
+    sonuc = {
+        "satir": satir,
+        "urun": int(gecmis["Ürün ID"].nunique()),
+        "veri_getir": olc(f"veri_getir_{satir}", lambda: depo.oku(kolonlar=GEREKLI_KOLONLAR)),
+        "depo_oku_tum": olc(f"depo_oku_tum_{satir}", lambda: depo.oku()),
+        "ozet_hesapla": olc(f"ozet_hesapla_{satir}", lambda: ozet_hesapla(gecmis)),
+        "ozet_guncelle": olc(f"ozet_guncelle_{satir}", lambda: ozet_guncelle(onceki_ozet, son_tarama)),
+        "vitrin_sorgusu": olc(f"vitrin_sorgusu_{satir}", lambda: vitrin_sorgusu(ozet)),
+        "vitrin_motoru_kur": olc(f"vitrin_motoru_kur_{satir}", lambda: VitrinSorgusu(ozet)),
+        "urun_id_doldur": olc(f"urun_id_doldur_{satir}", lambda: urun_id_doldur(gecmis.assign(**{"Ürün ID": None}))),
+    }
+    # Aynı sorgu motorla: ilk çözüm (hatırada yok) ve hatıradan sayfa çevirme
+    motor = VitrinSorgusu(ozet)
+    def motor_ilk():
+        motor._hatira.clear()
+        return motor.sayfa(motor.sorgula("dusen"), 0, 24)
+    sonuc["vitrin_motoru_ilk"] = olc(f"vitrin_motoru_ilk_{satir}", motor_ilk)
+    sonuc["vitrin_sayfa_cevir"] = olc(f"vitrin_sayfa_cevir_{satir}", lambda: motor.sayfa(motor.sorgula("dusen"), 3, 24))
+    # Detay sayfası: eski yol tüm geçmişte ürün süzer, yenisi toplam dosyasından ofsetle tek ürünü okur
+    seriler = SeriDeposu(depo)
+    sonuc["seri_kur"] = olc(f"seri_kur_{satir}", seriler.kur, tekrar=1)
+    urun_id = ozet.index[len(ozet) // 2]
+    ham = depo.oku(kolonlar=GEREKLI_KOLONLAR)
+    sonuc["detay_ham_suzme"] = olc(f"detay_ham_suzme_{satir}", lambda: ham[ham["Ürün ID"] == urun_id].sort_values("Tarih"))
+    sonuc["detay_seri"] = olc(f"detay_seri_{satir}", lambda: seriler.urun_serisi(
+        urun_id, ozet.loc[urun_id, "İlk Görülme"], ozet.loc[urun_id, "Son Görülme"]))
+    # Pano soğuk başlangıcı: depodan özet okuyup arama/vitrin indekslerini kurmak ve bellek eşlemeli anlık görüntü
+    def soguk_depo():
+        ozet_ = ParquetDepo(dizin).ozet()
+        return VitrinSorgusu(ozet_, AramaIndeksi(ozet_["Ürün Adı"].tolist(), ozet_.index.tolist()))
+    anlik_dizini = os.path.join(dizin, "anlik")
+    sonuc["soguk_baslangic_depo"] = olc(f"soguk_baslangic_depo_{satir}", soguk_depo)
+    sonuc["anlik_yaz"] = olc(f"anlik_yaz_{satir}", lambda: anlik_yaz(depo, "olcum", anlik_dizini), tekrar=1)
+    sonuc["soguk_baslangic_anlik"] = olc(f"soguk_baslangic_anlik_{satir}", lambda: anlik_oku("olcum", anlik_dizini).vitrin)
+    if satir <= SHEETS_SINIRI:
+        metin = [list(KOLONLAR)] + sheets_satirlari(gecmis)
+        # sheets_cercevesi başlık satırını listeden çıkardığı için her çalıştırmada kopya verilir
+        sonuc["sheets_cercevesi"] = olc(f"sheets_cercevesi_{satir}", lambda: sheets_cercevesi(list(metin)))
+    sonuc["tepe_bellek_mb"] = tepe_bellek_mb()
+    return sonuc
+
+def tepe_bellek_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def surum_bilgisi():
+    kok = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=kok, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    import pyarrow
+    return {"commit": commit or None, "zaman": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "pandas": pd.__version__, "pyarrow": pyarrow.__version__,
+            "platform": platform.platform(), "cpu": os.cpu_count()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tarayıcı ve pano veri yolu ölçümleri (JSON çıktı)")
+    parser.add_argument("--boyutlar", default="10000,100000,1000000", help="Virgülle ayrılmış geçmiş satır sayıları")
+    parser.add_argument("--fikstur", default=None, help="Kayıtlı yanıt dizini (fikstur.py kaydet); yoksa sentetik üretilir")
+    parser.add_argument("--normalize-adet", type=int, default=50000, help="Normalizasyon ölçümündeki ürün sayısı")
+    parser.add_argument("--eszamanli", type=int, default=4)
+    parser.add_argument("--tekrar", type=int, default=5)
+    parser.add_argument("--isciler", default="1,2,4", help="'parcali' aşamasında denenecek işçi süreç sayıları")
+    parser.add_argument("--gecikme", type=float, default=0.0,
+                        help="'tarama' ve 'parcali' için fikstür sunucusunda yanıt başına yapay gecikme (sn)")
+    parser.add_argument("--asamalar", default="tarama,normalize,olcek",
+                        help="Çalıştırılacak aşamalar (tarama, parcali, normalize, olcek)")
+    parser.add_argument("--profil", default=None, help="cProfile çıktılarının yazılacağı dizin")
+    parser.add_argument("--cikti", default=None, help="JSON'un yazılacağı dosya (varsayılan: stdout)")
+    args = parser.parse_args()
+
+    asamalar = set(args.asamalar.split(","))
+    olc = Olcer(args.tekrar, args.profil)
+    sonuc = {"surum": surum_bilgisi()}
+    with tempfile.TemporaryDirectory() as gecici:
+        fikstur_dizini = args.fikstur or sentetik_fikstur(os.path.join(gecici, "fikstur"))
+        if "tarama" in asamalar:
+            sonuc["tarama"] = tarama_olc(olc, fikstur_dizini, args.eszamanli, args.gecikme)
+        if "parcali" in asamalar:
+            sonuc["parcali"] = parcali_olc(olc, fikstur_dizini, gecici, [int(i) for i in args.isciler.split(",")],
+                                           args.gecikme)
+        if "normalize" in asamalar:
+            sonuc["normalize"] = normalize_olc(olc, fikstur_dizini, args.normalize_adet)
+        if "olcek" in asamalar:
+            # Büyük ölçeklerde tek tekrar yeterli; küçüklerde gürültüyü azaltmak için daha fazlası
+            sonuc["olcekler"] = [olcek_olc(Olcer(args.tekrar if int(b) <= 100_000 else max(1, args.tekrar // 3), args.profil),
+                                           int(b), gecici) for b in args.boyutlar.split(",")]
+    metin = json.dumps(sonuc, ensure_ascii=False, indent=2)
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f: f.write(metin)
+    else:
+        print(metin)
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import requests
+
+import migros_olcum as olcum
+from migros_depo import DEPO_DIZINI, urun_id_doldur
+
+# --- ALARM AYARLARI ---
+KURAL_DOSYASI = os.environ.get("MIGROS_ALARM_KURALLARI", os.path.join(DEPO_DIZINI, "alarm_kurallari.json"))
+# "dosya" (varsayılan: veri/alarmlar.jsonl), "dosya:<yol>", "webhook:<url>" veya boş (kapalı)
+ALARM_HEDEFI = os.environ.get("MIGROS_ALARM_HEDEFI", "dosya")
+ALARM_DOSYASI = os.path.join(DEPO_DIZINI, "alarmlar.jsonl")
+KURUS = 0.005  # kayan nokta gürültüsü: bundan küçük farklar değişim sayılmaz
+
+# --- KURALLAR ---
+# Bir kural kapsamı (ürün listesi ve/veya kategoriler; ikisi de boşsa tüm ürünler) ve eşiklerden oluşur.
+# Verilen tüm eşikler birlikte sağlanmalıdır; eşik verilmemişse her fiyat düşüşü alarmdır.
+#   {"id": "a1b2c3", "ad": "Çay takibi", "urunler": ["1f2e"], "kategoriler": [],
+#    "esik_tl": 5.0, "esik_yuzde": 10.0, "en_dusuk": true}
+def kurallari_oku(yol=KURAL_DOSYASI):
+    try:
+        with open(yol, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def kurallari_yaz(kurallar, yol=KURAL_DOSYASI):
+    os.makedirs(os.path.dirname(yol) or ".", exist_ok=True)
+    gecici = f"{yol}.{os.getpid()}.tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        json.dump(kurallar, f, ensure_ascii=False, indent=1)
+    os.replace(gecici, yol)
+
+def kural_ekle(ad="", urunler=(), kategoriler=(), esik_tl=None, esik_yuzde=None, en_dusuk=False, yol=KURAL_DOSYASI):
+    kural = {"id": uuid.uuid4().hex[:8], "ad": ad, "urunler": [str(u) for u in urunler], "kategoriler": list(kategoriler),
+             "esik_tl": esik_tl, "esik_yuzde": esik_yuzde, "en_dusuk": bool(en_dusuk)}
+    kurallari_yaz(kurallari_oku(yol) + [kural], yol)
+    return kural
+
+def kural_sil(kural_id, yol=KURAL_DOSYASI):
+    kurallar = kurallari_oku(yol)
+    kalan = [k for k in kurallar if k.get("id") != kural_id]
+    kurallari_yaz(kalan, yol)
+    return len(kurallar) - len(kalan)
+
+def izleniyor_mu(urun_id, yol=KURAL_DOSYASI):
+    return any(str(urun_id) in k.get("urunler", []) for k in kurallari_oku(yol))
+
+# --- BİLDİRİM HEDEFLERİ ---
+class DosyaBildirimi:
+    # Alarmları JSON satırları olarak dosyaya ekler
+    def __init__(self, yol=ALARM_DOSYASI):
+        self.yol = yol
+
+    def gonder(self, alarmlar):
+        os.makedirs(os.path.dirname(self.yol) or ".", exist_ok=True)
+        with open(self.yol, "a", encoding="utf-8") as f:
+            for alarm in alarmlar:
+                f.write(json.dumps(alarm, ensure_ascii=False, default=str) + "\n")
+
+class WebhookBildirimi:
+    # Her partinin alarmlarını tek bir JSON POST isteğiyle gönderir; hata taramayı durdurmaz
+    def __init__(self, url, zaman_asimi=10):
+        self.url = url
+        self.zaman_asimi = zaman_asimi
+
+    def gonder(self, alarmlar):
+        try:
+            requests.post(self.url, data=json.dumps({"alarmlar": alarmlar}, ensure_ascii=False, default=str).encode(),
+                          headers={"Content-Type": "application/json"}, timeout=self.zaman_asimi).raise_for_status()
+        except requests.RequestException as e:
+            print(f"⚠️ Alarm webhook hatası: {e}")
+            olcum.say("migros_alarm_gonderim_hata_toplam", aciklama="Gönderilemeyen alarm partisi")
+
+class BellekBildirimi:
+    # Testler ve ölçümler için: alarmları listede biriktirir
+    def __init__(self):
+        self.alarmlar = []
+
+    def gonder(self, alarmlar):
+        self.alarmlar.extend(alarmlar)
+
+def bildirim_olustur(hedef=None):
+    hedef = ALARM_HEDEFI if hedef is None else hedef
+    if not hedef: return None
+    tur, _, deger = hedef.partition(":")
+    if tur == "dosya": return DosyaBildirimi(deger or ALARM_DOSYASI)
+    if tur == "webhook": return WebhookBildirimi(deger)
+    if tur == "bellek": return BellekBildirimi()
+    raise ValueError(f"Bilinmeyen alarm hedefi: {hedef}")
+
+# --- ALARM MOTORU ---
+class AlarmMotoru:
+    # Her yeni partiyi, ürün başına son fiyat / tarihsel en düşük / son görülme tutan bellek içi indekse karşı
+    # değerlendirir; geçmiş yeniden taranmaz. İndeks motor oluşturulurken ürün özetinden bir kez kurulur: ilk parti
+    # depoya yazılıp özete işlendikten sonra kurulsaydı o partideki düşüşler "zaten görülmüş" sayılırdı.
+    # Kurallar ürün ve kategoriye göre indekslenir: yalnızca fiyatı düşen satırlar için ilgili kurallara bakılır.
+    def __init__(self, kurallar, bildirim, ozet_getir):
+        self.kurallar = [k for k in kurallar if k.get("id")]
+        self.bildirim = bildirim
+        self._ozet_getir = ozet_getir
+        self._kilit = threading.Lock()
+        self.uretilen = 0
+        self.urun_kurallari, self.kategori_kurallari, self.genel_kurallar = {}, {}, []
+        for kural in self.kurallar:
+            if kural.get("urunler"):
+                for u in kural["urunler"]: self.urun_kurallari.setdefault(str(u), []).append(kural)
+            elif kural.get("kategoriler"):
+                for k in kural["kategoriler"]: self.kategori_kurallari.setdefault(k, []).append(kural)
+            else:
+                self.genel_kurallar.append(kural)
+        self._indeksi_kur()
+
+    def _indeksi_kur(self):
+        ozet = self._ozet_getir()
+        if ozet is None or ozet.empty:
+            self._indeks = pd.DataFrame({"fiyat": pd.Series(dtype="float64"), "en_dusuk": pd.Series(dtype="float64"),
+                                         "son": pd.Series(dtype="datetime64[s]")})
+            return
+        self._indeks = pd.DataFrame({
+            "fiyat": pd.to_numeric(ozet["Satış Fiyatı"], errors="coerce").astype("float64"),
+            "en_dusuk": pd.to_numeric(ozet["En Düşük"], errors="coerce").astype("float64"),
+            "son": pd.to_datetime(ozet["Son Görülme"]),
+        }, index=ozet.index.astype(str))
+
+    def _kosul(self, kural, fiyat, onceki, en_dusuk):
+        dusus = onceki - fiyat
+        if dusus <= KURUS: return False
+        if kural.get("esik_tl") is not None and dusus + KURUS < float(kural["esik_tl"]): return False
+        if kural.get("esik_yuzde") is not None and dusus / onceki * 100 + 1e-9 < float(kural["esik_yuzde"]): return False
+        if kural.get("en_dusuk") and not (np.isnan(en_dusuk) or fiyat < en_dusuk - KURUS): return False
+        return True
+
+    def degerlendir(self, df):
+        # Partideki fiyat düşüşlerinden kurallara uyanların alarm listesini döndürür ve bildirir; indeksi günceller.
+        # Aynı parti ikinci kez verilirse (son görülmeden eski/eşit satırlar) alarm üretmez.
+        if df is None or df.empty: return []
+        with self._kilit, olcum.sure_olc("migros_alarm_degerlendirme_saniye", "Parti başına alarm değerlendirme süresi"):
+            yeni = urun_id_doldur(df).sort_values("Tarih", kind="stable").drop_duplicates("Ürün ID", keep="last")
+            yeni = yeni.set_index(yeni["Ürün ID"].astype(str))
+            eski = self._indeks.reindex(yeni.index)
+            tarih = pd.to_datetime(yeni["Tarih"])
+            ileri = ~(tarih <= eski["son"]).to_numpy()
+            fiyat = pd.to_numeric(yeni["Satış Fiyatı"], errors="coerce").astype("float64").to_numpy()
+            onceki = eski["fiyat"].to_numpy()
+            en_dusuk = eski["en_dusuk"].to_numpy()
+
+            alarmlar = []
+            if self.kurallar:
+                # Yalnızca daha önce görülmüş ve fiyatı düşen satırlar aday
+                adaylar = np.flatnonzero(ileri & (onceki - fiyat > KURUS))
+                kategoriler = yeni["Kategori"].astype(str).to_numpy() if "Kategori" in yeni.columns else np.full(len(yeni), "")
+                for i in adaylar:
+                    urun_id = yeni.index[i]
+                    kategori = kategoriler[i]
+                    ilgili = self.urun_kurallari.get(urun_id, []) + self.kategori_kurallari.get(kategori, []) + self.genel_kurallar
+                    for kural in ilgili:
+                        if kural.get("urunler") and kural.get("kategoriler") and kategori not in kural["kategoriler"]: continue
+                        if not self._kosul(kural, fiyat[i], onceki[i], en_dusuk[i]): continue
+                        satir = yeni.iloc[i]
+                        alarmlar.append({
+                            "zaman": datetime.now().isoformat(timespec="seconds"), "kural_id": kural["id"],
+                            "kural": kural.get("ad", ""), "urun_id": urun_id, "urun": satir.get("Ürün Adı", ""),
+                            "kategori": kategori, "fiyat": round(float(fiyat[i]), 2), "onceki_fiyat": round(float(onceki[i]), 2),
+                            "dusus_tl": round(float(onceki[i] - fiyat[i]), 2),
+                            "dusus_yuzde": round(float((onceki[i] - fiyat[i]) / onceki[i] * 100), 1),
+                            "en_dusuk": bool(not np.isnan(en_dusuk[i]) and fiyat[i] < en_dusuk[i] - KURUS),
+                            "tarih": tarih.iloc[i], "link": satir.get("Link", ""),
+                        })
+
+            # İndeksi güncelle: yalnızca daha yeni satırlar
+            guncel = yeni.index[ileri]
+            if len(guncel):
+                ek = pd.DataFrame({"fiyat": fiyat[ileri], "en_dusuk": np.fmin(en_dusuk[ileri], fiyat[ileri]),
+                                   "son": tarih[ileri].to_numpy()}, index=guncel)
+                self._indeks = pd.concat([self._indeks[~self._indeks.index.isin(guncel)], ek])
+
+        if alarmlar:
+            self.uretilen += len(alarmlar)
+            olcum.say("migros_alarm_toplam", len(alarmlar), "Üretilen fiyat alarmı")
+            olcum.olay("alarm", adet=len(alarmlar))
+            if self.bildirim: self.bildirim.gonder(alarmlar)
+        return alarmlar
+
+def alarm_motoru_olustur(depo, kurallar=None, bildirim=None):
+    # Kural yoksa ya da hedef kapalıysa None (tarama hiç ek iş yapmaz)
+    kurallar = kurallari_oku() if kurallar is None else kurallar
+    bildirim = bildirim or bildirim_olustur()
+    if not kurallar or bildirim is None or depo is None: return None
+    return AlarmMotoru(kurallar, bildirim, depo.ozet)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fiyat düşüşü alarm kuralları")
+    parser.add_argument("--listele", action="store_true")
+    parser.add_argument("--sil", metavar="KURAL_ID")
+    parser.add_argument("--ekle", action="store_true")
+    parser.add_argument("--ad", default="")
+    parser.add_argument("--urun", action="append", default=[], help="İzlenecek Ürün ID (tekrarlanabilir)")
+    parser.add_argument("--kategori", action="append", default=[], help="Kategori slug'ı (tekrarlanabilir)")
+    parser.add_argument("--tl", type=float, default=None, help="En az bu kadar TL düşüş")
+    parser.add_argument("--yuzde", type=float, default=None, help="En az bu kadar yüzde düşüş")
+    parser.add_argument("--en-dusuk", action="store_true", help="Yalnızca tüm zamanların en düşük fiyatında")
+    args = parser.parse_args()
+    if args.ekle:
+        print(kural_ekle(args.ad, args.urun, args.kategori, args.tl, args.yuzde, args.en_dusuk))
+    elif args.sil:
+        print(f"{kural_sil(args.sil)} kural silindi.")
+    else:
+        for kural in kurallari_oku(): print(json.dumps(kural, ensure_ascii=False))
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+import migros_olcum as olcum
+from migros_arama import AramaIndeksi
+from migros_depo import DEPO_DIZINI
+from migros_seri import seri_deposu
+from migros_vitrin import VitrinSorgusu, vitrin_dizileri
+
+# --- ANLIK GÖRÜNTÜ AYARLARI ---
+# Her başarılı taramadan sonra pano için sıkıştırılmamış Arrow IPC dosyaları yazılır; pano bunları bellek eşlemeyle
+# açar. Sayısal kolonlar ve sorgu dizileri kopyalanmadan dosya sayfalarını gösterir, aynı makinedeki pano süreçleri
+# aynı sayfa önbelleğini paylaşır. Soğuk başlangıçta ayrıştırma, tip dönüşümü ve indeks kurulumu yapılmaz.
+#   veri/anlik/guncel.json        sunulan sürüm ve dizini
+#   veri/anlik/<ad>/ozet.arrow    ürün özeti (Ürün ID kolonu dahil)
+#   veri/anlik/<ad>/vitrin.arrow  vitrin sorgu motorunun sıralama konumları, maskeleri ve kodları
+#   veri/anlik/<ad>/arama.arrow   arama indeksinin dizileri (tek satır, liste kolonları)
+#   veri/anlik/<ad>/gecmis.arrow  tipli ham geçmiş (yalnızca toplam dosyası olmayan depoda; detay grafiği için)
+ANLIK_DIZINI = os.environ.get("MIGROS_ANLIK_DIZINI", os.path.join(DEPO_DIZINI, "anlik"))
+ANLIK_AKTIF = os.environ.get("MIGROS_ANLIK", "1") == "1"
+GECMIS_KOLONLARI = ["Tarih", "Ürün ID", "Satış Fiyatı"]
+SAKLANAN = 2  # henüz yeni sürüme geçmemiş süreçler için sunulan sürümle birlikte bir önceki de tutulur
+MANTIKSAL_DIZILER = ("dusen", "artan", "bilinmiyor")  # Arrow'da bit dizisi olmasın diye uint8 saklanır
+OKUMA_HATALARI = (OSError, KeyError, ValueError, pa.ArrowException)  # eksik/bozuk dosya: depodan yüklenir
+
+def _tablo(df):
+    # Kayan noktalı kolonlar NaN'ı değer olarak saklar: Arrow null'u okurken NaN'a çevirmek kopya gerektirirdi
+    kolonlar = {}
+    for ad, seri in df.items():
+        if pd.api.types.is_float_dtype(seri.dtype): kolonlar[ad] = pa.array(seri.to_numpy())
+        else: kolonlar[ad] = pa.Array.from_pandas(seri)
+    return pa.table(kolonlar)
+
+def _liste_kolonu(deger):
+    # Diziyi tek satırlık liste kolonu yapar; tip açıkça verilir ki boş dizi null tipine düşmesin
+    if isinstance(deger, list): return pa.array([deger], type=pa.list_(pa.string()))
+    deger = np.asarray(deger)
+    return pa.array([deger], type=pa.list_(pa.from_numpy_dtype(deger.dtype)))
+
+def _ipc_yaz(tablo, yol, meta=None):
+    if meta: tablo = tablo.replace_schema_metadata({"migros": json.dumps(meta, ensure_ascii=False)})
+    with pa.OSFile(yol, "wb") as f, ipc.new_file(f, tablo.schema) as yazici:
+        yazici.write_table(tablo)
+
+def _ipc_oku(yol):
+    # Bellek eşlemeli okuma: tampon bellekler dosya sayfalarını gösterir (kopya yok)
+    tablo = ipc.open_file(pa.memory_map(yol)).read_all()
+    meta = (tablo.schema.metadata or {}).get(b"migros")
+    return tablo, (json.loads(meta) if meta else {})
+
+def _dizi(tablo, ad):
+    # Tek parçalı, null'suz sayısal kolon -> salt okunur numpy görünümü (boş tabloda parça yoktur)
+    return tablo.column(ad).combine_chunks().to_numpy(zero_copy_only=True)
+
+def _liste(tablo, ad):
+    # Tek satırlık liste kolonunun değerleri
+    return tablo.column(ad).combine_chunks().values
+
+def _json_oku(yol):
+    try:
+        with open(yol, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# --- YAZMA (TARAMA SONU) ---
+def anlik_yaz(depo, surum, kok=ANLIK_DIZINI):
+    # Depodaki özetten `surum` için anlık görüntü yazar ve sunulan sürüm yapar; dizinini döndürür.
+    # Dosyalar gizli geçici dizine yazılıp tek yeniden adlandırmayla yayımlanır (okuyucular yarım dizin görmez).
+    with olcum.sure_olc("migros_anlik_yazma_saniye", "Anlık görüntü yazma süresi", gunluge="anlik_yazma") as alanlar:
+        ozet = depo.ozet()
+        ad = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        dizin = os.path.join(kok, ad)
+        gecici = os.path.join(kok, f".{ad}.tmp")
+        os.makedirs(gecici)
+        try:
+            _ipc_yaz(_tablo(ozet.reset_index()), os.path.join(gecici, "ozet.arrow"), {"indeks": ozet.index.name or "Ürün ID"})
+
+            vitrin = vitrin_dizileri(ozet)
+            meta = {"kategoriler": vitrin.pop("kategoriler"), "birim_sayisi": vitrin.pop("birim_sayisi")}
+            for k in MANTIKSAL_DIZILER: vitrin[k] = np.asarray(vitrin[k]).view(np.uint8)
+            _ipc_yaz(pa.table({k: pa.array(np.asarray(v)) for k, v in vitrin.items()}), os.path.join(gecici, "vitrin.arrow"), meta)
+
+            arama = AramaIndeksi(ozet["Ürün Adı"].tolist(), ozet.index.tolist()).diziler()
+            _ipc_yaz(pa.table({k: _liste_kolonu(v) for k, v in arama.items()}), os.path.join(gecici, "arama.arrow"))
+
+            # Toplam dosyası varsa detay grafiği oradan okunur; yoksa (Sheets, kurulmamış toplamlar) ham geçmiş saklanır
+            if seri_deposu(depo) is None:
+                gecmis = depo.oku(kolonlar=GECMIS_KOLONLARI)
+                _ipc_yaz(_tablo(gecmis[GECMIS_KOLONLARI].reset_index(drop=True)), os.path.join(gecici, "gecmis.arrow"))
+                alanlar["gecmis_satir"] = len(gecmis)
+            os.replace(gecici, dizin)
+        except BaseException:
+            shutil.rmtree(gecici, ignore_errors=True)
+            raise
+        guncel = {"surum": surum, "dizin": ad, "urun": len(ozet), "olusturma": datetime.now().isoformat(timespec="seconds")}
+        gecici_dosya = os.path.join(kok, f".guncel.{os.getpid()}.tmp")
+        with open(gecici_dosya, "w", encoding="utf-8") as f:
+            json.dump(guncel, f, ensure_ascii=False)
+        os.replace(gecici_dosya, os.path.join(kok, "guncel.json"))
+        alanlar.update(urun=len(ozet), dizin=ad)
+    eski_surumleri_temizle(kok)
+    return dizin
+
+def eski_surumleri_temizle(kok=ANLIK_DIZINI):
+    # Eşlemesi açık süreçler silinen dosyayı kapatana kadar okumaya devam eder (POSIX); Windows'ta silinemeyen atlanır
+    dizinler = sorted((d for d in os.listdir(kok) if os.path.isdir(os.path.join(kok, d)) and not d.startswith(".")), reverse=True)
+    for d in dizinler[SAKLANAN:]:
+        shutil.rmtree(os.path.join(kok, d), ignore_errors=True)
+
+# --- OKUMA (PANO SOĞUK BAŞLANGICI) ---
+def _okuma_hatasi(e):
+    print(f"⚠️ Anlık görüntü okunamadı, depodan yüklenecek: {e}")
+    olcum.say("migros_anlik_hata_toplam", aciklama="Okunamayan/yazılamayan anlık görüntü")
+
+class AnlikGoruntu:
+    # Bellek eşlemeli özet ve vitrin sorgu motoru açılışta (anlik_oku'nun hata yakalaması içinde) açılır;
+    # yalnızca toplam dosyası olmayan depoda kullanılan ham geçmiş ilk erişimde açılır
+    def __init__(self, dizin, surum=None):
+        self.dizin = dizin
+        self.surum = surum
+        tablo, meta = _ipc_oku(os.path.join(dizin, "ozet.arrow"))
+        # split_blocks: kolonlar tek blokta birleştirilmez, sayısal kolonlar eşlenen tamponu gösterir
+        self.ozet = tablo.to_pandas(split_blocks=True).set_index(meta.get("indeks", "Ürün ID"))
+        self.vitrin = self._vitrin_ac()
+
+    def _vitrin_ac(self):
+        tablo, meta = _ipc_oku(os.path.join(self.dizin, "vitrin.arrow"))
+        diziler = {ad: _dizi(tablo, ad) for ad in tablo.column_names}
+        for k in MANTIKSAL_DIZILER: diziler[k] = diziler[k].view(bool)
+        diziler.update(kategoriler=meta["kategoriler"], birim_sayisi=meta["birim_sayisi"])
+        tablo, _ = _ipc_oku(os.path.join(self.dizin, "arama.arrow"))
+        arama = {ad: _liste(tablo, ad) for ad in tablo.column_names}
+        arama = {ad: d.to_pylist() if pa.types.is_string(d.type) else d.to_numpy(zero_copy_only=True) for ad, d in arama.items()}
+        return VitrinSorgusu(self.ozet, AramaIndeksi.dizilerden(arama, self.ozet.index), diziler)
+
+    @cached_property
+    def gecmis(self):
+        # Toplam dosyası olan depoda yazılmaz; yoksa ya da okunamazsa None (pano depodan okur)
+        yol = os.path.join(self.dizin, "gecmis.arrow")
+        if not os.path.exists(yol): return None
+        try:
+            return _ipc_oku(yol)[0].to_pandas(split_blocks=True)
+        except OKUMA_HATALARI as e:
+            _okuma_hatasi(e)
+            return None
+
+def anlik_oku(surum=None, kok=ANLIK_DIZINI):
+    # `surum`la eşleşen (verilmezse sunulan) anlık görüntüyü açar; yoksa, kapalıysa ya da bozuksa None döner ve
+    # pano depodan normal yoldan yükler
+    if not ANLIK_AKTIF: return None
+    guncel = _json_oku(os.path.join(kok, "guncel.json"))
+    if not guncel or (surum is not None and guncel.get("surum") != surum): return None
+    try:
+        with olcum.sure_olc("migros_anlik_okuma_saniye", "Anlık görüntü açma süresi", gunluge="anlik_okuma") as alanlar:
+            alanlar["dizin"] = guncel["dizin"]
+            return AnlikGoruntu(os.path.join(kok, guncel["dizin"]), guncel.get("surum"))
+    except OKUMA_HATALARI as e:
+        _okuma_hatasi(e)
+        return None
+
+if __name__ == "__main__":
+    # Elle yeniden oluşturma (ör. `migros_depo.py --sheets-ice-aktar` sonrası); sürüm panonun son başarılı taramasıdır
+    parser = argparse.ArgumentParser(description="Pano anlık görüntüsü")
+    parser.add_argument("--yaz", action="store_true", help="Depodaki güncel veriden anlık görüntü yaz")
+    args = parser.parse_args()
+    if args.yaz:
+        from migros_depo import depo_olustur
+        from zamanlayici import durum_oku
+        depo = depo_olustur()
+        if depo is None: print("❌ Depo bağlantısı başarısız!")
+        else: print(f"💾 {anlik_yaz(depo, durum_oku().get('son_basarili'))}")
+    else:
+        parser.print_help()
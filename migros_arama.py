@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from bisect import bisect_left
+import re
+
+# --- TÜRKÇE NORMALİZASYON ---
+# Önce Türkçe büyük/küçük harf dönüşümü (İ→i, I→ı), sonra aksanlar sadeleştirilir: "IŞIK" ve "isik" aynı anahtara düşer
+_TR_KUCUK = str.maketrans({"İ": "i", "I": "ı"})
+_SADELESTIR = str.maketrans({"ı": "i", "ş": "s", "ğ": "g", "ü": "u", "ö": "o", "ç": "c", "â": "a", "î": "i", "û": "u", "\u0307": None})
+_AYRAC = re.compile(r"[^0-9a-z]+")
+
+# Puanlar: tam kelime > kelime başı (önek) > yazım hatası toleranslı eşleşme
+PUAN_TAM = 3.0
+PUAN_ONEK = 2.0
+PUAN_BULANIK = 1.0
+BULANIK_ADAY_SINIRI = 64
+
+def tr_normalize(metin):
+    if not isinstance(metin, str): return ""
+    metin = metin.translate(_TR_KUCUK).lower().translate(_SADELESTIR)
+    return _AYRAC.sub(" ", metin).strip()
+
+def kelimeler(metin):
+    return tr_normalize(metin).split()
+
+def _toplu_kelimeler(adlar):
+    # tr_normalize + split'in Arrow karşılığı; tek tek str.translate çağırmaktan çok daha hızlı
+    dizi = pa.array([a if isinstance(a, str) else "" for a in adlar], type=pa.string())
+    dizi = pc.replace_substring(dizi, "İ", "i")
+    dizi = pc.replace_substring(dizi, "I", "ı")
+    dizi = pc.utf8_lower(dizi)
+    for kaynak, hedef in [("ı", "i"), ("ş", "s"), ("ğ", "g"), ("ü", "u"), ("ö", "o"), ("ç", "c"), ("â", "a"), ("î", "i"), ("û", "u"), ("\u0307", "")]:
+        dizi = pc.replace_substring(dizi, kaynak, hedef)
+    dizi = pc.replace_substring_regex(dizi, _AYRAC.pattern, " ")
+    return pc.utf8_split_whitespace(dizi)
+
+def _trigramlar(kelime):
+    k = f"${kelime}$"
+    return {k[i:i + 3] for i in range(len(k) - 2)}
+
+def _izin_verilen_hata(kelime):
+    return 0 if len(kelime) < 4 else (1 if len(kelime) < 8 else 2)
+
+def _duzenleme_mesafesi(a, b, sinir):
+    # Sınırı aşınca erken çıkan Levenshtein
+    if abs(len(a) - len(b)) > sinir: return sinir + 1
+    onceki = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        simdiki = [i]
+        for j, cb in enumerate(b, 1):
+            simdiki.append(min(onceki[j] + 1, simdiki[j - 1] + 1, onceki[j - 1] + (ca != cb)))
+        if min(simdiki) > sinir: return sinir + 1
+        onceki = simdiki
+    return onceki[-1]
+
+# --- ARAMA İNDEKSİ ---
+class AramaIndeksi:
+    # Veri her yüklendiğinde bir kez kurulan ters indeks.
+    # Kelimeler sıralı tutulur ve posting listeleri aynı sırayla tek bir dizide birleştirilir;
+    # böylece bir önekle başlayan tüm kelimelerin ürünleri tek bir dilimdir.
+    def __init__(self, adlar, anahtarlar=None):
+        adlar = list(adlar)
+        self.anahtarlar = np.asarray(anahtarlar if anahtarlar is not None else range(len(adlar)), dtype=object)
+        self.uzunluklar = np.fromiter((len(a) if isinstance(a, str) else 0 for a in adlar), dtype=np.int32, count=len(adlar))
+
+        # Normalizasyon ve kelimelere ayırma tüm katalog için Arrow çekirdekleriyle vektörel yapılır
+        liste = _toplu_kelimeler(adlar)
+        uzunluk = pc.list_value_length(liste).fill_null(0).to_numpy(zero_copy_only=False)
+        ciftler = pd.DataFrame({"doc": np.repeat(np.arange(len(adlar), dtype=np.int32), uzunluk),
+                                "kelime": pc.list_flatten(liste).to_numpy(zero_copy_only=False)}).drop_duplicates()
+        ciftler = ciftler[ciftler["kelime"] != ""]
+        kodlar, sozluk = pd.factorize(ciftler["kelime"], sort=True)
+        sira = np.lexsort((ciftler["doc"].to_numpy(), kodlar))
+        self.sozluk = sozluk.tolist()
+        self.postingler = ciftler["doc"].to_numpy(np.int32)[sira]
+        self.ofsetler = np.concatenate([[0], np.cumsum(np.bincount(kodlar, minlength=len(self.sozluk)))])
+
+        # Yazım hatası toleransı için kelime trigram indeksi (sayılar hariç); postingler gibi tek dizi + ofsetler
+        trigram = {}
+        for kid, k in enumerate(self.sozluk):
+            if k.isdigit(): continue
+            for t in _trigramlar(k):
+                trigram.setdefault(t, []).append(kid)
+        anahtar = sorted(trigram)
+        self._trigram_kur(anahtar, np.concatenate([[0], np.cumsum([len(trigram[t]) for t in anahtar])]).astype(np.int64),
+                          np.fromiter((kid for t in anahtar for kid in trigram[t]), dtype=np.int32))
+
+    def _trigram_kur(self, trigramlar, ofsetler, kelimeler):
+        self.trigram_sirasi = dict(zip(trigramlar, range(len(trigramlar))))
+        self.trigram_ofsetleri = ofsetler
+        self.trigram_kelimeleri = kelimeler
+
+    def diziler(self):
+        # İndeksin kalıcı hale getirilebilir dizileri (bkz. `dizilerden`; anlık görüntü dosyasına yazılır)
+        return {"sozluk": self.sozluk, "postingler": self.postingler, "ofsetler": self.ofsetler,
+                "uzunluklar": self.uzunluklar, "trigramlar": list(self.trigram_sirasi),
+                "trigram_ofsetleri": self.trigram_ofsetleri, "trigram_kelimeleri": self.trigram_kelimeleri}
+
+    @classmethod
+    def dizilerden(cls, diziler, anahtarlar):
+        # Kaydedilmiş dizilerden yeniden kurmadan indeks (diziler kopyalanmaz; bellek eşlemli olabilir)
+        indeks = cls.__new__(cls)
+        indeks.anahtarlar = np.asarray(anahtarlar, dtype=object)
+        indeks.uzunluklar = diziler["uzunluklar"]
+        indeks.sozluk = list(diziler["sozluk"])
+        indeks.postingler = diziler["postingler"]
+        indeks.ofsetler = diziler["ofsetler"]
+        indeks._trigram_kur(list(diziler["trigramlar"]), diziler["trigram_ofsetleri"], diziler["trigram_kelimeleri"])
+        return indeks
+
+    def __len__(self):
+        return len(self.anahtarlar)
+
+    def _onek_araligi(self, onek):
+        bas = bisect_left(self.sozluk, onek)
+        son = bisect_left(self.sozluk, onek + "\uffff", lo=bas)
+        return bas, son
+
+    def _bulanik_kelimeler(self, kelime):
+        sinir = _izin_verilen_hata(kelime)
+        if not sinir: return []
+        sira = [self.trigram_sirasi[t] for t in _trigramlar(kelime) if t in self.trigram_sirasi]
+        listeler = [self.trigram_kelimeleri[self.trigram_ofsetleri[i]:self.trigram_ofsetleri[i + 1]] for i in sira]
+        if not listeler: return []
+        sayilar = np.bincount(np.concatenate(listeler), minlength=len(self.sozluk))
+        # En çok trigram paylaşan adaylar, sonra gerçek düzenleme mesafesi
+        adaylar = np.argsort(-sayilar, kind="stable")[:BULANIK_ADAY_SINIRI]
+        return [int(k) for k in adaylar if sayilar[k] and _duzenleme_mesafesi(kelime, self.sozluk[k], sinir) <= sinir]
+
+    def ara(self, sorgu, limit=None):
+        # Tüm sorgu kelimelerini içeren ürünlerin anahtarlarını puana göre sıralı döndürür
+        sorgu_kelimeleri = kelimeler(sorgu)
+        if not sorgu_kelimeleri or not len(self): return []
+        n = len(self)
+        toplam = np.zeros(n, dtype=np.float32)
+        eslesen = None
+        for kelime in sorgu_kelimeleri:
+            puan = np.zeros(n, dtype=np.float32)
+            for kid in self._bulanik_kelimeler(kelime):
+                puan[self.postingler[self.ofsetler[kid]:self.ofsetler[kid + 1]]] = PUAN_BULANIK
+            bas, son = self._onek_araligi(kelime)
+            if son > bas:
+                dilim = self.postingler[self.ofsetler[bas]:self.ofsetler[son]]
+                puan[dilim] = PUAN_ONEK
+                if self.sozluk[bas] == kelime:
+                    puan[self.postingler[self.ofsetler[bas]:self.ofsetler[bas + 1]]] = PUAN_TAM
+            bulunan = puan > 0
+            eslesen = bulunan if eslesen is None else eslesen & bulunan
+            toplam += puan
+        idx = np.flatnonzero(eslesen)
+        # Yüksek puan önce; eşitlikte kısa (daha özgül) ad önce
+        anahtar = self.uzunluklar[idx].astype(np.int64) - (toplam[idx] * 65536).astype(np.int64)
+        idx = idx[np.argsort(anahtar, kind="stable")]
+        if limit: idx = idx[:limit]
+        return self.anahtarlar[idx].tolist()
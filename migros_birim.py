@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# --- MİKTAR / BİRİM AYRIŞTIRMA ---
+# Ürün adındaki miktar bilgisi tüm parti için Arrow (RE2) çekirdekleriyle tek geçişte çıkarılır.
+# Miktarlar taban birime çevrilir: ağırlık KG, hacim L, sayılan ürünler ADET.
+OLCULER = {
+    "kg": ("KG", 1.0), "kilo": ("KG", 1.0), "gr": ("KG", 0.001), "gram": ("KG", 0.001), "g": ("KG", 0.001),
+    "lt": ("L", 1.0), "litre": ("L", 1.0), "l": ("L", 1.0), "ml": ("L", 0.001), "cl": ("L", 0.01),
+}
+# "1.000 Gr" gibi noktalı binlik gruplar ondalıktan önce denenir ("0.750 L" ve "1,5 L" ondalıktır)
+_BINLIK = r"[1-9]\d{0,2}(?:\.\d{3})+"
+_SAYI = rf"(?P<miktar>{_BINLIK}|\d+(?:[.,]\d+)?)"
+_OLCU = r"(?P<olcu>kg|kilo|gram|gr|g|litre|lt|ml|cl|l)"
+# RE2'de \b yalnızca ASCII; "lü" gibi eklerden sonra da çalışsın, "3 lü" de "3 l" diye okunmasın diye
+_SON = r"(?:[^a-z0-9çğöşü]|$)"
+# "6'lı", "6 lı", "32li" (ı, _kucult'ta i'ye çevrilir)
+_ADET_EKI = r"(?:['’`]\s*)?(?:li|lu|lü)"
+# Öncelik sırasıyla denenir; bir satır ilk eşleşen desenle çözülür
+DESENLER = [
+    # "6x200 ml", "4 x 1,5 L", "10x17,5 gr"
+    ("coklu", rf"(?P<adet>\d+)\s*[x×*]\s*{_SAYI}\s*{_OLCU}{_SON}"),
+    # "330 Ml 6'lı", "1 L 4 lü", "200 ml x 6"
+    ("sonda_coklu", rf"{_SAYI}\s*{_OLCU}\s*(?P<adet>\d+)\s*{_ADET_EKI}{_SON}"),
+    ("sonda_carpi", rf"{_SAYI}\s*{_OLCU}\s*[x×*]\s*(?P<adet>\d+){_SON}"),
+    # "500 Gr", "1,5 L", "2 Kg"
+    ("olcu", rf"{_SAYI}\s*{_OLCU}{_SON}"),
+    # "20'li", "10'lu", "3'lü", "32 li", "12 adet"
+    ("adet", rf"(?P<adet>\d+)\s*(?:{_ADET_EKI}|adet|ad\.){_SON}"),
+]
+
+def _kucult(adlar):
+    # Türkçe büyük harfler (İ, I) dahil küçük harfe çevir; ayrıştırma için ı/i ayrımı gereksiz
+    dizi = pa.array(pd.Series(adlar).astype(object), type=pa.string(), from_pandas=True).fill_null("")
+    dizi = pc.utf8_lower(pc.replace_substring(dizi, "İ", "i"))
+    return pc.replace_substring(dizi, "ı", "i")
+
+def _sayiya(dizi):
+    # Türkçe yazım: nokta binlik ayırıcı (yalnızca tam üçlü gruplarda), virgül ondalık
+    binlik = pc.match_substring_regex(dizi, f"^{_BINLIK}$")
+    dizi = pc.if_else(binlik, pc.replace_substring(dizi, ".", ""), dizi)
+    return pc.cast(pc.replace_substring(dizi, ",", "."), pa.float64()).to_numpy(zero_copy_only=False)
+
+def birimleri_coz(adlar):
+    # Ürün adlarından (taban birimde miktar, birim) çerçevesi; çözülemeyen adlarda miktar NaN, birim None
+    dizi = _kucult(adlar)
+    n = len(dizi)
+    miktar = np.full(n, np.nan)
+    birim = np.full(n, None, dtype=object)
+    kalan = np.ones(n, dtype=bool)
+    for _, desen in DESENLER:
+        if not kalan.any(): break
+        sonuc = pc.extract_regex(dizi, desen)
+        eslesen = sonuc.is_valid().to_numpy(zero_copy_only=False) & kalan
+        if not eslesen.any(): continue
+        secili = sonuc.filter(pa.array(eslesen))
+        alanlar = {secili.type.field(i).name: secili.field(i) for i in range(secili.type.num_fields)}
+        adet = _sayiya(alanlar["adet"]) if "adet" in alanlar else np.ones(len(secili))
+        if "olcu" in alanlar:
+            olcu = pd.Series(alanlar["olcu"].to_numpy(zero_copy_only=False))
+            carpan = olcu.map({k: v[1] for k, v in OLCULER.items()}).to_numpy(dtype=float)
+            miktar[eslesen] = adet * _sayiya(alanlar["miktar"]) * carpan
+            birim[eslesen] = olcu.map({k: v[0] for k, v in OLCULER.items()}).to_numpy(dtype=object)
+        else:
+            miktar[eslesen] = adet
+            birim[eslesen] = "ADET"
+        kalan &= ~eslesen
+    # "0 gr" gibi anlamsız miktarlar çözülmemiş sayılır
+    gecersiz = ~(miktar > 0)
+    miktar[gecersiz] = np.nan
+    birim[gecersiz] = None
+    index = adlar.index if isinstance(adlar, pd.Series) else None
+    return pd.DataFrame({"Miktar": miktar, "Birim": birim}, index=index)
+
+def birim_fiyati_hesapla(df, sadece_eksik=False):
+    # "Birim" (KG/L/ADET) ve "Birim Fiyat" (₺/kg, ₺/L, ₺/adet) kolonlarını Satış Fiyatı ve adlardan doldurur.
+    # Miktarı okunamayan ürünlerde birim ADET, birim fiyat NaN olur.
+    # `sadece_eksik=True` yalnızca hiç hesaplanmamış (0) satırları işler (eski kayıtlar).
+    if df.empty or "Ürün Adı" not in df.columns: return df
+    hedef = pd.Series(True, index=df.index)
+    if sadece_eksik and "Birim Fiyat" in df.columns:
+        hedef = pd.to_numeric(df["Birim Fiyat"], errors="coerce").fillna(-1).eq(0)
+        if not hedef.any(): return df
+    df = df.copy()
+    cozum = birimleri_coz(df.loc[hedef, "Ürün Adı"])
+    fiyat = pd.to_numeric(df.loc[hedef, "Satış Fiyatı"], errors="coerce").astype("float64")
+    birim_fiyat = (fiyat / cozum["Miktar"]).astype("float32")
+    birim = cozum["Birim"].fillna("ADET")
+    if hedef.all():
+        df["Birim Fiyat"] = birim_fiyat
+        df["Birim"] = birim.astype("category") if isinstance(df.get("Birim", pd.Series()).dtype, pd.CategoricalDtype) else birim
+    else:
+        df["Birim Fiyat"] = pd.to_numeric(df["Birim Fiyat"], errors="coerce").astype("float32")
+        df.loc[hedef, "Birim Fiyat"] = birim_fiyat
+        kategorik = isinstance(df["Birim"].dtype, pd.CategoricalDtype)
+        df["Birim"] = df["Birim"].astype(object)
+        df.loc[hedef, "Birim"] = birim
+        if kategorik: df["Birim"] = df["Birim"].astype("category")
+    return df
+
+BIRIM_ETIKETLERI = {"KG": "kg", "L": "L", "ADET": "adet"}
+
+def birim_fiyat_metni(birim_fiyat, birim):
+    # Kartlarda gösterilecek "₺/kg" metni; hesaplanamadıysa boş
+    if birim_fiyat is None or pd.isna(birim_fiyat) or not birim_fiyat: return ""
+    return f"{birim_fiyat:.2f} ₺/{BIRIM_ETIKETLERI.get(str(birim), str(birim).lower())}"
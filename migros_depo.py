@@ -0,0 +1,651 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+from collections import deque
+from datetime import datetime
+import numpy as np
+import argparse
+import migros_olcum as olcum
+from migros_birim import birim_fiyati_hesapla
+import uuid
+import re
+import os
+
+# --- DEPO AYARLARI ---
+DEPO_DIZINI = os.environ.get("MIGROS_DEPO_DIZINI", "veri")
+DEPO_TURU = os.environ.get("MIGROS_DEPO", "parquet")               # parquet | artimli | sheets
+SHEETS_AKTAR = os.environ.get("MIGROS_SHEETS_AKTAR", "1") == "1"   # kimlik bilgisi yoksa zaten atlanır
+
+KOLONLAR = ["Tarih", "Ürün Adı", "Etiket Fiyatı", "Satış Fiyatı", "İndirim Tipi", "İndirim %", "Durum", "Stok", "Birim Fiyat", "Birim", "Kategori", "Resim", "Link", "Ürün ID"]
+FIYAT_KOLONLARI = ["Etiket Fiyatı", "Satış Fiyatı", "İndirim %", "Birim Fiyat"]
+KATEGORIK_KOLONLAR = ["Durum", "Stok", "Birim"]
+TEKRARLI_METIN_KOLONLARI = ["Ürün Adı", "İndirim Tipi", "Resim", "Link", "Ürün ID"]
+SAYI_DESENI = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+# Parquet dosyalarının şeması. Kategori dosyada değil, bölüm dizininde (Kategori=slug) tutulur.
+SEMA = pa.schema([
+    ("Tarih", pa.timestamp("s")),
+    ("Ürün Adı", pa.string()),
+    ("Etiket Fiyatı", pa.float32()),
+    ("Satış Fiyatı", pa.float32()),
+    ("İndirim Tipi", pa.string()),
+    ("İndirim %", pa.float32()),
+    ("Durum", pa.dictionary(pa.int32(), pa.string())),
+    ("Stok", pa.dictionary(pa.int32(), pa.string())),
+    ("Birim Fiyat", pa.float32()),
+    ("Birim", pa.dictionary(pa.int32(), pa.string())),
+    ("Resim", pa.string()),
+    ("Link", pa.string()),
+    ("Ürün ID", pa.string()),
+])
+BOLUM_SEMASI = pa.schema([("tarih", pa.string()), ("Kategori", pa.string())])
+BOLUMLEME = ds.partitioning(BOLUM_SEMASI, flavor="hive")
+# Eski dosyalarda olmayan kolonlar (ör. Ürün ID) okurken boş gelir
+VERI_SEMASI = pa.schema(list(SEMA) + list(BOLUM_SEMASI))
+
+# --- GOOGLE SHEETS ---
+def google_sheets_baglan():
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+    try:
+        import streamlit as st
+        creds_dict = dict(st.secrets["gcp_service_account"])
+        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+    except:
+        if os.path.exists("secrets.json"):
+            creds = ServiceAccountCredentials.from_json_keyfile_name("secrets.json", scope)
+        else:
+            return None
+    client = gspread.authorize(creds)
+    return client.open("Migros_Takip_DB")
+
+def tr_format(sayi):
+    if sayi is None: return "0"
+    if pd.isna(sayi): return ""
+    return f"{float(sayi):.2f}".replace('.', ',')
+
+def fiyat_kolonunu_coz(seri):
+    # "1.234,56 TL" biçimli metin kolonunu Arrow çekirdekleriyle vektörel olarak float32'ye çevirir.
+    # Boş hücre 0.0 olur; okunamayan değerler NaN kalır ve sayıları döndürülür.
+    metin = pa.array(seri.astype(object), type=pa.string(), from_pandas=True)
+    metin = pc.utf8_trim_whitespace(pc.replace_substring(pc.replace_substring(metin, "TL", ""), "₺", ""))
+    bos = pc.fill_null(pc.equal(metin, ""), True)
+    metin = pc.replace_substring(pc.replace_substring(metin, ".", ""), ",", ".")
+    gecerli = pc.fill_null(pc.match_substring_regex(metin, SAYI_DESENI), False)
+    sayi = pc.cast(pc.if_else(gecerli, metin, pa.scalar(None, pa.string())), pa.float64())
+    sayi = pc.if_else(bos, 0.0, sayi)
+    hatali = int(pc.sum(pc.invert(pc.or_(gecerli, bos))).as_py() or 0)
+    return pd.Series(sayi.to_numpy(zero_copy_only=False), index=seri.index, dtype="float32"), hatali
+
+def tarih_kolonunu_coz(seri):
+    # Önce tarayıcının yazdığı sabit biçim (hızlı yol), tutmayanlar için genel ayrıştırıcı
+    metin = seri.astype("string").str.strip()
+    tarih = pd.to_datetime(metin, format="%Y-%m-%d %H:%M", errors="coerce")
+    kalan = tarih.isna() & metin.notna() & (metin != "")
+    if kalan.any():
+        tarih = tarih.mask(kalan, pd.to_datetime(metin[kalan], format="mixed", errors="coerce"))
+    hatali = int((tarih.isna() & metin.notna() & (metin != "")).sum())
+    return tarih, hatali
+
+def linkleri_duzelt(seri):
+    # ".../urun-p-1c3a2f-123" sonundaki fazlalığı atar; metin olmayan linkler "#" olur
+    link = seri.astype("string").str.strip()
+    return link.str.replace(r"^(.*-p-[a-z0-9]+)-\d+$", r"\1", regex=True).fillna("#")
+
+def urun_kodu_cikar(link):
+    # ".../urun-adi-p-1c3a2f" linkinden sabit ürün kodunu (1c3a2f) çıkarır
+    if not isinstance(link, str): return ""
+    kodlar = re.findall(r"-p-([a-z0-9]+)", link)
+    return kodlar[-1] if kodlar else ""
+
+def urun_id_doldur(df):
+    # Ürün ID'si olmayan (eski) satırlar için kodu linkten türetir, o da yoksa linkin kendisini kullanır
+    if "Link" not in df.columns: return df
+    linkler = pc.fill_null(pa.array(df["Link"].astype(object), type=pa.string(), from_pandas=True), "")
+    kodlar = pc.struct_field(pc.extract_regex(linkler, r".*-p-(?P<kod>[a-z0-9]+)"), [0])
+    kodlar = pd.Series(pc.coalesce(kodlar, linkler).to_numpy(zero_copy_only=False), index=df.index)
+    mevcut = df["Ürün ID"] if "Ürün ID" in df.columns else pd.Series(np.nan, index=df.index)
+    bos = mevcut.isna() | (mevcut.astype(str) == "")
+    if bos.any():
+        df = df.copy()
+        df["Ürün ID"] = mevcut.astype(object).where(~bos, kodlar)
+    return df
+
+# --- TİP DÖNÜŞÜMLERİ ---
+def satirlari_cerceveye(satirlar):
+    # Tarayıcının ürettiği KOLONLAR sıralı satırları tipli bir DataFrame'e çevirir
+    return tiplere_cevir(birim_fiyati_hesapla(pd.DataFrame(satirlar, columns=KOLONLAR)))
+
+def tiplere_cevir(df):
+    df = df.copy()
+    for c in FIYAT_KOLONLARI:
+        if c in df.columns: df[c] = pd.to_numeric(df[c], errors='coerce').astype("float32")
+    if "Tarih" in df.columns: df["Tarih"] = pd.to_datetime(df["Tarih"], errors='coerce').astype("datetime64[s]")
+    for c in KATEGORIK_KOLONLAR + ["Kategori"]:
+        if c in df.columns: df[c] = df[c].astype(str).astype("category")
+    return df
+
+def sheets_cercevesi(data):
+    # get_all_values() çıktısını (ilk satır başlık) tipli DataFrame'e çevirir
+    if not data: return pd.DataFrame()
+    headers = data.pop(0)
+    # Satır listesini kolon kolon kurmak 2 boyutlu object dizisinden geçmekten çok daha hızlı
+    kolonlar = [str(h).strip() for h in headers]
+    genislik = len(kolonlar)
+    if any(len(satir) != genislik for satir in data):
+        data = [satir[:genislik] + [""] * (genislik - len(satir)) for satir in data]
+    sutunlar = list(zip(*data)) or [()] * genislik
+    df = pd.DataFrame({k: pd.array(v, dtype="string") for k, v in zip(kolonlar, sutunlar)})
+    hatalar = {}
+    for c in FIYAT_KOLONLARI:
+        if c in df.columns: df[c], hatalar[c] = fiyat_kolonunu_coz(df[c])
+    if "Tarih" in df.columns: df["Tarih"], hatalar["Tarih"] = tarih_kolonunu_coz(df["Tarih"])
+    if "Link" in df.columns: df["Link"] = linkleri_duzelt(df["Link"])
+    # Birim fiyatı hiç hesaplanmamış (0) eski satırlar addan doldurulur
+    df = tiplere_cevir(birim_fiyati_hesapla(urun_id_doldur(df), sadece_eksik=True))
+    # Geçmişte her taramada tekrar eden metinler sözlük kodlu tutulur
+    for c in TEKRARLI_METIN_KOLONLARI:
+        if c in df.columns: df[c] = df[c].astype("category")
+    # Okunamayan değerler sessizce 0.0 yapılmaz, sayıları raporlanır
+    df.attrs["hatali_degerler"] = {c: n for c, n in hatalar.items() if n}
+    if df.attrs["hatali_degerler"]:
+        print(f"⚠️ Okunamayan değerler: {df.attrs['hatali_degerler']}")
+    return df
+
+def sheets_satirlari(df):
+    # Tipli DataFrame'i Sheets'e yazılacak eski metin formatına çevirir
+    df = df.reindex(columns=KOLONLAR)
+    satirlar = []
+    for kayit in df.itertuples(index=False):
+        satir = []
+        for kolon, deger in zip(KOLONLAR, kayit):
+            if kolon == "Tarih": satir.append(pd.Timestamp(deger).strftime("%Y-%m-%d %H:%M") if pd.notna(deger) else "")
+            elif kolon in FIYAT_KOLONLARI: satir.append(tr_format(deger))
+            else: satir.append("" if pd.isna(deger) else str(deger))
+        satirlar.append(satir)
+    return satirlar
+
+# --- YEREL KOLONSAL DEPO (PARQUET) ---
+def parquet_atomik_yaz(tablo, yol, satir_grubu=None):
+    # Önce gizli geçici dosyaya yaz, sonra atomik olarak yeniden adlandır (okuyucular yarım dosya görmez)
+    dizin, ad = os.path.split(yol)
+    gecici = os.path.join(dizin, f".{ad}.{uuid.uuid4().hex}.tmp")
+    pq.write_table(tablo, gecici, compression="zstd", row_group_size=satir_grubu)
+    os.replace(gecici, yol)
+
+def bolumlere_yaz(df, kok, ad=None):
+    # tarih=YYYY-MM-DD/Kategori=<slug>/part-<uuid>.parquet düzeninde yeni dosyalar ekler.
+    # `ad` verilirse dosya adı part-<ad>.parquet olur: aynı yazımı tekrarlamak dosyaların üzerine yazar (tekrar güvenli)
+    gunler = df["Tarih"].dt.strftime("%Y-%m-%d")
+    for (gun, kat), parca in df.groupby([gunler, df["Kategori"].astype(str)], sort=False):
+        dizin = os.path.join(kok, f"tarih={gun}", f"Kategori={kat}")
+        os.makedirs(dizin, exist_ok=True)
+        tablo = pa.Table.from_pandas(parca[SEMA.names], schema=SEMA, preserve_index=False)
+        parquet_atomik_yaz(tablo, os.path.join(dizin, f"part-{ad or uuid.uuid4().hex}.parquet"))
+
+def bolumlerden_oku(kok, kolonlar=None, baslangic=None, bitis=None, kategoriler=None):
+    # Sadece istenen kolonları ve tarih/kategori bölümlerini okur
+    kolonlar = list(kolonlar) if kolonlar else KOLONLAR
+    if not os.path.isdir(kok): return pd.DataFrame(columns=kolonlar)
+    veri = ds.dataset(kok, format="parquet", schema=VERI_SEMASI, partitioning=BOLUMLEME)
+    filtre = None
+    def ekle(f):
+        nonlocal filtre
+        filtre = f if filtre is None else filtre & f
+    if baslangic is not None:
+        baslangic = pd.Timestamp(baslangic)
+        ekle(ds.field("tarih") >= baslangic.strftime("%Y-%m-%d"))
+        ekle(ds.field("Tarih") >= pa.scalar(baslangic.to_pydatetime(), pa.timestamp("s")))
+    if bitis is not None:
+        bitis = pd.Timestamp(bitis)
+        ekle(ds.field("tarih") <= bitis.strftime("%Y-%m-%d"))
+        ekle(ds.field("Tarih") <= pa.scalar(bitis.to_pydatetime(), pa.timestamp("s")))
+    if kategoriler:
+        ekle(ds.field("Kategori").isin(list(kategoriler)))
+    tablo = veri.to_table(columns=kolonlar, filter=filtre)
+    if "Ürün ID" in kolonlar and tablo.column("Ürün ID").null_count:
+        # ID kolonundan önceki dosyalar: kimliği linkten türetmek için Link de okunur
+        ekli = list(dict.fromkeys(kolonlar + ["Link"]))
+        df = urun_id_doldur(veri.to_table(columns=ekli, filter=filtre).to_pandas())[kolonlar]
+    else:
+        df = tablo.to_pandas()
+    if "Kategori" in df.columns: df["Kategori"] = df["Kategori"].astype("category")
+    return df
+
+# --- ÜRÜN ÖZETİ (SON + ÖNCEKİ FİYAT İNDEKSİ) ---
+# Vitrin ve detay sayfası tüm geçmişi sıralamak yerine bu ürün başına tek satırlık tablodan okur
+OZET_BILGI_KOLONLARI = ["Ürün Adı", "Etiket Fiyatı", "Satış Fiyatı", "İndirim Tipi", "İndirim %", "Durum", "Stok", "Birim Fiyat", "Birim", "Kategori", "Resim", "Link"]
+OZET_KOLONLARI = OZET_BILGI_KOLONLARI + ["Önceki Fiyat", "Fiyat Farkı", "En Düşük", "Ortalama", "Toplam", "Gözlem", "İlk Görülme", "Son Görülme"]
+
+def bos_ozet():
+    ozet = pd.DataFrame(columns=OZET_KOLONLARI)
+    ozet.index.name = "Ürün ID"
+    return ozet
+
+def ozet_hesapla(gecmis):
+    # Tüm geçmişten özet tablosunu baştan kurar (ilk kurulum / Sheets deposu için)
+    if gecmis.empty: return bos_ozet()
+    g = urun_id_doldur(gecmis).sort_values(["Ürün ID", "Tarih"], kind="stable")
+    grup = g.groupby("Ürün ID", sort=False)
+    g["Önceki Fiyat"] = grup["Satış Fiyatı"].shift(1)
+    ozet = g.drop_duplicates("Ürün ID", keep="last").set_index("Ürün ID")
+    ozet = ozet.reindex(columns=OZET_BILGI_KOLONLARI + ["Önceki Fiyat"])
+    istatistik = grup.agg(**{"En Düşük": ("Satış Fiyatı", "min"), "Toplam": ("Satış Fiyatı", "sum"),
+                             "Gözlem": ("Satış Fiyatı", "size"), "İlk Görülme": ("Tarih", "min"),
+                             "Son Görülme": ("Tarih", "max")})
+    ozet = ozet.join(istatistik)
+    ozet["Fiyat Farkı"] = ozet["Satış Fiyatı"] - ozet["Önceki Fiyat"]
+    ozet["Ortalama"] = ozet["Toplam"] / ozet["Gözlem"]
+    return ozet[OZET_KOLONLARI]
+
+def ozet_guncelle(ozet, yeni):
+    # Yeni taranan satırları özete O(yeni satır) maliyetle işler; aynı satırı tekrar işlemek özeti değiştirmez
+    if yeni is None or yeni.empty: return ozet
+    yeni = urun_id_doldur(yeni).sort_values("Tarih", kind="stable").drop_duplicates("Ürün ID", keep="last").set_index("Ürün ID")
+    eski = ozet.reindex(yeni.index)
+    ileri = ~(yeni["Tarih"] <= eski["Son Görülme"])
+    yeni, eski = yeni[ileri], eski[ileri]
+    if yeni.empty: return ozet
+    satir = yeni.reindex(columns=OZET_BILGI_KOLONLARI).copy()
+    fiyat = yeni["Satış Fiyatı"].astype("float64")
+    satir["Önceki Fiyat"] = pd.to_numeric(eski["Satış Fiyatı"], errors='coerce')
+    satir["Fiyat Farkı"] = fiyat - satir["Önceki Fiyat"]
+    satir["En Düşük"] = np.fmin(pd.to_numeric(eski["En Düşük"], errors='coerce'), fiyat)
+    satir["Toplam"] = pd.to_numeric(eski["Toplam"], errors='coerce').fillna(0) + fiyat
+    satir["Gözlem"] = pd.to_numeric(eski["Gözlem"], errors='coerce').fillna(0).astype("int64") + 1
+    satir["Ortalama"] = satir["Toplam"] / satir["Gözlem"]
+    satir["İlk Görülme"] = pd.to_datetime(eski["İlk Görülme"]).fillna(yeni["Tarih"])
+    satir["Son Görülme"] = yeni["Tarih"]
+    satir = satir.astype({c: str for c in ["Kategori"] + KATEGORIK_KOLONLAR})
+    parcalar = [ozet[~ozet.index.isin(satir.index)], satir]
+    ozet = pd.concat([p for p in parcalar if not p.empty])
+    ozet.index.name = "Ürün ID"
+    return ozet[OZET_KOLONLARI]
+
+def ozet_tiplerini_duzelt(ozet):
+    ozet = tiplere_cevir(ozet)
+    for c in ["Önceki Fiyat", "Fiyat Farkı", "En Düşük", "Ortalama", "Toplam"]:
+        ozet[c] = pd.to_numeric(ozet[c], errors='coerce')
+    ozet["Gözlem"] = pd.to_numeric(ozet["Gözlem"], errors='coerce').fillna(0).astype("int64")
+    for c in ["İlk Görülme", "Son Görülme"]:
+        ozet[c] = pd.to_datetime(ozet[c])
+    return ozet
+
+class ParquetDepo:
+    # Yalnızca ekleme yapılan, tarama tarihi ve kategoriye göre bölümlenmiş yerel depo:
+    #   veri/gecmis/tarih=2026-10-18/Kategori=meyve-sebze-c-2/part-<uuid>.parquet
+    #   veri/ozet.parquet   ürün başına son/önceki fiyat, en düşük, ortalama, ilk/son görülme
+    def __init__(self, dizin=DEPO_DIZINI):
+        self.dizin = dizin
+        self.gecmis_dizini = os.path.join(dizin, "gecmis")
+        self.ozet_yolu = os.path.join(dizin, "ozet.parquet")
+        self._ozet = None
+        self._ozet_kirli = False  # bellekte güncellenip henüz diske yazılmamış özet
+
+    def ozet(self):
+        if self._ozet is None:
+            if os.path.exists(self.ozet_yolu):
+                self._ozet = birim_fiyati_hesapla(ozet_tiplerini_duzelt(pd.read_parquet(self.ozet_yolu)), sadece_eksik=True)
+            elif os.path.isdir(self.gecmis_dizini) or os.path.isdir(getattr(self, "olay_dizini", "")):
+                # Özetten önce oluşturulmuş depo: bir kez geçmişten kurup kaydet
+                self._ozet = ozet_hesapla(self.oku())
+                self._ozeti_kaydet()
+            else:
+                self._ozet = bos_ozet()
+        return self._ozet
+
+    def _ozeti_kaydet(self):
+        os.makedirs(self.dizin, exist_ok=True)
+        ozet = self._ozet.astype({c: str for c in ["Kategori"] + KATEGORIK_KOLONLAR})
+        parquet_atomik_yaz(pa.Table.from_pandas(ozet), self.ozet_yolu)
+
+    def ozeti_guncelle(self, df, kaydet=True):
+        self._ozet = ozet_tiplerini_duzelt(ozet_guncelle(self.ozet(), df))
+        self._ozet_kirli = True
+        if kaydet: self.kaydet()
+
+    def kaydet(self):
+        # Bellekteki güncellemeleri diske yazar (değişiklik yoksa bir şey yapmaz)
+        if self._ozet_kirli:
+            self._ozeti_kaydet()
+            self._ozet_kirli = False
+
+    def yaz(self, df, ad=None, kaydet=True):
+        # Kalıcı hale getirilen satırları döndürür. `kaydet=False` ise özet yalnızca bellekte güncellenir ve
+        # `kaydet()` çağrılana kadar diske yazılmaz (toplu yazıcı her partide tüm özeti yeniden yazmasın diye)
+        if df is None or df.empty: return df
+        df = tiplere_cevir(urun_id_doldur(df))
+        bolumlere_yaz(df, self.gecmis_dizini, ad)
+        self.ozeti_guncelle(df, kaydet)
+        return df
+
+    def oku(self, kolonlar=None, baslangic=None, bitis=None, kategoriler=None):
+        return bolumlerden_oku(self.gecmis_dizini, kolonlar, baslangic, bitis, kategoriler)
+
+# --- ARTIMLI (SADECE DEĞİŞİKLİK) DEPO ---
+# Bu kolonlardan biri değişmedikçe yeni satır yazılmaz
+DEGISIM_KOLONLARI = ["Satış Fiyatı", "Etiket Fiyatı", "İndirim Tipi", "Durum", "Stok"]
+
+def urun_anahtari(df):
+    return urun_id_doldur(df)["Ürün ID"].astype(str)
+
+def zaman_serisi_olustur(olaylar, durum):
+    # Değişim olaylarından tam zaman serisini kurar: her ürünün son durumu "Son Görülme" anına kadar geçerlidir,
+    # bu yüzden son olayından sonra da görülen ürünlere o andan bir kapanış noktası eklenir.
+    if durum.empty: return olaylar
+    son_olay = olaylar.groupby(urun_anahtari(olaylar).values)["Tarih"].max()
+    # Aralıkta hiç olay yoksa (ya da bellekteki durum nesne tipindeyse) karşılaştırma tarih tipinde yapılmalı
+    son_olay = pd.to_datetime(son_olay.reindex(durum.index))
+    uzayan = durum.index[~(pd.to_datetime(durum["Son Görülme"]).values <= son_olay.values)]
+    if not len(uzayan): return olaylar
+    kapanis = durum.loc[uzayan].copy()
+    kapanis["Tarih"] = kapanis["Son Görülme"]
+    kapanis = tiplere_cevir(kapanis.reset_index(drop=True)[[c for c in olaylar.columns if c in kapanis.columns]])
+    seri = pd.concat([olaylar, kapanis], ignore_index=True)
+    for c in ["Kategori"] + KATEGORIK_KOLONLAR:
+        if c in seri.columns: seri[c] = seri[c].astype("category")
+    return seri
+
+class ArtimliDepo(ParquetDepo):
+    # Her ürünün bilinen son durumunu tutar ve yalnızca fiyat/rozet/durum değiştiğinde olay satırı yazar.
+    # "Hâlâ görülüyor" bilgisi olay yerine durum tablosundaki "Son Görülme" zaman damgasında tutulur.
+    #   veri/olaylar/tarih=.../Kategori=.../part-<uuid>.parquet   değişim olayları
+    #   veri/durum.parquet                                       ürün başına son durum
+    def __init__(self, dizin=DEPO_DIZINI):
+        super().__init__(dizin)
+        self.olay_dizini = os.path.join(dizin, "olaylar")
+        self.durum_yolu = os.path.join(dizin, "durum.parquet")
+        self._durum = None
+        self._durum_kirli = False
+
+    def durum(self):
+        if self._durum is None:
+            if os.path.exists(self.durum_yolu):
+                self._durum = pd.read_parquet(self.durum_yolu)
+                # Ürün ID'den önce Link ile anahtarlanmış durum dosyaları
+                self._durum.index = urun_anahtari(self._durum).values
+                self._durum.index.name = "Anahtar"
+            else:
+                self._durum = pd.DataFrame(columns=KOLONLAR[1:] + ["İlk Görülme", "Son Görülme"])
+                self._durum.index.name = "Anahtar"
+        return self._durum
+
+    def degisimleri_ayikla(self, df):
+        # Son bilinen duruma göre yeni veya değişmiş ürün satırlarını döndürür
+        durum = self.durum()
+        anahtar = urun_anahtari(df)
+        onceki = durum.reindex(anahtar.values)
+        yeni = onceki["Son Görülme"].isna().values
+        degisti = yeni.copy()
+        for c in DEGISIM_KOLONLARI:
+            once, simdi = onceki[c].values, df[c].values
+            if c in FIYAT_KOLONLARI:
+                fark = pd.to_numeric(pd.Series(once), errors='coerce').values - simdi.astype("float64")
+                degisti |= ~(abs(fark) < 0.005)
+            else:
+                degisti |= pd.Series(once).astype(str).values != pd.Series(simdi).astype(str).values
+        return df[degisti]
+
+    def durumu_guncelle(self, df, kaydet=True):
+        durum = self.durum()
+        yeni = df.drop(columns=["Tarih"]).astype({c: str for c in ["Kategori"] + KATEGORIK_KOLONLAR})
+        yeni.index = urun_anahtari(df).values
+        yeni = yeni[~yeni.index.duplicated(keep="last")]
+        yeni["Son Görülme"] = df.groupby(urun_anahtari(df).values)["Tarih"].max().reindex(yeni.index).values
+        yeni["İlk Görülme"] = durum["İlk Görülme"].reindex(yeni.index).fillna(yeni["Son Görülme"]).values
+        durum = pd.concat([durum[~durum.index.isin(yeni.index)], yeni])
+        durum.index.name = "Anahtar"
+        self._durum = durum
+        self._durum_kirli = True
+        if kaydet: self.kaydet()
+
+    def kaydet(self):
+        # Önce durum, sonra özet (olaylar zaten yazılmıştır)
+        if self._durum_kirli:
+            os.makedirs(self.dizin, exist_ok=True)
+            parquet_atomik_yaz(pa.Table.from_pandas(self._durum), self.durum_yolu)
+            self._durum_kirli = False
+        super().kaydet()
+
+    def yaz(self, df, ad=None, kaydet=True):
+        if df is None or df.empty: return df
+        df = tiplere_cevir(urun_id_doldur(df))
+        degisen = self.degisimleri_ayikla(df)
+        # Önce olaylar, sonra durum: arada çökerse bir sonraki tarama olayları tekrar yazar, kayıp olmaz
+        if not degisen.empty: bolumlere_yaz(degisen, self.olay_dizini, ad)
+        self.durumu_guncelle(df, kaydet=False)
+        # Özet her görülen ürünle güncellenir (ortalama tarama başına hesaplanır)
+        self.ozeti_guncelle(df, kaydet=False)
+        if kaydet: self.kaydet()
+        return degisen
+
+    def oku(self, kolonlar=None, baslangic=None, bitis=None, kategoriler=None):
+        istenen = list(kolonlar) if kolonlar else KOLONLAR
+        # Kapanış noktası eklemek için ürün anahtarı ve Tarih her zaman okunur
+        okunacak = list(dict.fromkeys(istenen + ["Tarih", "Ürün ID"]))
+        olaylar = bolumlerden_oku(self.olay_dizini, okunacak, baslangic, bitis, kategoriler)
+        # Aralıkta görülen ürünlerin son durumu; aralıktan önce değişip hâlâ görülenler de kapanış noktası alır
+        durum = self.durum()
+        if baslangic is not None: durum = durum[durum["Son Görülme"] >= pd.Timestamp(baslangic)]
+        if bitis is not None: durum = durum[durum["İlk Görülme"] <= pd.Timestamp(bitis)].assign(
+            **{"Son Görülme": durum["Son Görülme"].clip(upper=pd.Timestamp(bitis))})
+        if kategoriler: durum = durum[durum["Kategori"].isin(list(kategoriler))]
+        return zaman_serisi_olustur(olaylar, durum)[istenen]
+
+# --- GOOGLE SHEETS DEPOSU (İSTEĞE BAĞLI DIŞA AKTARIM) ---
+class SheetsDepo:
+    # Eski ana veritabanı. Artık yalnızca isteğe bağlı dışa aktarım hedefi (veya MIGROS_DEPO=sheets)
+    def __init__(self, spreadsheet, gunluk_sayfa=True):
+        self.spreadsheet = spreadsheet
+        self.ana_sheet = None
+        self.gunluk_sheet = None
+        self.gunluk_sayfa = gunluk_sayfa
+
+    def _hazirla(self):
+        if self.ana_sheet is not None: return
+        # 1. Ana Veritabanı
+        try:
+            self.ana_sheet = self.spreadsheet.worksheet("Ana_Veritabani")
+        except:
+            self.ana_sheet = self.spreadsheet.add_worksheet(title="Ana_Veritabani", rows="1000", cols="20")
+            self.ana_sheet.append_row(KOLONLAR)
+
+        # 2. Günlük Yedek
+        if not self.gunluk_sayfa: return
+        try:
+            sayfa_ismi = datetime.now().strftime("%d.%m.%Y - %H:%M")
+            self.gunluk_sheet = self.spreadsheet.add_worksheet(title=sayfa_ismi, rows="1000", cols="20")
+            self.gunluk_sheet.append_row(KOLONLAR)
+            print(f"📅 Yeni sayfa açıldı: {sayfa_ismi}")
+        except:
+            print("⚠️ Günlük sayfa oluşturulamadı.")
+
+    def yaz(self, df, ad=None, kaydet=True):
+        # `ad` (tekrar güvenli dosya adı) Sheets'te karşılıksızdır; aynı satırlar tekrar eklenir.
+        # Satırlar doğrudan eklendiği için `kaydet` bekletilecek bir şey bırakmaz
+        if df is None or df.empty: return df
+        self._hazirla()
+        satirlar = sheets_satirlari(df)
+        # Ana veritabanına ekle
+        self.ana_sheet.append_rows(satirlar, value_input_option='RAW')
+        # Günlük sayfaya ekle
+        if self.gunluk_sheet:
+            self.gunluk_sheet.append_rows(satirlar, value_input_option='RAW')
+        return df
+
+    def oku(self, kolonlar=None, baslangic=None, bitis=None, kategoriler=None):
+        # Sheets filtreleme desteklemediği için tüm sayfa indirilip yerelde süzülür
+        try: sheet = self.spreadsheet.worksheet("Ana_Veritabani")
+        except: sheet = self.spreadsheet.sheet1
+        df = sheets_cercevesi(sheet.get_all_values())
+        if df.empty: return df
+        if baslangic is not None: df = df[df["Tarih"] >= pd.Timestamp(baslangic)]
+        if bitis is not None: df = df[df["Tarih"] <= pd.Timestamp(bitis)]
+        if kategoriler: df = df[df["Kategori"].isin(list(kategoriler))]
+        if kolonlar: df = df[[c for c in kolonlar if c in df.columns]]
+        return df
+
+    def kaydet(self):
+        pass
+
+    def ozet(self):
+        # Sheets'te saklı özet yok; geçmişten hesaplanır
+        return ozet_hesapla(self.oku())
+
+# --- TOPLU YAZICI (AKIŞ HATTI SONU) ---
+PARTI_BOYUTU = int(os.environ.get("MIGROS_PARTI_BOYUTU", "2000"))
+# Özet/durum dosyaları her partide değil bu kadar partide bir (ve tarama sonunda) diske yazılır
+KAYIT_ARALIGI = int(os.environ.get("MIGROS_KAYIT_ARALIGI", "10"))
+
+class ToplulukYazici:
+    # Normalize edilmiş satırları biriktirir, `parti_boyutu`na ulaşınca depoya (ve varsa Sheets'e) yazar.
+    # `ekle`ye verilen etiketler, satırlarının tamamı yazılınca sırayla `yazildi(etiket, basarili)` ile bildirilir
+    # (kontrol noktası yalnızca kalıcı hale gelmiş sayfaları ilerletir).
+    # `alarm` verilirse (migros_alarm.AlarmMotoru) başarıyla yazılan her parti fiyat alarmları için değerlendirilir.
+    # Depo özeti `kayit_araligi` partide bir kaydedilir; etiketler ancak satırları kaydedildikten sonra bildirilir.
+    def __init__(self, depo, aktarim=None, parti_boyutu=None, yazildi=None, alarm=None, kayit_araligi=None):
+        self.depo = depo
+        self.aktarim = aktarim
+        self.alarm = alarm
+        self.parti_boyutu = max(1, parti_boyutu or PARTI_BOYUTU)
+        self.kayit_araligi = max(1, kayit_araligi or KAYIT_ARALIGI)
+        self._kaydedilmemis = 0  # depoda bellekte bekleyen parti sayısı
+        self.yazildi = yazildi
+        self._tampon = []
+        self._etiketler = deque()  # [etiket, yazılmayı bekleyen satır, başarılı mı]
+        self.toplam_urun = 0
+        self.yazilan_satir = 0
+        self.parti_sayisi = 0
+
+    def ekle(self, satirlar, etiket=None):
+        self._tampon.extend(satirlar)
+        if etiket is not None:
+            self._etiketler.append([etiket, len(satirlar), True])
+        while len(self._tampon) >= self.parti_boyutu:
+            parti, self._tampon = self._tampon[:self.parti_boyutu], self._tampon[self.parti_boyutu:]
+            self._yaz(parti)
+        if self._kaydedilmemis >= self.kayit_araligi: self._kaydet()
+        if not self._kaydedilmemis: self._etiketleri_bildir()
+
+    def bosalt(self):
+        if self._tampon:
+            parti, self._tampon = self._tampon, []
+            self._yaz(parti)
+        self._kaydet()
+        self._etiketleri_bildir()
+
+    def _kaydet(self):
+        try:
+            with olcum.sure_olc("migros_yazici_suresi_saniye", "Parti yazma süresi", hedef="ozet"):
+                self.depo.kaydet()
+        except Exception as e:
+            # Kaydedilemeyen partilerin sayfaları kontrol noktasında ilerletilmez; devamda tekrar çekilir
+            print(f"❌ Özet kaydetme hatası: {e}")
+            olcum.say("migros_yazici_hata_toplam", aciklama="Başarısız parti yazımı", hedef="ozet")
+            for etiket in self._etiketler: etiket[2] = False
+        self._kaydedilmemis = 0
+
+    def _yaz(self, parti):
+        basarili = True
+        try:
+            # Artımlı depoda yalnızca değişen satırlar döner; Sheets'e de sadece onlar kopyalanır
+            with olcum.sure_olc("migros_yazici_suresi_saniye", "Parti yazma süresi", gunluge="parti_yazimi", hedef="depo") as alanlar:
+                alanlar["satir"] = len(parti)
+                cerceve = satirlari_cerceveye(parti)
+                df = self.depo.yaz(cerceve, kaydet=False)
+                alanlar["yazilan"] = len(df)
+        except Exception as e:
+            print(f"❌ Yazma hatası ({len(parti)} satır): {e}")
+            olcum.say("migros_yazici_hata_toplam", aciklama="Başarısız parti yazımı", hedef="depo")
+            basarili = False
+        else:
+            self.toplam_urun += len(parti)
+            self.yazilan_satir += len(df)
+            self.parti_sayisi += 1
+            self._kaydedilmemis += 1
+            olcum.say("migros_yazici_satir_toplam", len(df), "Depoya yazılan satır")
+            if self.aktarim and not df.empty:
+                try:
+                    with olcum.sure_olc("migros_yazici_suresi_saniye", "Parti yazma süresi", hedef="sheets"):
+                        self.aktarim.yaz(df)
+                except Exception as e:
+                    print(f"⚠️ Sheets aktarım hatası: {e}")
+                    olcum.say("migros_yazici_hata_toplam", aciklama="Başarısız parti yazımı", hedef="sheets")
+            if self.alarm:
+                # Tüm parti verilir (artımlı depo yalnızca değişenleri döndürür ama indeksin son görülmesi de güncellenmeli)
+                try:
+                    self.alarm.degerlendir(cerceve)
+                except Exception as e:
+                    print(f"⚠️ Alarm değerlendirme hatası: {e}")
+        # Partideki satırları, sıradaki etiketlerden düş
+        kalan = len(parti)
+        for etiket in self._etiketler:
+            if not kalan: break
+            pay = min(kalan, etiket[1])
+            if not pay: continue
+            etiket[1] -= pay
+            etiket[2] = etiket[2] and basarili
+            kalan -= pay
+
+    def _etiketleri_bildir(self):
+        while self._etiketler and self._etiketler[0][1] == 0:
+            etiket, _, basarili = self._etiketler.popleft()
+            if self.yazildi: self.yazildi(etiket, basarili)
+
+def depo_olustur(tur=None):
+    # Birincil depo: varsayılan yerel Parquet, MIGROS_DEPO=artimli ile sadece değişiklik yazan mod,
+    # MIGROS_DEPO=sheets ile eski Sheets düzeni
+    tur = tur or DEPO_TURU
+    if tur == "sheets":
+        spreadsheet = google_sheets_baglan()
+        return SheetsDepo(spreadsheet) if spreadsheet else None
+    if tur == "artimli":
+        return ArtimliDepo()
+    return ParquetDepo()
+
+def depo_filigrani(tur=None, dizin=DEPO_DIZINI):
+    # Yerel deponun son değiştirilme zamanı (unix): özet ve durum dosyaları her yazımda değişir.
+    # Sheets deposu başka yerden de yazılabildiği için bilinemez (None)
+    if (tur or DEPO_TURU) == "sheets": return None
+    zamanlar = []
+    for ad in ("ozet.parquet", "durum.parquet"):
+        try: zamanlar.append(os.stat(os.path.join(dizin, ad)).st_mtime)
+        except OSError: pass
+    return max(zamanlar, default=None)
+
+def sheets_aktarimi_olustur():
+    # Birincil depo Sheets değilse ve kimlik bilgisi varsa Sheets'e kopya yazan hedef
+    if not SHEETS_AKTAR or DEPO_TURU == "sheets": return None
+    try:
+        spreadsheet = google_sheets_baglan()
+    except Exception as e:
+        print(f"⚠️ Sheets dışa aktarımı kapalı: {e}")
+        return None
+    return SheetsDepo(spreadsheet) if spreadsheet else None
+
+def sheets_ice_aktar(depo=None):
+    # Eski Ana_Veritabani sayfasındaki geçmişi yerel depoya taşır (tek seferlik)
+    spreadsheet = google_sheets_baglan()
+    if not spreadsheet:
+        print("❌ Google Sheets bağlantısı başarısız!")
+        return 0
+    depo = depo or depo_olustur()
+    df = SheetsDepo(spreadsheet, gunluk_sayfa=False).oku()
+    df = df.dropna(subset=["Tarih"]).sort_values("Tarih", kind="stable") if not df.empty else df
+    # Artımlı depo durumu taramalar sırasıyla kursun diye geçmiş tarama tarama yazılır
+    adet = sum(len(depo.yaz(parca, kaydet=False)) for _, parca in df.groupby("Tarih", sort=True)) if not df.empty else 0
+    depo.kaydet()
+    print(f"💾 {adet} satır yerel depoya aktarıldı.")
+    return adet
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migros fiyat deposu araçları")
+    parser.add_argument("--sheets-ice-aktar", action="store_true", help="Ana_Veritabani geçmişini yerel depoya taşı")
+    args = parser.parse_args()
+    if args.sheets_ice_aktar:
+        sheets_ice_aktar()
+    else:
+        parser.print_help()
@@ -0,0 +1,262 @@
+import argparse
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, quote
+
+import requests
+
+import migros_olcum as olcum
+from migros_http import VARSAYILAN_BASLIKLAR
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow yoksa görseller yeniden boyutlandırılmadan önbelleğe alınır
+    Image = None
+
+# --- GÖRSEL ÖNBELLEĞİ AYARLARI ---
+GORSEL_DIZINI = os.environ.get("MIGROS_GORSEL_DIZINI", os.path.join(os.environ.get("MIGROS_DEPO_DIZINI", "veri"), "gorseller"))
+GORSEL_SINIRI_MB = float(os.environ.get("MIGROS_GORSEL_SINIRI_MB", "500"))
+# 0 = kapalı: pano görselleri doğrudan Migros'tan yükler
+GORSEL_PORTU = int(os.environ.get("MIGROS_GORSEL_PORTU", "0"))
+# Sunucunun dinlediği adres; varsayılan yalnızca yerel erişim (ters vekil aynı makinede)
+GORSEL_DINLEME = os.environ.get("MIGROS_GORSEL_DINLEME", "127.0.0.1")
+# Tarayıcının proxy'ye ulaşacağı adres (ters vekil arkasında değiştirilir)
+GORSEL_ADRESI = os.environ.get("MIGROS_GORSEL_ADRESI", f"http://localhost:{GORSEL_PORTU}" if GORSEL_PORTU else "")
+# Açık vekil olmasın diye yalnızca bu hostların (ve alt alan adlarının) görselleri çekilir
+IZINLI_HOSTLAR = tuple(h for h in os.environ.get("MIGROS_GORSEL_HOSTLARI", "migrosone.com,migros.com.tr").split(",") if h)
+BOYUTLAR = (160, 320, 640)   # vitrin kartı 160 px yüksekliğinde; yüksek DPI için 320
+VARSAYILAN_BOYUT = 320
+WEBP_KALITESI = 80
+UZUN_ONBELLEK = "public, max-age=31536000, immutable"
+
+def _icerik_turu(veri):
+    if veri[:4] == b"RIFF" and veri[8:12] == b"WEBP": return "image/webp"
+    if veri[:3] == b"\xff\xd8\xff": return "image/jpeg"
+    if veri[:8] == b"\x89PNG\r\n\x1a\n": return "image/png"
+    if veri[:6] in (b"GIF87a", b"GIF89a"): return "image/gif"
+    return "application/octet-stream"
+
+def izinli_mi(url):
+    parca = urlsplit(url or "")
+    host = (parca.hostname or "").lower()
+    return parca.scheme in ("http", "https") and any(host == h or host.endswith("." + h) for h in IZINLI_HOSTLAR)
+
+class GorselOnbellegi:
+    # Ürün görsellerini bir kez indirip küçültülmüş WebP olarak diskte tutar.
+    # Anahtar, kaynak URL ve boyuttan türetilen SHA-256'dır: <dizin>/<ilk 2 hane>/<anahtar>.img
+    # Dosyanın mtime'ı son erişim zamanıdır; toplam boyut sınırı aşılınca en eski erişilenler silinir (LRU).
+    def __init__(self, dizin=GORSEL_DIZINI, sinir_mb=GORSEL_SINIRI_MB, zaman_asimi=15):
+        self.dizin = dizin
+        self.sinir = int(sinir_mb * 1024 * 1024)
+        self.zaman_asimi = zaman_asimi
+        self.session = requests.Session()
+        self.session.headers.update(VARSAYILAN_BASLIKLAR)
+        self._kilit = threading.Lock()
+        self._kilitler = [threading.Lock() for _ in range(64)]
+        os.makedirs(dizin, exist_ok=True)
+        self.toplam = sum(os.path.getsize(y) for y in self._dosyalar())
+
+    def _dosyalar(self):
+        for alt in os.scandir(self.dizin):
+            if alt.is_dir():
+                for f in os.scandir(alt.path):
+                    if f.name.endswith(".img"): yield f.path
+
+    @staticmethod
+    def anahtar(url, boyut):
+        return hashlib.sha256(f"{boyut}|{url}".encode()).hexdigest()
+
+    def yol(self, anahtar):
+        return os.path.join(self.dizin, anahtar[:2], f"{anahtar}.img")
+
+    def _oku(self, yol):
+        try:
+            with open(yol, "rb") as f: veri = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(yol)  # LRU için son erişim
+        return veri
+
+    def getir(self, url, boyut=VARSAYILAN_BOYUT):
+        # (anahtar, bayt) döndürür; önbellekte yoksa indirir, küçültür ve kaydeder
+        anahtar = self.anahtar(url, boyut)
+        yol = self.yol(anahtar)
+        veri = self._oku(yol)
+        if veri is None:
+            # Aynı görsel için eşzamanlı ilk istekler tek indirme yapar
+            with self._kilitler[int(anahtar[:2], 16) % len(self._kilitler)]:
+                veri = self._oku(yol)
+                if veri is None: veri = self._indir(url, boyut, yol)
+                else: olcum.say("migros_gorsel_onbellek_toplam", aciklama="Görsel önbelleği isabet/ıskalama", sonuc="isabet")
+        else:
+            olcum.say("migros_gorsel_onbellek_toplam", aciklama="Görsel önbelleği isabet/ıskalama", sonuc="isabet")
+        return anahtar, veri
+
+    def _indir(self, url, boyut, yol):
+        olcum.say("migros_gorsel_onbellek_toplam", aciklama="Görsel önbelleği isabet/ıskalama", sonuc="iskalama")
+        with olcum.sure_olc("migros_gorsel_indirme_saniye", "Kaynak görseli indirip küçültme süresi"):
+            yanit = self.session.get(url, timeout=self.zaman_asimi)
+            yanit.raise_for_status()
+            veri = self.kucult(yanit.content, boyut)
+        os.makedirs(os.path.dirname(yol), exist_ok=True)
+        gecici = f"{yol}.{uuid.uuid4().hex}.tmp"
+        with open(gecici, "wb") as f: f.write(veri)
+        # Yeniden adlandırma ve sayaç birlikte: eşzamanlı temizlik dosyayı iki kez saymasın
+        with self._kilit:
+            os.replace(gecici, yol)
+            self.toplam += len(veri)
+            asildi = self.toplam > self.sinir
+        olcum.say("migros_gorsel_kaynak_bayt_toplam", len(yanit.content), "İndirilen kaynak görsel baytı")
+        olcum.say("migros_gorsel_kucuk_bayt_toplam", len(veri), "Üretilen küçük görsel baytı")
+        if asildi: self.temizle()
+        return veri
+
+    @staticmethod
+    def kucult(veri, boyut):
+        if Image is None: return veri
+        try:
+            with Image.open(io.BytesIO(veri)) as resim:
+                resim.thumbnail((boyut, boyut))
+                if resim.mode not in ("RGB", "RGBA"):
+                    resim = resim.convert("RGBA" if "transparency" in resim.info or resim.mode in ("LA", "P") else "RGB")
+                cikti = io.BytesIO()
+                resim.save(cikti, "WEBP", quality=WEBP_KALITESI, method=4)
+                return cikti.getvalue()
+        except OSError:
+            return veri  # çözülemeyen biçim: olduğu gibi sakla
+
+    def temizle(self, hedef_oran=0.9):
+        # Toplam boyut sınırın %90'ına inene kadar en uzun süredir erişilmeyen dosyaları siler
+        with self._kilit:
+            dosyalar = []
+            for yol in self._dosyalar():
+                try:
+                    durum = os.stat(yol)
+                except FileNotFoundError:
+                    continue
+                dosyalar.append((durum.st_mtime, durum.st_size, yol))
+            self.toplam = sum(d[1] for d in dosyalar)
+            silinen = 0
+            for _, boyut, yol in sorted(dosyalar):
+                if self.toplam <= self.sinir * hedef_oran: break
+                try: os.remove(yol)
+                except FileNotFoundError: pass
+                self.toplam -= boyut
+                silinen += 1
+        olcum.say("migros_gorsel_silinen_toplam", silinen, "Boyut sınırı yüzünden silinen görsel")
+        olcum.ayarla("migros_gorsel_onbellek_bayt", self.toplam, "Görsel önbelleğinin disk boyutu")
+        return silinen
+
+    def isit(self, urller, boyutlar=(VARSAYILAN_BOYUT,), eszamanli=8):
+        # Görselleri önceden indirir; sonrasında pano görseller için ağa çıkmaz
+        _pillow_uyarisi()
+        isler = [(u, b) for u in dict.fromkeys(urller) if izinli_mi(u) for b in boyutlar]
+
+        def tek(is_):
+            try:
+                self.getir(*is_)
+                return True
+            except (requests.RequestException, OSError):
+                return False
+
+        with ThreadPoolExecutor(max_workers=eszamanli) as havuz:
+            basarili = sum(havuz.map(tek, isler))
+        print(f"🖼️ {basarili}/{len(isler)} görsel önbellekte ({self.toplam / 1024 / 1024:.1f} MB)")
+        return basarili
+
+def _pillow_uyarisi():
+    if Image is None:
+        print("⚠️ Pillow kurulu değil: görseller küçültülmeden (özgün boyutta) önbelleğe alınacak. `pip install Pillow`")
+
+# --- HTTP SUNUCUSU ---
+def sunucu_baslat(port=None, onbellek=None, dinleme=None):
+    # GET /g?u=<kaynak url>&b=<boyut> → küçük WebP; uzun süreli önbellek başlıkları ve ETag ile.
+    # Port doluysa (ör. birden çok pano süreci aynı portu açmaya çalışırsa) uyarı verip None döner; sunucuyu ilk açan
+    # süreç herkese hizmet eder. Çok süreçli kurulumda ayrı servis olarak çalıştırılması önerilir (`--sun`).
+    dinleme = dinleme or GORSEL_DINLEME
+    port = port or GORSEL_PORTU
+
+    class Yanitlayici(BaseHTTPRequestHandler):
+        def log_message(self, *args): pass
+
+        def do_GET(self):
+            adres = urlsplit(self.path)
+            if adres.path != "/g":
+                self.send_error(404)
+                return
+            sorgu = parse_qs(adres.query)
+            url = sorgu.get("u", [""])[0]
+            try:
+                boyut = int(sorgu.get("b", [VARSAYILAN_BOYUT])[0])
+            except ValueError:
+                boyut = 0
+            if boyut not in BOYUTLAR or not izinli_mi(url):
+                self.send_error(400)
+                return
+            etag = f'"{onbellek.anahtar(url, boyut)[:32]}"'
+            if self.headers.get("If-None-Match") == etag and os.path.exists(onbellek.yol(onbellek.anahtar(url, boyut))):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", UZUN_ONBELLEK)
+                self.end_headers()
+                return
+            try:
+                _, veri = onbellek.getir(url, boyut)
+            except (requests.RequestException, OSError):
+                # Kaynağa ulaşılamıyorsa tarayıcı orijinali denesin
+                self.send_response(302)
+                self.send_header("Location", url)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", _icerik_turu(veri))
+            self.send_header("Content-Length", str(len(veri)))
+            self.send_header("Cache-Control", UZUN_ONBELLEK)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(veri)
+
+    try:
+        sunucu = ThreadingHTTPServer((dinleme, port), Yanitlayici)
+    except OSError as e:
+        print(f"⚠️ Görsel sunucusu {dinleme}:{port} adresinde açılamadı ({e}); başka bir süreç sunuyor olabilir.")
+        return None
+    onbellek = onbellek or GorselOnbellegi()
+    _pillow_uyarisi()
+    sunucu.daemon_threads = True
+    threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+    print(f"🖼️ Görsel önbelleği: http://{dinleme}:{sunucu.server_address[1]}/g")
+    return sunucu
+
+def gorsel_adresi(url, boyut=VARSAYILAN_BOYUT):
+    # Proxy etkinse görselin önbellekli küçük halinin adresi, değilse orijinal URL
+    if not GORSEL_ADRESI or not izinli_mi(url): return url
+    return f"{GORSEL_ADRESI}/g?b={boyut}&u={quote(url, safe='')}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ürün görseli küçük resim önbelleği")
+    parser.add_argument("--sun", action="store_true", help="Görsel sunucusunu başlat (MIGROS_GORSEL_PORTU)")
+    parser.add_argument("--port", type=int, default=GORSEL_PORTU or 8502)
+    parser.add_argument("--dinleme", default=GORSEL_DINLEME, help="Dinlenecek adres (varsayılan: MIGROS_GORSEL_DINLEME)")
+    parser.add_argument("--isit", action="store_true", help="Ürün özetindeki tüm görselleri önceden indir")
+    parser.add_argument("--boyutlar", default=f"{VARSAYILAN_BOYUT},640", help="Isıtılacak boyutlar")
+    args = parser.parse_args()
+    onbellek = GorselOnbellegi()
+    if args.isit:
+        from migros_depo import depo_olustur
+        depo = depo_olustur()
+        ozet = depo.ozet() if depo is not None else None
+        if ozet is not None and not ozet.empty:
+            onbellek.isit(ozet["Resim"].dropna().astype(str).tolist(), [int(b) for b in args.boyutlar.split(",")])
+    if args.sun:
+        if sunucu_baslat(args.port, onbellek, args.dinleme) is None: raise SystemExit(1)
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,178 @@
+import requests
+from requests.adapters import HTTPAdapter
+import os
+import time
+import random
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import migros_olcum as olcum
+
+# --- HTTP AYARLARI ---
+ESZAMANLI_ISTEK = int(os.environ.get("MIGROS_ESZAMANLI_ISTEK", "4"))
+SANIYEDE_ISTEK = float(os.environ.get("MIGROS_SANIYEDE_ISTEK", "8"))
+DENEME_SAYISI = int(os.environ.get("MIGROS_DENEME_SAYISI", "4"))
+# Koşullu istek için saklanan en fazla yanıt (en son kullanılanlar); yalnızca aynı süreçteki ardışık taramalarda
+# (zamanlayıcı süreci) işe yarar, 0 = kapalı
+ONBELLEK_BOYUTU = int(os.environ.get("MIGROS_HTTP_ONBELLEK", "2048"))
+TABAN_BEKLEME = 0.5     # saniye, ilk yeniden denemenin üst sınırı
+EN_FAZLA_BEKLEME = 20   # saniye
+TEKRAR_KODLARI = {429, 500, 502, 503, 504}
+
+VARSAYILAN_BASLIKLAR = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "X-PWA": "true"
+}
+
+# --- HIZ SINIRI (HOST BAŞINA) ---
+class HizSinirlayici:
+    # Sabit time.sleep yerine host başına token kovası: saniyede en fazla `saniyede` istek
+    def __init__(self, saniyede=SANIYEDE_ISTEK, patlama=1):
+        self.aralik = 1.0 / saniyede if saniyede > 0 else 0.0
+        self.patlama = max(1, patlama)
+        self._siradaki = {}
+        self._kilit = threading.Lock()
+
+    def bekle(self, url):
+        if not self.aralik: return
+        host = urlsplit(url).netloc
+        with self._kilit:
+            simdi = time.monotonic()
+            # Patlama kadar isteğin birikmesine izin ver, fazlasını sıraya sok
+            en_erken = simdi - self.aralik * (self.patlama - 1)
+            slot = max(self._siradaki.get(host, en_erken), en_erken)
+            self._siradaki[host] = slot + self.aralik
+        gecikme = slot - simdi
+        if gecikme > 0:
+            olcum.say("migros_http_hiz_bekleme_saniye_toplam", gecikme, "Hız sınırı yüzünden beklenen toplam süre", host=host)
+            time.sleep(gecikme)
+
+# --- SAYAÇLI BAĞLANTI HAVUZU ---
+class _SayacliAdapter(HTTPAdapter):
+    # urllib3 havuzunun açtığı her yeni TCP/TLS bağlantısını sayar
+    def __init__(self, sayac, **kwargs):
+        self._sayac = sayac
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        sayac = self._sayac
+        siniflar = {}
+        for sema, sinif in self.poolmanager.pool_classes_by_scheme.items():
+            def _new_conn(havuz, _sinif=sinif):
+                sayac()
+                return _sinif._new_conn(havuz)
+            siniflar[sema] = type(sinif.__name__, (sinif,), {"_new_conn": _new_conn})
+        self.poolmanager.pool_classes_by_scheme = siniflar
+
+class HttpOturumu:
+    # Tüm tarama boyunca paylaşılan keep-alive oturumu:
+    # bağlantı havuzu, 429/5xx için jitter'lı üstel geri çekilme ve ETag/If-Modified-Since desteği
+    def __init__(self, eszamanli=None, sinirlayici=None, deneme=DENEME_SAYISI, onbellek_boyutu=ONBELLEK_BOYUTU):
+        self.eszamanli = max(1, eszamanli or ESZAMANLI_ISTEK)
+        self.sinirlayici = sinirlayici or HizSinirlayici()
+        self.deneme = max(1, deneme)
+        self._ucusta = threading.BoundedSemaphore(self.eszamanli)
+        self._kilit = threading.Lock()
+        self._onbellek = OrderedDict()  # url -> (etag, last_modified, json); iş parçacıkları _kilit ile erişir
+        self.onbellek_boyutu = max(0, onbellek_boyutu)
+        self.sayaclari_sifirla()
+
+        self.session = requests.Session()
+        self.session.headers.update(VARSAYILAN_BASLIKLAR)
+        adapter = _SayacliAdapter(self._baglanti_acildi, pool_connections=4,
+                                  pool_maxsize=self.eszamanli, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def sayaclari_sifirla(self):
+        with self._kilit:
+            self.sayaclar = {"istek": 0, "baglanti": 0, "yeniden_deneme": 0,
+                             "bayt": 0, "degismedi_304": 0, "hata": 0}
+
+    def _say(self, anahtar, miktar=1):
+        with self._kilit:
+            self.sayaclar[anahtar] += miktar
+
+    def _baglanti_acildi(self):
+        self._say("baglanti")
+
+    def _onbellekten(self, url):
+        with self._kilit:
+            onceki = self._onbellek.get(url)
+            if onceki: self._onbellek.move_to_end(url)
+            return onceki
+
+    def _onbellege(self, url, kayit):
+        if not self.onbellek_boyutu: return
+        with self._kilit:
+            self._onbellek[url] = kayit
+            self._onbellek.move_to_end(url)
+            while len(self._onbellek) > self.onbellek_boyutu: self._onbellek.popitem(last=False)
+
+    def istatistik(self):
+        with self._kilit:
+            return dict(self.sayaclar)
+
+    def _bekleme_suresi(self, deneme_no, response=None):
+        # Sunucu Retry-After verdiyse ona uy, yoksa "full jitter" üstel geri çekilme
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), EN_FAZLA_BEKLEME)
+        return random.uniform(0, min(EN_FAZLA_BEKLEME, TABAN_BEKLEME * (2 ** deneme_no)))
+
+    def _geri_cekil(self, sure, host):
+        olcum.say("migros_http_geri_cekilme_saniye_toplam", sure, "Yeniden denemeler öncesi beklenen toplam süre", host=host)
+        time.sleep(sure)
+
+    def get_json(self, url, timeout=20):
+        # (durum_kodu, json) döndürür; 304 gelirse önbellekteki gövde 200 gibi döner
+        onceki = self._onbellekten(url)
+        headers = {}
+        if onceki:
+            if onceki[0]: headers["If-None-Match"] = onceki[0]
+            if onceki[1]: headers["If-Modified-Since"] = onceki[1]
+
+        son_hata = None
+        for deneme_no in range(self.deneme):
+            if deneme_no:
+                self._say("yeniden_deneme")
+            self.sinirlayici.bekle(url)
+            host = urlsplit(url).netloc
+            try:
+                with self._ucusta:
+                    self._say("istek")
+                    bas = time.perf_counter()
+                    response = self.session.get(url, headers=headers, timeout=timeout)
+                    icerik = response.content
+            except requests.RequestException as e:
+                son_hata = e
+                olcum.gozlemle("migros_http_istek_suresi_saniye", time.perf_counter() - bas,
+                               "İstek başına gecikme (yanıt gövdesi dahil)", host=host, durum=type(e).__name__)
+                if deneme_no < self.deneme - 1:
+                    self._geri_cekil(self._bekleme_suresi(deneme_no), host)
+                continue
+
+            olcum.gozlemle("migros_http_istek_suresi_saniye", time.perf_counter() - bas,
+                           "İstek başına gecikme (yanıt gövdesi dahil)", host=host, durum=response.status_code)
+            self._say("bayt", len(icerik))
+            if response.status_code == 304 and onceki:
+                self._say("degismedi_304")
+                return 200, onceki[2]
+            if response.status_code in TEKRAR_KODLARI and deneme_no < self.deneme - 1:
+                self._geri_cekil(self._bekleme_suresi(deneme_no, response), host)
+                continue
+            if response.status_code != 200:
+                self._say("hata")
+                return response.status_code, None
+
+            data = response.json()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self._onbellege(url, (etag, last_modified, data))
+            return 200, data
+
+        self._say("hata")
+        raise son_hata or requests.RequestException(f"{url} {self.deneme} denemede alınamadı")
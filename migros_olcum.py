@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# --- ÖLÇÜM AYARLARI ---
+# migros_depo bu modülü içe aktardığı için dizin ayarı doğrudan ortamdan okunur
+OLCUM_DIZINI = os.environ.get("MIGROS_OLCUM_DIZINI", os.environ.get("MIGROS_DEPO_DIZINI", "veri"))
+# Yapılandırılmış olay günlüğü (JSON satırları); boş bırakılırsa kapalı
+OLCUM_GUNLUGU = os.environ.get("MIGROS_OLCUM_GUNLUGU", os.path.join(OLCUM_DIZINI, "olcum.jsonl"))
+METRIK_PORTU = int(os.environ.get("MIGROS_METRIK_PORTU", "0"))
+# Varsayılan yalnızca yerel erişim; Prometheus başka makinedeyse "0.0.0.0"
+METRIK_DINLEME = os.environ.get("MIGROS_METRIK_DINLEME", "127.0.0.1")
+SURE_SINIRLARI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# --- METRİKLER ---
+class _Metrik:
+    def __init__(self, ad, aciklama, tur):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.tur = tur
+        self.degerler = {}  # sıralı (etiket, değer) demeti -> değer
+
+    def satirlar(self):
+        for etiketler, deger in sorted(self.degerler.items()):
+            yield f"{self.ad}{_etiket_metni(etiketler)} {_sayi_metni(deger)}"
+
+class _Histogram(_Metrik):
+    def __init__(self, ad, aciklama, sinirlar):
+        super().__init__(ad, aciklama, "histogram")
+        self.sinirlar = tuple(sinirlar)
+
+    def gozlemle(self, etiketler, deger):
+        kova = self.degerler.get(etiketler)
+        if kova is None:
+            kova = self.degerler[etiketler] = [[0] * (len(self.sinirlar) + 1), 0.0, 0]
+        kova[0][bisect_left(self.sinirlar, deger)] += 1
+        kova[1] += deger
+        kova[2] += 1
+
+    def satirlar(self):
+        for etiketler, (kovalar, toplam, adet) in sorted(self.degerler.items()):
+            birikimli = 0
+            for sinir, sayi in zip(self.sinirlar + (float("inf"),), kovalar):
+                birikimli += sayi
+                le = "+Inf" if sinir == float("inf") else _sayi_metni(sinir)
+                yield f"{self.ad}_bucket{_etiket_metni(etiketler + (('le', le),))} {birikimli}"
+            yield f"{self.ad}_sum{_etiket_metni(etiketler)} {_sayi_metni(toplam)}"
+            yield f"{self.ad}_count{_etiket_metni(etiketler)} {adet}"
+
+def _etiket_metni(etiketler):
+    if not etiketler: return ""
+    kacisli = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in etiketler)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(etiketler, kacisli)) + "}"
+
+def _sayi_metni(deger):
+    return repr(float(deger)) if isinstance(deger, float) else str(deger)
+
+def _etiketler(etiketler):
+    return tuple(sorted((k, str(v)) for k, v in etiketler.items()))
+
+class Kayit:
+    # Süreç içi metrik kaydı; Prometheus metin biçiminde dışa verilir
+    def __init__(self):
+        self._metrikler = {}
+        self._kilit = threading.Lock()
+
+    def _al(self, ad, aciklama, tur, sinirlar=None):
+        metrik = self._metrikler.get(ad)
+        if metrik is None:
+            metrik = _Histogram(ad, aciklama, sinirlar or SURE_SINIRLARI) if tur == "histogram" else _Metrik(ad, aciklama, tur)
+            self._metrikler[ad] = metrik
+        return metrik
+
+    def say(self, ad, miktar=1, aciklama="", **etiketler):
+        with self._kilit:
+            metrik = self._al(ad, aciklama, "counter")
+            anahtar = _etiketler(etiketler)
+            metrik.degerler[anahtar] = metrik.degerler.get(anahtar, 0) + miktar
+
+    def ayarla(self, ad, deger, aciklama="", **etiketler):
+        with self._kilit:
+            self._al(ad, aciklama, "gauge").degerler[_etiketler(etiketler)] = deger
+
+    def gozlemle(self, ad, deger, aciklama="", sinirlar=None, **etiketler):
+        with self._kilit:
+            self._al(ad, aciklama, "histogram", sinirlar).gozlemle(_etiketler(etiketler), deger)
+
+    def prometheus_metni(self):
+        with self._kilit:
+            satirlar = []
+            for ad, metrik in sorted(self._metrikler.items()):
+                if metrik.aciklama: satirlar.append(f"# HELP {ad} {metrik.aciklama}")
+                satirlar.append(f"# TYPE {ad} {metrik.tur}")
+                satirlar.extend(metrik.satirlar())
+            return "\n".join(satirlar) + "\n"
+
+    def sifirla(self):
+        with self._kilit:
+            self._metrikler.clear()
+
+KAYIT = Kayit()
+say = KAYIT.say
+ayarla = KAYIT.ayarla
+gozlemle = KAYIT.gozlemle
+
+# --- YAPILANDIRILMIŞ GÜNLÜK ---
+_gunluk = logging.getLogger("migros.olcum")
+_gunluk.propagate = False
+_gunluk_kilidi = threading.Lock()
+
+def _gunluk_hazirla():
+    if _gunluk.handlers or not OLCUM_GUNLUGU: return
+    with _gunluk_kilidi:
+        if _gunluk.handlers: return
+        os.makedirs(os.path.dirname(OLCUM_GUNLUGU) or ".", exist_ok=True)
+        isleyici = logging.FileHandler(OLCUM_GUNLUGU, encoding="utf-8")
+        isleyici.setFormatter(logging.Formatter("%(message)s"))
+        _gunluk.addHandler(isleyici)
+        _gunluk.setLevel(logging.INFO)
+
+def olay(ad, **alanlar):
+    # Tek satırlık JSON olay kaydı: {"zaman": ..., "olay": ad, "pid": ..., ...}
+    if not OLCUM_GUNLUGU: return
+    _gunluk_hazirla()
+    kayit = {"zaman": datetime.now().isoformat(timespec="milliseconds"), "olay": ad, "pid": os.getpid()}
+    kayit.update(alanlar)
+    _gunluk.info(json.dumps(kayit, ensure_ascii=False, default=str))
+
+@contextmanager
+def sure_olc(ad, aciklama="", gunluge=None, **etiketler):
+    # Bloğun süresini `ad` histogramına (saniye) işler; `gunluge` verilirse aynı adla olay da yazar
+    bas = time.perf_counter()
+    alanlar = {}
+    try:
+        yield alanlar
+    finally:
+        sure = time.perf_counter() - bas
+        gozlemle(ad, sure, aciklama, **etiketler)
+        if gunluge: olay(gunluge, sure_ms=round(sure * 1000, 2), **etiketler, **alanlar)
+
+# --- ÖNBELLEK İSABETİ ---
+# st.cache_data gövdesi yalnızca ıskalamada çalışır; gövde `iskalandi()` çağırır, sarmalayıcı sonucu okur
+_yerel = threading.local()
+
+def iskalandi():
+    _yerel.iskalama = True
+
+@contextmanager
+def onbellek_olc(kaynak):
+    _yerel.iskalama = False
+    with sure_olc("migros_pano_yukleme_saniye", "Panonun veri yükleme süresi", kaynak=kaynak):
+        bas = time.perf_counter()
+        yield
+        sonuc = "iskalama" if _yerel.iskalama else "isabet"
+        say("migros_pano_onbellek_toplam", aciklama="Pano önbellek isabet/ıskalama sayısı", kaynak=kaynak, sonuc=sonuc)
+        if sonuc == "iskalama":
+            olay("onbellek_yukleme", kaynak=kaynak, sure_ms=round((time.perf_counter() - bas) * 1000, 2))
+
+# --- DIŞA AKTARIM ---
+_son_yazim = {}
+
+def metrikleri_yaz(rol, en_az_aralik=0.0):
+    # <OLCUM_DIZINI>/metrikler_<rol>.prom (node_exporter textfile biçimi); her süreç kendi dosyasını yazar
+    simdi = time.monotonic()
+    if en_az_aralik and simdi - _son_yazim.get(rol, float("-inf")) < en_az_aralik: return None
+    _son_yazim[rol] = simdi
+    yol = os.path.join(OLCUM_DIZINI, f"metrikler_{rol}.prom")
+    os.makedirs(OLCUM_DIZINI, exist_ok=True)
+    gecici = f"{yol}.{os.getpid()}.tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        f.write(KAYIT.prometheus_metni())
+    os.replace(gecici, yol)
+    return yol
+
+def metrik_sunucusu_baslat(port=None, dinleme=None):
+    # /metrics yolunda Prometheus metnini sunan arka plan HTTP sunucusu. Port doluysa (ör. aynı portu açmaya çalışan
+    # ikinci pano süreci) uyarı verip None döner; uç noktayı ilk açan süreç sunar.
+    port = port or METRIK_PORTU
+    dinleme = dinleme or METRIK_DINLEME
+
+    class Yanitlayici(BaseHTTPRequestHandler):
+        def log_message(self, *args): pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            govde = KAYIT.prometheus_metni().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(govde)))
+            self.end_headers()
+            self.wfile.write(govde)
+
+    try:
+        sunucu = ThreadingHTTPServer((dinleme, port), Yanitlayici)
+    except OSError as e:
+        print(f"⚠️ Metrik sunucusu {dinleme}:{port} adresinde açılamadı ({e}); bu süreç /metrics sunmuyor.")
+        return None
+    sunucu.daemon_threads = True
+    threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+    print(f"📈 Metrikler: http://{dinleme}:{sunucu.server_address[1]}/metrics")
+    return sunucu
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pandas as pd
+
+import migros_olcum as olcum
+
+# --- PAYLAŞILAN VERİ ÖNBELLEĞİ ---
+# Paylaşılan çerçeveler oturumlara sığ kopya olarak verilir; yazma anında kopyalama (CoW) açıkken bir oturumun
+# değişikliği yalnızca kendi görünümünü etkiler, veri bir kez bellekte durur. CoW'u uygulama açılışta kendisi açar
+# (bkz. app.py; pandas 3'te zaten varsayılan).
+
+HATA_BEKLEMESI = 60  # başarısız yüklemeden sonra aynı sürüm bu kadar saniye tekrar denenmez
+
+def _gorunum(deger):
+    # Paylaşılan değerin oturuma verilecek hali: çerçeveler veri kopyalanmadan yeni nesne olarak döner
+    if isinstance(deger, (pd.DataFrame, pd.Series)): return deger.copy(deep=False)
+    if isinstance(deger, tuple): return tuple(_gorunum(d) for d in deger)
+    return deger
+
+class PaylasilanVeri:
+    # Süreç genelinde tek kopya tutulan, sürüm anahtarlı veri seti (sürüm: son başarılı taramanın zamanı).
+    # İstenen sürüm yüklü olandan farklıysa eski veri sunulmaya devam eder; yenisi arka plan iş parçacığında
+    # yüklenip tek atamayla değiştirilir. Yalnızca hiç veri yokken (ilk istek) yükleme beklenir.
+    def __init__(self, ad, yukle):
+        self.ad = ad
+        self.yukle = yukle
+        self._anlik = None          # (sürüm, değer); okuyucular kilitsiz okur
+        self._ilk_kilit = threading.Lock()
+        self._kilit = threading.Lock()
+        self._yuklenen = None       # arka planda yüklenmekte olan sürüm
+        self._hata = (None, 0.0)    # (sürüm, zaman)
+
+    @property
+    def surum(self):
+        anlik = self._anlik
+        return anlik[0] if anlik else None
+
+    def getir(self, surum):
+        # (sunulan sürüm, değer) döndürür; sunulan sürüm yeni sürüm yüklenene kadar eskisi olabilir
+        anlik = self._anlik
+        if anlik is None:
+            with self._ilk_kilit:
+                if self._anlik is None:
+                    olcum.say("migros_pano_onbellek_toplam", aciklama="Pano önbellek isabet/ıskalama sayısı", kaynak=self.ad, sonuc="iskalama")
+                    self._yukle(surum)
+            anlik = self._anlik
+        elif anlik[0] != surum:
+            self.hazirla(surum)
+            olcum.say("migros_pano_onbellek_toplam", aciklama="Pano önbellek isabet/ıskalama sayısı", kaynak=self.ad, sonuc="bayat")
+        else:
+            olcum.say("migros_pano_onbellek_toplam", aciklama="Pano önbellek isabet/ıskalama sayısı", kaynak=self.ad, sonuc="isabet")
+        return anlik[0], _gorunum(anlik[1])
+
+    def hazirla(self, surum):
+        # Sürüm yüklü değilse arka planda yüklemeyi başlatır (beklemez); o an sunulan sürümü döndürür
+        anlik = self._anlik
+        if anlik is not None and anlik[0] == surum: return surum
+        with self._kilit:
+            if self._yuklenen is not None: return self.surum
+            hata_surumu, hata_zamani = self._hata
+            if hata_surumu == surum and time.monotonic() - hata_zamani < HATA_BEKLEMESI: return self.surum
+            self._yuklenen = surum
+        threading.Thread(target=self._arka_plan, args=(surum,), daemon=True, name=f"onbellek-{self.ad}").start()
+        return self.surum
+
+    def _arka_plan(self, surum):
+        try:
+            self._yukle(surum)
+        except Exception as e:
+            # Eski veri sunulmaya devam eder
+            print(f"⚠️ {self.ad} verisi yüklenemedi: {e}")
+            self._hata = (surum, time.monotonic())
+            olcum.say("migros_onbellek_hata_toplam", aciklama="Başarısız paylaşılan veri yüklemesi", kaynak=self.ad)
+        finally:
+            with self._kilit:
+                self._yuklenen = None
+
+    def _yukle(self, surum):
+        with olcum.sure_olc("migros_onbellek_yukleme_saniye", "Paylaşılan veri yükleme süresi", gunluge="onbellek_yukleme", kaynak=self.ad):
+            deger = self.yukle(surum)
+        # Tek atama: okuyucular ya eski ya yeni (sürüm, değer) çiftini görür
+        self._anlik = (surum, deger)
+        olcum.ayarla("migros_onbellek_surum_zamani", time.time(), "Paylaşılan verinin son değiştirilme zamanı", kaynak=self.ad)
@@ -0,0 +1,437 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import migros_olcum as olcum
+from migros_alarm import alarm_motoru_olustur
+from migros_depo import (DEPO_DIZINI, depo_olustur, sheets_aktarimi_olustur, satirlari_cerceveye, parquet_atomik_yaz,
+                         urun_id_doldur)
+from migros_http import HttpOturumu, HizSinirlayici, SANIYEDE_ISTEK
+from migros_scraper import KATEGORILER, EN_FAZLA_SAYFA, PARCA_ISCI, sayfalari_uret, sayfa_satirlari, SayfaAlinamadi
+from migros_seri import seri_deposu
+
+# --- PARÇALI TARAMA AYARLARI ---
+# İş kuyruğu dizini; birden çok makine aynı dizini (paylaşılan dosya sistemi) görerek aynı taramayı boşaltabilir
+PARCA_DIZINI = os.environ.get("MIGROS_PARCA_DIZINI", os.path.join(DEPO_DIZINI, "parcalar"))
+# Büyük kategoriler bu kadar sayfalık iş birimlerine bölünür
+BIRIM_SAYFA = int(os.environ.get("MIGROS_PARCA_SAYFA", "10"))
+# Bu kadar saniye nabız vermeyen işçinin birimi başka işçiye verilir
+ZAMAN_ASIMI = float(os.environ.get("MIGROS_PARCA_ZAMAN_ASIMI", "300"))
+# İşçi süreç başına saniyede istek (0 = makinenin MIGROS_SANIYEDE_ISTEK bütçesi işçilere bölünür)
+PARCA_SANIYEDE_ISTEK = float(os.environ.get("MIGROS_PARCA_SANIYEDE_ISTEK", "0"))
+BEKLEME = 0.2  # saniye, boş kuyrukta başka süreç/makinelerdeki değişiklikler için yoklama aralığı
+KLASORLER = ("bekleyen", "alinan", "hatali", "cikti")
+
+def birim_adi(kat, baslangic):
+    return f"{kat}@{baslangic:04d}"
+
+def _birim_kategorisi(ad):
+    return ad.rsplit("@", 1)[0]
+
+def _json_yaz(yol, veri):
+    gecici = os.path.join(os.path.dirname(yol), f".{os.path.basename(yol)}.{socket.gethostname()}.{os.getpid()}.tmp")
+    with open(gecici, "w", encoding="utf-8") as f:
+        json.dump(veri, f, ensure_ascii=False)
+    os.replace(gecici, yol)
+
+# --- DOSYA TABANLI İŞ KUYRUĞU ---
+class IsKuyrugu:
+    # Bir parçalı taramanın paylaşılan dizindeki iş kuyruğu:
+    #   <dizin>/tarama.json             tarama kimliği, tarama zamanı, birleştirilmiş birimler
+    #   <dizin>/bekleyen/<birim>.json   alınmayı bekleyen birim {kategori, baslangic, bitis}
+    #   <dizin>/alinan/<birim>.json     bir işçinin üzerindeki birim (işçi her sayfada dosya zamanını tazeler)
+    #   <dizin>/hatali/<birim>.json     alınamayan sayfadan itibaren kalan kısım (`--devam` ile kuyruğa döner)
+    #   <dizin>/cikti/<birim>.parquet   birimin normalize edilmiş satırları
+    # Birim almak bekleyen/ -> alinan/ atomik yeniden adlandırmasıdır; aynı birimi iki işçi alamaz.
+    def __init__(self, dizin):
+        self.dizin = dizin
+        self.durum_yolu = os.path.join(dizin, "tarama.json")
+        # Aynı süreçteki işçi iş parçacıkları birim eklenince/bitince uyandırılır (yoklama beklemesi olmadan)
+        self._degisti = threading.Condition()
+        self.surum = 0
+
+    def _haber_ver(self):
+        with self._degisti:
+            self.surum += 1
+            self._degisti.notify_all()
+
+    def bekle(self, surum, sure=BEKLEME):
+        # Kuyruk bu süreçte `surum`dan beri değişene ya da `sure` dolana kadar bekler; başka süreç ve makinelerdeki
+        # değişiklikler süre dolunca görülür
+        with self._degisti:
+            self._degisti.wait_for(lambda: self.surum != surum, sure)
+
+    def _yol(self, klasor, ad=""):
+        return os.path.join(self.dizin, klasor, ad)
+
+    @classmethod
+    def olustur(cls, tarama_id, tarih, kategoriler, kok=PARCA_DIZINI):
+        kuyruk = cls(os.path.join(kok, tarama_id))
+        for klasor in KLASORLER: os.makedirs(kuyruk._yol(klasor), exist_ok=True)
+        kuyruk.durum_yaz({"tarama_id": tarama_id, "tarih": tarih.isoformat(), "durum": "yarim",
+                          "baslangic": datetime.now().isoformat(timespec="seconds"), "tur": 0, "birlesen": []})
+        for kat in kategoriler: kuyruk.ekle(kat, 1, None)
+        return kuyruk
+
+    @classmethod
+    def yarim_kalan(cls, kok=PARCA_DIZINI):
+        # En son başlatılmış, birleştirmesi tamamlanmamış tarama (yoksa None)
+        adaylar = []
+        for ad in (os.listdir(kok) if os.path.isdir(kok) else []):
+            kuyruk = cls(os.path.join(kok, ad))
+            durum = kuyruk.durum_oku()
+            if durum.get("durum") == "yarim": adaylar.append((durum.get("baslangic", ""), kuyruk))
+        return max(adaylar, key=lambda a: a[0])[1] if adaylar else None
+
+    def durum_oku(self):
+        try:
+            with open(self.durum_yolu, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def durum_yaz(self, durum):
+        _json_yaz(self.durum_yolu, durum)
+
+    @property
+    def tarama_id(self):
+        return self.durum_oku().get("tarama_id")
+
+    @property
+    def tarih(self):
+        return datetime.fromisoformat(self.durum_oku()["tarih"])
+
+    def birimler(self, klasor):
+        uzanti = ".parquet" if klasor == "cikti" else ".json"
+        try:
+            return sorted(ad[:-len(uzanti)] for ad in os.listdir(self._yol(klasor)) if ad.endswith(uzanti))
+        except FileNotFoundError:
+            return []
+
+    def ekle(self, kat, baslangic, bitis, klasor="bekleyen", tekrarsiz=False):
+        # `tekrarsiz`: birim herhangi bir aşamada zaten varsa eklenmez (yeniden çalışan planlayıcı birim için)
+        ad = birim_adi(kat, baslangic)
+        if tekrarsiz and any(os.path.exists(self._yol(k, ad + (".parquet" if k == "cikti" else ".json"))) for k in KLASORLER):
+            return
+        _json_yaz(self._yol(klasor, f"{ad}.json"), {"kategori": kat, "baslangic": baslangic, "bitis": bitis})
+        self._haber_ver()
+
+    def al(self):
+        # Sıradaki birimi üzerine alır: (ad, birim) ya da (None, None). Kategorilerin ilk birimleri önce alınır
+        # ki büyük kategorilerin bölünmesi erken başlasın.
+        for ad in sorted(self.birimler("bekleyen"), key=lambda a: (not a.endswith("@0001"), a)):
+            hedef = self._yol("alinan", f"{ad}.json")
+            try:
+                os.rename(self._yol("bekleyen", f"{ad}.json"), hedef)
+            except FileNotFoundError:
+                continue  # başka bir işçi aldı
+            self.nabiz(ad)
+            with open(hedef, encoding="utf-8") as f:
+                return ad, json.load(f)
+        return None, None
+
+    def nabiz(self, ad):
+        try: os.utime(self._yol("alinan", f"{ad}.json"))
+        except FileNotFoundError: pass
+
+    def bitir(self, ad, df, kalan=None):
+        # Çıktı yazılmadan birim bırakılmaz; `kalan` (kategori, baslangic, bitis) hatalı birim olarak saklanır
+        if df is not None and not df.empty:
+            parquet_atomik_yaz(pa.Table.from_pandas(df, preserve_index=False), self._yol("cikti", f"{ad}.parquet"))
+        if kalan: self.ekle(*kalan, klasor="hatali")
+        try: os.remove(self._yol("alinan", f"{ad}.json"))
+        except FileNotFoundError: pass  # zaman aşımıyla geri alınmış; tekrarlar birleştirmede atılır
+        self._haber_ver()
+
+    def _tasi(self, kaynak, ad):
+        try: os.rename(self._yol(kaynak, f"{ad}.json"), self._yol("bekleyen", f"{ad}.json"))
+        except FileNotFoundError: return 0
+        return 1
+
+    def bayatlari_geri_al(self):
+        # ZAMAN_ASIMI boyunca nabız vermeyen (çökmüş) işçinin birimlerini kuyruğa döndürür
+        sinir = time.time() - ZAMAN_ASIMI
+        geri = 0
+        for ad in self.birimler("alinan"):
+            try:
+                if os.path.getmtime(self._yol("alinan", f"{ad}.json")) < sinir: geri += self._tasi("alinan", ad)
+            except FileNotFoundError:
+                pass
+        return geri
+
+    def yeniden_kuyruga_al(self):
+        # Devam: hatalı ve önceki çalışmadan üzerinde kalmış birimler tekrar alınabilir olur
+        return sum(self._tasi(klasor, ad) for klasor in ("hatali", "alinan") for ad in self.birimler(klasor))
+
+    def eksik_kategoriler(self):
+        return sorted({_birim_kategorisi(ad) for klasor in ("bekleyen", "alinan", "hatali") for ad in self.birimler(klasor)})
+
+    def biten_kategoriler(self):
+        # Bekleyen veya alınmış birimi kalmamış kategoriler ve çıktılarındaki satır sayısı
+        acik = {_birim_kategorisi(ad) for klasor in ("bekleyen", "alinan") for ad in self.birimler(klasor)}
+        biten = {}
+        for ad in self.birimler("cikti"):
+            kat = _birim_kategorisi(ad)
+            if kat in acik: continue
+            biten[kat] = biten.get(kat, 0) + pq.read_metadata(self._yol("cikti", f"{ad}.parquet")).num_rows
+        for ad in self.birimler("hatali"):
+            biten.setdefault(_birim_kategorisi(ad), 0)
+        return biten
+
+    def cikti_oku(self, birimler):
+        parcalar = [pd.read_parquet(self._yol("cikti", f"{ad}.parquet")) for ad in birimler]
+        return pd.concat(parcalar, ignore_index=True) if parcalar else pd.DataFrame()
+
+    def sil(self):
+        shutil.rmtree(self.dizin, ignore_errors=True)
+
+# --- İŞÇİ ---
+def birim_tara(kuyruk, ad, birim, oturum, tarih, api_tabani=None):
+    # Birimin sayfalarını çekip normalize eder ve çıktısını kuyruğa bırakır; yazılan satır sayısını döndürür
+    kat, baslangic, bitis = birim["kategori"], birim["baslangic"], birim.get("bitis")
+    satirlar = []
+    sonraki = baslangic
+    hatali = False
+
+    def planla(toplam_sayfa):
+        nonlocal bitis
+        # Yalnızca kategorinin ilk birimi böler: kalan sayfalar BIRIM_SAYFA'lık birimler olarak kuyruğa girer,
+        # son birim kategorinin bildirilen sayfa sayısına kadar gider
+        if baslangic != 1 or bitis is not None or not toplam_sayfa or toplam_sayfa <= BIRIM_SAYFA: return None
+        sinir = min(toplam_sayfa, EN_FAZLA_SAYFA)
+        for bas in range(1 + BIRIM_SAYFA, sinir + 1, BIRIM_SAYFA):
+            son = bas + BIRIM_SAYFA - 1
+            kuyruk.ekle(kat, bas, None if son >= sinir else son, tekrarsiz=True)
+        bitis = BIRIM_SAYFA
+        return bitis
+
+    with olcum.sure_olc("migros_parca_birim_suresi_saniye", "İş birimi başına tarama süresi", gunluge="parca_birimi", kategori=kat) as alanlar:
+        alanlar["birim"] = ad
+        try:
+            for sayfa, raw_products in sayfalari_uret(kat, oturum, api_tabani, baslangic=baslangic, bitis=bitis, planla=planla):
+                satirlar.extend(sayfa_satirlari(raw_products, kat, tarih))
+                sonraki = sayfa + 1
+                kuyruk.nabiz(ad)
+        except SayfaAlinamadi:
+            hatali = True
+        except Exception as e:
+            print(f"⚠️ Hata ({ad}): {e}")
+            hatali = True
+        alanlar["urun"] = len(satirlar)
+        alanlar["tamam"] = not hatali
+    kuyruk.bitir(ad, satirlari_cerceveye(satirlar) if satirlar else None, (kat, sonraki, bitis) if hatali else None)
+    if hatali: olcum.say("migros_parca_hatali_birim_toplam", aciklama="Yarım kalan iş birimi", kategori=kat)
+    return len(satirlar)
+
+def isci_calistir(dizin, isci_no=0, saniyede=None, api_tabani=None):
+    # Kuyrukta alınacak ya da başka işçide süren birim kalmayana kadar çalışır; işçi istatistiğini döndürür.
+    # Süreç içinde oturumun eşzamanlılığı kadar birim paralel taranır (tek süreçli akış hattındaki kategoriler gibi).
+    kuyruk = IsKuyrugu(dizin)
+    tarih = kuyruk.tarih
+    oturum = HttpOturumu(sinirlayici=HizSinirlayici(saniyede or SANIYEDE_ISTEK))
+    sayac = {"birim": 0, "urun": 0}
+    kilit = threading.Lock()
+
+    def dongu():
+        while True:
+            surum = kuyruk.surum
+            ad, birim = kuyruk.al()
+            if ad is None:
+                if kuyruk.bayatlari_geri_al(): continue
+                # Süren birim yoksa yeni birim de gelmez (yalnızca kategorinin ilk birimi kuyruğa ekler)
+                if not kuyruk.birimler("alinan"): return
+                kuyruk.bekle(surum)
+                continue
+            adet = birim_tara(kuyruk, ad, birim, oturum, tarih, api_tabani)
+            with kilit:
+                sayac["birim"] += 1
+                sayac["urun"] += adet
+
+    with ThreadPoolExecutor(max_workers=oturum.eszamanli) as havuz:
+        for gorev in [havuz.submit(dongu) for _ in range(oturum.eszamanli)]: gorev.result()
+    olcum.metrikleri_yaz(f"parca_{socket.gethostname()}_{isci_no}")
+    return {**sayac, **oturum.istatistik()}
+
+_havuz = None  # (isci, ProcessPoolExecutor): taramalar arasında yeniden kullanılır
+_havuz_kilidi = threading.Lock()
+
+def _surec_havuzu(isci):
+    # İşçi süreçler süreç ömrü boyunca (zamanlayıcıda taramalar arasında) tutulur. Süreçler forkserver'dan çatallanır:
+    # pandas/pyarrow ve tarayıcı modülleri her işçide ayrı ayrı değil, sunucuda bir kez yüklenir. fork kullanılmaz,
+    # zamanlayıcı/pano sürecinin iş parçacıkları ve kilitleri çocuklara kopyalanmasın; forkserver yoksa (Windows) spawn.
+    global _havuz
+    with _havuz_kilidi:
+        if _havuz is not None and _havuz[0] == isci: return _havuz[1]
+        if _havuz is not None: _havuz[1].shutdown()
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            baglam = multiprocessing.get_context("forkserver")
+            baglam.set_forkserver_preload([__name__ if __name__ != "__main__" else "migros_parca"])
+        else:
+            baglam = multiprocessing.get_context("spawn")
+        _havuz = (isci, ProcessPoolExecutor(max_workers=isci, mp_context=baglam))
+        return _havuz[1]
+
+def havuzu_kapat():
+    global _havuz
+    with _havuz_kilidi:
+        if _havuz is not None: _havuz[1].shutdown()
+        _havuz = None
+
+def isci_havuzu(kuyruk, isci, saniyede=None, api_tabani=None, bekle=None):
+    # `isci` süreçte kuyruğu boşaltır; işçi istatistiklerini döndürür. `bekle()` işçiler sürerken yoklanır.
+    saniyede = saniyede or PARCA_SANIYEDE_ISTEK or SANIYEDE_ISTEK / isci
+    try:
+        havuz = _surec_havuzu(isci)
+        gorevler = [havuz.submit(isci_calistir, kuyruk.dizin, i, saniyede, api_tabani) for i in range(isci)]
+    except BrokenProcessPool:
+        # Önceki taramada çöken işçi havuzu kullanılamaz hale getirir; bir kez yeniden kurulur
+        havuzu_kapat()
+        havuz = _surec_havuzu(isci)
+        gorevler = [havuz.submit(isci_calistir, kuyruk.dizin, i, saniyede, api_tabani) for i in range(isci)]
+    while wait(gorevler, timeout=1.0).not_done:
+        if bekle: bekle()
+    istatistikler = []
+    for gorev in gorevler:
+        try:
+            istatistikler.append(gorev.result())
+        except BrokenProcessPool as e:
+            print(f"⚠️ İşçi süreç hatası: {e}")
+            havuzu_kapat()
+        except Exception as e:
+            print(f"⚠️ İşçi süreç hatası: {e}")
+    return istatistikler
+
+# --- BİRLEŞTİRME ---
+def birlestir(kuyruk, depo, aktarim=None, alarm=None):
+    # Henüz birleştirilmemiş birim çıktılarını tek çerçevede toplar, tekrarları atar ve depoya tek tarama olarak
+    # yazar; (birleştirilen, depoya yazılan) çerçevelerini döndürür. Tur kimliği (<tarama_id>-<tur>) bölüm dosya
+    # adlarını belirler: yarıda kesilen birleştirme aynı turla tekrarlanınca aynı dosyaların üzerine yazar, özet
+    # ve artımlı depo durumu zaten işlenmiş satırları yok sayar (çift kayıt oluşmaz).
+    durum = kuyruk.durum_oku()
+    tur = durum.get("bekleyen_tur")
+    if tur is None:
+        birlesen = set(durum["birlesen"])
+        birimler = [ad for ad in kuyruk.birimler("cikti") if ad not in birlesen]
+        if not birimler: return None, None
+        tur = durum["bekleyen_tur"] = {"no": durum["tur"] + 1, "birimler": birimler}
+        kuyruk.durum_yaz(durum)
+    with olcum.sure_olc("migros_parca_birlestirme_saniye", "Parça çıktılarının depoya birleştirilme süresi",
+                        gunluge="parca_birlestirme") as alanlar:
+        df = kuyruk.cikti_oku(tur["birimler"])
+        alanlar.update(birim=len(tur["birimler"]), satir=len(df))
+        # Zaman aşımıyla iki kez taranan birim ya da tekrar planlanan sayfalar: ürün kategori başına bir kez yazılır.
+        # Kimliği boş gelen ürünler önce linkten doldurulur, yoksa hepsi tek satıra inerdi
+        df = urun_id_doldur(df).drop_duplicates(["Ürün ID", "Kategori"], keep="first").reset_index(drop=True)
+        alanlar["tekil"] = len(df)
+        yazilan = depo.yaz(df, ad=f"{kuyruk.tarama_id}-{tur['no']}")
+    if aktarim is not None and yazilan is not None and not yazilan.empty:
+        try:
+            aktarim.yaz(yazilan)
+        except Exception as e:
+            print(f"⚠️ Sheets aktarım hatası: {e}")
+    if alarm:
+        try:
+            alarm.degerlendir(df)
+        except Exception as e:
+            print(f"⚠️ Alarm değerlendirme hatası: {e}")
+    durum["birlesen"] = durum["birlesen"] + tur["birimler"]
+    durum["tur"] = tur["no"]
+    del durum["bekleyen_tur"]
+    kuyruk.durum_yaz(durum)
+    return df, yazilan
+
+# --- KOORDİNATÖR ---
+def parcali_calistir(isci=None, ilerleme=None, devam=False, tarama_id=None, api_tabani=None):
+    # Kategorileri (büyüklerini sayfa aralıklarına bölerek) işçi süreçlere dağıtır, her birim kendi çıktısını yazar;
+    # işçiler bitince çıktılar tek tarama olarak depoya birleştirilir. Dönen istatistik `calistir` ile aynı biçimdedir.
+    print("🚀 Parçalı tarama başlatılıyor...")
+    tarama_bas = time.perf_counter()
+    depo = depo_olustur()
+    if depo is None:
+        print("❌ Depo bağlantısı başarısız!")
+        return
+    isci = max(1, isci or PARCA_ISCI or os.cpu_count() or 1)
+
+    kuyruk = IsKuyrugu.yarim_kalan() if devam else None
+    devam_edildi = kuyruk is not None
+    if devam_edildi:
+        geri = kuyruk.yeniden_kuyruga_al()
+        print(f"↩️ {kuyruk.tarama_id} parçalı taramasına devam ediliyor ({geri} birim yeniden kuyrukta).")
+    else:
+        if devam: print("ℹ️ Devam edilecek yarım parçalı tarama yok, yeni tarama başlatılıyor.")
+        kuyruk = IsKuyrugu.olustur(tarama_id or uuid.uuid4().hex[:12], datetime.now().replace(second=0, microsecond=0), KATEGORILER)
+    print(f"⏳ {len(KATEGORILER)} kategori {isci} işçi süreçte taranıyor (kuyruk: {kuyruk.dizin})...")
+
+    bildirilen = set()
+    def ilerlemeyi_bildir():
+        if not ilerleme: return
+        for kat, adet in kuyruk.biten_kategoriler().items():
+            if kat not in bildirilen:
+                bildirilen.add(kat)
+                ilerleme(kat, adet)
+
+    istatistikler = isci_havuzu(kuyruk, isci, api_tabani=api_tabani, bekle=ilerlemeyi_bildir)
+    ilerlemeyi_bildir()
+
+    # Motor, indeksini birleştirme yazmadan önceki özetten kurar; sonra kurulsa tüm düşüşler "görülmüş" sayılırdı
+    alarm = alarm_motoru_olustur(depo)
+    df, _ = birlestir(kuyruk, depo, sheets_aktarimi_olustur(), alarm)
+    try:
+        seriler = seri_deposu(depo, kur=True)
+        if seriler and df is not None: seriler.guncelle({kuyruk.tarih})
+    except Exception as e:
+        print(f"⚠️ Fiyat serisi toplamları güncellenemedi: {e}")
+
+    toplam_kayit = 0 if df is None else len(df)
+    eksik = kuyruk.eksik_kategoriler()
+    tarama_kimligi = kuyruk.tarama_id
+    if eksik:
+        print(f"⚠️ {len(eksik)} kategori eksik kaldı ({', '.join(eksik)}); `--devam` ile yalnızca eksik birimler çekilir.")
+    else:
+        # Her şey birleştirildi: kuyruk dizini artık gereksiz
+        kuyruk.sil()
+
+    istatistik = {anahtar: sum(i.get(anahtar, 0) for i in istatistikler)
+                  for anahtar in ("istek", "baglanti", "yeniden_deneme", "bayt", "degismedi_304", "hata")}
+    istatistik["urun"] = toplam_kayit
+    istatistik["tarama_id"] = tarama_kimligi
+    istatistik["devam"] = devam_edildi
+    istatistik["eksik_kategoriler"] = eksik
+    istatistik["alarm"] = alarm.uretilen if alarm else 0
+    istatistik["parca_isci"] = isci
+    istatistik["parca_birim"] = sum(i.get("birim", 0) for i in istatistikler)
+    istatistik["sure_sn"] = round(time.perf_counter() - tarama_bas, 2)
+    olcum.ayarla("migros_tarama_suresi_saniye", istatistik["sure_sn"], "Son taramanın toplam süresi")
+    olcum.ayarla("migros_tarama_urun", toplam_kayit, "Son taramada yazılan ürün")
+    olcum.ayarla("migros_tarama_eksik_kategori", len(eksik), "Son taramada eksik kalan kategori")
+    olcum.ayarla("migros_tarama_bitis_zamani", time.time(), "Son taramanın bitiş zamanı (unix)")
+    olcum.olay("tarama", **istatistik)
+    olcum.metrikleri_yaz("tarama")
+    print(f"🏁 İŞLEM TAMAMLANDI! Toplam {toplam_kayit} ürün güncellendi ({isci} işçi, {istatistik['parca_birim']} birim).")
+    return istatistik
+
+if __name__ == "__main__":
+    # Başka bir makinede işçi: paylaşılan MIGROS_PARCA_DIZINI'ndeki yarım taramayı koordinatörle birlikte boşaltır
+    parser = argparse.ArgumentParser(description="Parçalı tarama işçisi")
+    parser.add_argument("--surec", type=int, default=0, help="Bu makinede çalışacak işçi süreç sayısı (0: çekirdek sayısı)")
+    parser.add_argument("--kuyruk", default=None, help="Tarama kuyruğu dizini (varsayılan: en son yarım tarama)")
+    args = parser.parse_args()
+    kuyruk = IsKuyrugu(args.kuyruk) if args.kuyruk else IsKuyrugu.yarim_kalan()
+    if kuyruk is None:
+        print("ℹ️ Boşaltılacak yarım parçalı tarama yok.")
+    else:
+        istatistikler = isci_havuzu(kuyruk, max(1, args.surec or os.cpu_count() or 1))
+        print(f"🏁 {sum(i['birim'] for i in istatistikler)} birim, {sum(i['urun'] for i in istatistikler)} ürün tarandı.")
@@ -1,11 +1,33 @@
-import requests
-import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
 import re
 import os
+import json
+import math
+import queue
+import threading
+import uuid
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from migros_http import HttpOturumu
+import migros_olcum as olcum
+from migros_alarm import alarm_motoru_olustur
+from migros_seri import seri_deposu
 import time
+from migros_depo import urun_kodu_cikar, depo_olustur, sheets_aktarimi_olustur, ToplulukYazici, DEPO_DIZINI
+
+# --- TARAMA AYARLARI ---
+# Yerel stub sunucu ile test için API adresi ortam değişkeninden değiştirilebilir
+API_TABANI = os.environ.get("MIGROS_API_TABANI", "https://www.migros.com.tr")
+# Üreticiler ile yazıcı arasındaki kuyrukta bekleyebilecek en fazla sayfa (0 = eşzamanlılığın 2 katı)
+KUYRUK_BOYUTU = int(os.environ.get("MIGROS_KUYRUK_BOYUTU", "0"))
+# Bir kategoride çekilecek en fazla sayfa (güvenlik sınırı) ve kategori içinde paralel çekilen sayfa sayısı (0 = eşzamanlılık)
+EN_FAZLA_SAYFA = int(os.environ.get("MIGROS_EN_FAZLA_SAYFA", "200"))
+SAYFA_ESZAMANLI = int(os.environ.get("MIGROS_SAYFA_ESZAMANLI", "0"))
+# Parçalı tarama için yerel işçi süreç sayısı (0 = tek süreçli akış hattı; bkz. migros_parca)
+PARCA_ISCI = int(os.environ.get("MIGROS_PARCA_ISCI", "0"))
+# Yarıda kalan taramanın kategori/sayfa ilerlemesi
+KONTROL_DOSYASI = os.path.join(DEPO_DIZINI, "tarama_kontrol.json")
 
 # --- TAM KATEGORİ LİSTESİ (SİTEDEKİ MENÜYE GÖRE) ---
 KATEGORILER = [
@@ -27,23 +49,16 @@ KATEGORILER = [
     "elektronik-c-11"                   # Elektronik
 ]
 
-def google_sheets_baglan():
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    try:
-        import streamlit as st
-        creds_dict = dict(st.secrets["gcp_service_account"])
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    except:
-        if os.path.exists("secrets.json"):
-            creds = ServiceAccountCredentials.from_json_keyfile_name("secrets.json", scope)
-        else:
-            return None
-    client = gspread.authorize(creds)
-    return client.open("Migros_Takip_DB")
-
-def tr_format(sayi):
-    if sayi is None: return "0"
-    return f"{float(sayi):.2f}".replace('.', ',')
+# --- ARAMA YANITI ŞEMASI ---
+# Ürün listesinin bulunabileceği yollar; kategori başına ilk eşleşen yol önbelleğe alınır
+URUN_YOLLARI = [
+    ("data", "searchInfo", "storeProductInfos"),
+    ("data", "products"),
+    ("data", "storeProductInfos")
+]
+SAYFA_SAYISI_YOLLARI = [("data", "searchInfo", "pageCount"), ("data", "pageCount")]
+TOPLAM_URUN_YOLLARI = [("data", "searchInfo", "hitCount"), ("data", "hitCount"), ("data", "searchInfo", "totalCount")]
+_sema_onbellegi = {}
 
 def kampanya_temizle(badges):
     temiz = []
@@ -54,149 +69,439 @@ def kampanya_temizle(badges):
         temiz.append(val)
     return ", ".join(temiz) if temiz else ""
 
-def veri_cek(slug):
-    tum_urunler = []
-    page = 1
-    max_sayfa = 50 
-    
-    while page <= max_sayfa:
+# Tüm taramanın paylaştığı keep-alive oturumu (bağlantı havuzu + yeniden deneme)
+VARSAYILAN_OTURUM = None
+
+def oturum_al():
+    global VARSAYILAN_OTURUM
+    if VARSAYILAN_OTURUM is None:
+        VARSAYILAN_OTURUM = HttpOturumu()
+    return VARSAYILAN_OTURUM
+
+class SayfaAlinamadi(Exception):
+    pass
+
+def _yol_degeri(data, yol):
+    for anahtar in yol:
+        if not isinstance(data, dict) or anahtar not in data: return None
+        data = data[anahtar]
+    return data
+
+def urunleri_ayikla(data, slug=None):
+    # API yapısı bazen değişiyor: önce bu kategoride eşleşmiş yolu, olmazsa tüm ihtimalleri dene
+    yol = _sema_onbellegi.get(slug)
+    if yol is not None:
+        urunler = _yol_degeri(data, yol)
+        if urunler: return urunler
+    for yol in URUN_YOLLARI:
+        urunler = _yol_degeri(data, yol)
+        if urunler:
+            _sema_onbellegi[slug] = yol
+            return urunler
+    return []
+
+def _sayi(data, yollar):
+    for yol in yollar:
+        deger = _yol_degeri(data, yol)
+        if isinstance(deger, (int, float)) and not isinstance(deger, bool) and deger > 0:
+            return int(deger)
+    return None
+
+def sayfa_plani(data, sayfa_boyu):
+    # (toplam_sayfa, toplam_urun) — API bildirmiyorsa None
+    toplam_urun = _sayi(data, TOPLAM_URUN_YOLLARI)
+    toplam_sayfa = _sayi(data, SAYFA_SAYISI_YOLLARI)
+    if toplam_sayfa is None and toplam_urun and sayfa_boyu:
+        toplam_sayfa = math.ceil(toplam_urun / sayfa_boyu)
+    return toplam_sayfa, toplam_urun
+
+def sayfalari_uret(slug, oturum=None, api_tabani=None, baslangic=1, pencere=None, bitis=None, planla=None):
+    # 1. aşama: kategorinin sayfalarını `baslangic`tan itibaren sırayla (sayfa_no, ham_urunler) olarak üretir.
+    # İlk sayfadaki sayfa/ürün sayısıyla kalan sayfalar planlanır ve `pencere` kadarı paralel çekilir;
+    # API bu bilgiyi vermezse boş sayfaya kadar tek tek ilerlenir. Alınamayan sayfa SayfaAlinamadi fırlatır.
+    # `bitis` verilirse o sayfadan sonrası çekilmez; `planla(toplam_sayfa)` ilk sayfadan sonra çağrılır ve
+    # None dışında döndürdüğü değer yeni `bitis` olur (parçalı tarama kalan sayfaları başka işçilere dağıtır).
+    oturum = oturum or oturum_al()
+    api_tabani = api_tabani or API_TABANI
+    pencere = max(1, pencere or SAYFA_ESZAMANLI or oturum.eszamanli)
+
+    def getir(page):
         # Migros API Adresi
-        url = f"https://www.migros.com.tr/rest/search/screens/{slug}?page={page}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "X-PWA": "true"
-        }
+        url = f"{api_tabani}/rest/search/screens/{slug}?page={page}"
+        with olcum.sure_olc("migros_tarama_sayfa_suresi_saniye", "Sayfa başına çekme süresi (yeniden denemeler dahil)",
+                            gunluge="sayfa", kategori=slug) as alanlar:
+            alanlar["sayfa"] = page
+            try:
+                # Geçici hatalar (429/5xx, bağlantı kopması) oturum içinde yeniden denenir
+                durum_kodu, data = oturum.get_json(url, timeout=20)
+            except Exception as e:
+                print(f"⚠️ Hata ({slug}): {e}")
+                alanlar["hata"] = str(e)
+                olcum.say("migros_tarama_sayfa_hata_toplam", aciklama="Alınamayan sayfa sayısı", kategori=slug)
+                raise SayfaAlinamadi(f"{slug} sayfa {page}: {e}") from e
+            if durum_kodu != 200:
+                print(f"⚠️ {slug} | Sayfa {page} yanıt vermedi. Kod: {durum_kodu}")
+                alanlar["hata"] = f"HTTP {durum_kodu}"
+                olcum.say("migros_tarama_sayfa_hata_toplam", aciklama="Alınamayan sayfa sayısı", kategori=slug)
+                raise SayfaAlinamadi(f"{slug} sayfa {page}: HTTP {durum_kodu}")
+            urunler = urunleri_ayikla(data, slug)
+            alanlar["urun"] = len(urunler)
+        if urunler:
+            print(f"✅ {slug} | Sayfa: {page} | Ürün: {len(urunler)}")
+            olcum.say("migros_tarama_sayfa_toplam", aciklama="Çekilen dolu sayfa sayısı", kategori=slug)
+            olcum.say("migros_tarama_ham_urun_toplam", len(urunler), "API'den gelen ürün sayısı", kategori=slug)
+        return urunler, data
+
+    ilk, data = getir(baslangic)
+    if not ilk: return
+    yield baslangic, ilk
+    alinan = len(ilk)
+    page = baslangic + 1
+
+    toplam_sayfa, toplam_urun = sayfa_plani(data, len(ilk))
+    if planla:
+        yeni_bitis = planla(toplam_sayfa)
+        if yeni_bitis is not None: bitis = yeni_bitis
+    son_sayfa = EN_FAZLA_SAYFA if bitis is None else min(bitis, EN_FAZLA_SAYFA)
+    if toplam_sayfa is not None:
+        plan = iter(range(page, min(toplam_sayfa, son_sayfa) + 1))
+        bekleyen = deque()
+        with ThreadPoolExecutor(max_workers=pencere) as havuz:
+            try:
+                for p in islice(plan, pencere):
+                    bekleyen.append((p, havuz.submit(getir, p)))
+                while bekleyen:
+                    p, gorev = bekleyen.popleft()
+                    urunler = gorev.result()[0]
+                    if not urunler: return  # katalog tarama sırasında küçülmüş
+                    sonraki = next(plan, None)
+                    if sonraki is not None: bekleyen.append((sonraki, havuz.submit(getir, sonraki)))
+                    alinan += len(urunler)
+                    page = p + 1
+                    yield p, urunler
+            finally:
+                for _, gorev in bekleyen: gorev.cancel()
+        # Plan bitti; bildirilen ürün sayısına ulaşılmadıysa (katalog büyümüş olabilir) sırayla devam et
+        if bitis is not None or not (toplam_urun and baslangic == 1 and alinan < toplam_urun): return
+
+    while page <= son_sayfa:
+        urunler, _ = getir(page)
+        if not urunler: return
+        yield page, urunler
+        page += 1
+
+def urunu_normalize(item, slug, tarih=None):
+    # 2. aşama: ham API ürününü KOLONLAR sıralı tipli satıra çevirir; bozuk üründe None döner
+    try:
+        name = item.get("name", "")
+        reg_p = item.get("regularPrice", 0) / 100
+        shown_p = item.get("shownPrice", 0) / 100
+        if reg_p == 0: reg_p = shown_p
+
+        indirim_tipi = kampanya_temizle(item.get("badges", []))
         
-        try:
-            time.sleep(0.5) 
-            response = requests.get(url, headers=headers, timeout=20)
-            
-            if response.status_code != 200:
-                print(f"⚠️ {slug} | Sayfa {page} yanıt vermedi. Kod: {response.status_code}")
-                break
-            
-            data = response.json()
-            raw_products = []
-            
-            # API yapısı bazen değişiyor, tüm ihtimalleri dene
-            keys_to_check = [
-                ["data", "searchInfo", "storeProductInfos"],
-                ["data", "products"],
-                ["data", "storeProductInfos"]
-            ]
-            
-            for key_path in keys_to_check:
-                try:
-                    temp_data = data
-                    for key in key_path:
-                        temp_data = temp_data[key]
-                    raw_products = temp_data
-                    if raw_products: break
-                except:
-                    continue
-            
-            if not raw_products:
-                break
-            
-            print(f"✅ {slug} | Sayfa: {page} | Ürün: {len(raw_products)}")
-
-            for item in raw_products:
-                try:
-                    name = item.get("name", "")
-                    reg_p = item.get("regularPrice", 0) / 100
-                    shown_p = item.get("shownPrice", 0) / 100
-                    if reg_p == 0: reg_p = shown_p
-
-                    indirim_tipi = kampanya_temizle(item.get("badges", []))
-                    
-                    indirim_orani = 0
-                    durum = "Normal"
-                    if reg_p > shown_p:
-                        indirim_orani = ((reg_p - shown_p) / reg_p) * 100
-                        if indirim_orani > 50: durum = "SÜPER FIRSAT"
-                        elif indirim_orani >= 20: durum = "FIRSAT"
-                        
-                    if "Öde" in indirim_tipi or "Hediye" in indirim_tipi: durum = "ÇOKLU ALIM"
-
-                    images = item.get("images", [])
-                    img_url = images[0]["urls"]["PRODUCT_DETAIL"] if images else ""
-                    
-                    # LİNK DÜZELTME
-                    urun_linki = f"https://www.migros.com.tr/{item.get('prettyName', '')}"
-
-                    birim_fiyat = "0"
-                    birim = "Adet"
-                    match = re.search(r"(\d+)\s*(KG|L|Litre|Lt|Gr|Gram)", name, re.IGNORECASE)
-                    if match: birim = match.group(2).upper()
-
-                    tum_urunler.append([
-                        datetime.now().strftime("%Y-%m-%d %H:%M"),
-                        name,
-                        tr_format(reg_p),
-                        tr_format(shown_p),
-                        indirim_tipi,
-                        tr_format(indirim_orani),
-                        durum,
-                        "Var",
-                        tr_format(birim_fiyat),
-                        birim,
-                        slug,
-                        img_url,
-                        urun_linki
-                    ])
-                except: continue
-            page += 1
-        except Exception as e:
-            print(f"⚠️ Hata ({slug}): {e}")
-            break
+        indirim_orani = 0
+        durum = "Normal"
+        if reg_p > shown_p:
+            indirim_orani = ((reg_p - shown_p) / reg_p) * 100
+            if indirim_orani > 50: durum = "SÜPER FIRSAT"
+            elif indirim_orani >= 20: durum = "FIRSAT"
             
+        if "Öde" in indirim_tipi or "Hediye" in indirim_tipi: durum = "ÇOKLU ALIM"
+
+        images = item.get("images", [])
+        img_url = images[0]["urls"]["PRODUCT_DETAIL"] if images else ""
+        
+        # LİNK DÜZELTME
+        urun_linki = f"https://www.migros.com.tr/{item.get('prettyName', '')}"
+        # Sabit ürün kimliği: linkteki -p- kodu (eski kayıtlarla uyumlu), yoksa API'deki id/sku
+        urun_id = urun_kodu_cikar(urun_linki) or str(item.get("id") or item.get("sku") or "")
+
+        # Birim ve birim fiyat satır satır değil, partinin tamamı için vektörel hesaplanır (satirlari_cerceveye)
+        birim_fiyat = 0.0
+        birim = "ADET"
+
+        return [
+            tarih or datetime.now().replace(second=0, microsecond=0),
+            name,
+            reg_p,
+            shown_p,
+            indirim_tipi,
+            indirim_orani,
+            durum,
+            "Var",
+            birim_fiyat,
+            birim,
+            slug,
+            img_url,
+            urun_linki,
+            urun_id
+        ]
+    except: return None
+
+def sayfa_satirlari(raw_products, slug, tarih=None):
+    with olcum.sure_olc("migros_tarama_normalize_saniye", "Sayfa başına normalizasyon süresi"):
+        satirlar = [s for s in (urunu_normalize(item, slug, tarih) for item in raw_products) if s is not None]
+    if len(satirlar) < len(raw_products):
+        olcum.say("migros_tarama_bozuk_urun_toplam", len(raw_products) - len(satirlar), "Normalize edilemeyen ürün sayısı", kategori=slug)
+    return satirlar
+
+def veri_cek(slug, oturum=None, api_tabani=None):
+    # Kategorinin tüm ürünlerini tek listede döndürür (akış hattı dışındaki kullanım için)
+    tum_urunler = []
+    try:
+        for _, raw_products in sayfalari_uret(slug, oturum, api_tabani):
+            tum_urunler.extend(sayfa_satirlari(raw_products, slug))
+    except SayfaAlinamadi:
+        pass  # o ana kadar alınan sayfalar döner
     return tum_urunler
 
-def calistir():
+def kategorileri_tara(kategoriler=None, eszamanli=None, oturum=None, api_tabani=None, ilerleme=None):
+    # Kategorileri sınırlı bir iş parçacığı havuzunda paralel tarar, sonuçları kategori bazında toplar.
+    # `ilerleme(kategori, urun_sayisi)` her kategori bittiğinde çağrılır.
+    kategoriler = KATEGORILER if kategoriler is None else kategoriler
+    oturum = oturum or oturum_al()
+    eszamanli = eszamanli or oturum.eszamanli
+    sonuclar = {}
+    with ThreadPoolExecutor(max_workers=max(1, eszamanli)) as havuz:
+        gorevler = {havuz.submit(veri_cek, kat, oturum, api_tabani): kat for kat in kategoriler}
+        for gorev in as_completed(gorevler):
+            kat = gorevler[gorev]
+            try:
+                sonuclar[kat] = gorev.result()
+            except Exception as e:
+                print(f"⚠️ Hata ({kat}): {e}")
+                sonuclar[kat] = []
+            if ilerleme: ilerleme(kat, len(sonuclar[kat]))
+    # Yazma sırası kategori listesindeki sırayla aynı kalsın
+    return {kat: sonuclar.get(kat, []) for kat in kategoriler}
+
+# --- KONTROL NOKTASI (DEVAM ETTİRİLEBİLİR TARAMA) ---
+class KontrolNoktasi:
+    # Tarama kimliğini ve kategori başına depoya yazılmış son sayfayı tutan JSON dosyası.
+    # Yarıda kalan tarama `devam=True` ile yalnızca eksik sayfalardan sürdürülür.
+    def __init__(self, yol=KONTROL_DOSYASI):
+        self.yol = yol
+        self.durum = {}
+
+    def oku(self):
+        try:
+            with open(self.yol, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def kaydet(self):
+        self.durum["guncelleme"] = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(os.path.dirname(self.yol) or ".", exist_ok=True)
+        gecici = f"{self.yol}.{os.getpid()}.tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            json.dump(self.durum, f, ensure_ascii=False)
+        os.replace(gecici, self.yol)
+
+    def baslat(self, kategoriler, devam=False, tarama_id=None):
+        # Devam edilecek yarım bir tarama varsa onu, yoksa yeni bir taramayı yükler; devam edilip edilmediğini döndürür.
+        # Önceki çalışmanın toplamları güncellenmemiş günleri yeni taramaya devredilir
+        dosya = self.oku()
+        onceki = dosya if devam else {}
+        if onceki.get("durum") == "yarim":
+            self.durum = onceki
+            for kat in kategoriler:
+                self.durum["kategoriler"].setdefault(kat, {"sayfa": 0, "urun": 0, "bitti": False})
+            self.kaydet()
+            return True
+        if devam: print("ℹ️ Devam edilecek yarım tarama yok, yeni tarama başlatılıyor.")
+        self.durum = {"tarama_id": tarama_id or uuid.uuid4().hex[:12], "durum": "yarim",
+                      "baslangic": datetime.now().isoformat(timespec="seconds"),
+                      "kategoriler": {kat: {"sayfa": 0, "urun": 0, "bitti": False} for kat in kategoriler},
+                      "seri_bekleyen": dosya.get("seri_bekleyen", [])}
+        self.kaydet()
+        return False
+
+    @property
+    def tarama_id(self):
+        return self.durum.get("tarama_id")
+
+    def kategori(self, kat):
+        return self.durum["kategoriler"][kat]
+
+    def sayfa_yazildi(self, kat, sayfa, adet):
+        k = self.kategori(kat)
+        k["sayfa"], k["urun"] = sayfa, k["urun"] + adet
+        self.kaydet()
+
+    def gunler_yazildi(self, gunler):
+        # Satırları depoya yazılmış ama fiyat serisi toplamları henüz güncellenmemiş günler (YYYY-AA-GG)
+        bekleyen = set(self.durum.get("seri_bekleyen", []))
+        if not set(gunler) <= bekleyen:
+            self.durum["seri_bekleyen"] = sorted(bekleyen | set(gunler))
+            self.kaydet()
+
+    def seri_bekleyen(self):
+        return list(self.durum.get("seri_bekleyen", []))
+
+    def seriler_guncellendi(self, gunler):
+        self.durum["seri_bekleyen"] = sorted(set(self.durum.get("seri_bekleyen", [])) - set(gunler))
+        self.kaydet()
+
+    def kategori_bitti(self, kat):
+        self.kategori(kat)["bitti"] = True
+        self.kaydet()
+
+    def eksikler(self):
+        return [kat for kat, k in self.durum["kategoriler"].items() if not k["bitti"]]
+
+    def kapat(self):
+        # Tüm kategoriler bittiyse tarama tamamlanmıştır; eksik varsa dosya `--devam` için yarım kalır
+        if not self.eksikler():
+            self.durum["durum"] = "tamamlandi"
+        self.kaydet()
+
+def seri_toplamlarini_guncelle(depo, kontrol):
+    # Kontrol noktasındaki bekleyen günlerin toplamlarını günceller (Sheets deposunda toplam yok); başarısızsa günler
+    # sonraki taramaya kalır
+    gunler = kontrol.seri_bekleyen()
+    try:
+        seriler = seri_deposu(depo, kur=True)
+        if seriler is not None and gunler: seriler.guncelle(gunler)
+        kontrol.seriler_guncellendi(gunler)
+    except Exception as e:
+        print(f"⚠️ Fiyat serisi toplamları güncellenemedi: {e}")
+
+def calistir(eszamanli=None, ilerleme=None, parti_boyutu=None, devam=False, tarama_id=None, parca=None):
+    # Akış hattı: sayfa üreticileri (iş parçacıkları) -> normalize -> sınırlı kuyruk -> toplu yazıcı.
+    # Kuyruk doluyken üreticiler bekler (geri basınç); bellek kuyruk + parti boyutuyla sınırlıdır,
+    # yarıda kesilen taramada o ana kadar boşaltılan partiler kalıcıdır ve kontrol noktasına işlenir.
+    # `parca` (varsayılan MIGROS_PARCA_ISCI) > 0 ise tarama o kadar işçi süreçte parçalı yürütülür.
+    parca = PARCA_ISCI if parca is None else parca
+    if parca > 0:
+        from migros_parca import parcali_calistir
+        return parcali_calistir(parca, ilerleme, devam, tarama_id)
     print("🚀 Tarama başlatılıyor...")
-    spreadsheet = google_sheets_baglan()
-    if not spreadsheet:
-        print("❌ Google Sheets bağlantısı başarısız!")
+    tarama_bas = time.perf_counter()
+    depo = depo_olustur()
+    if depo is None:
+        print("❌ Depo bağlantısı başarısız!")
         return
 
-    # 1. Ana Veritabanı
-    try:
-        ana_sheet = spreadsheet.worksheet("Ana_Veritabani")
-    except:
-        ana_sheet = spreadsheet.add_worksheet(title="Ana_Veritabani", rows="1000", cols="20")
-        basliklar = ["Tarih", "Ürün Adı", "Etiket Fiyatı", "Satış Fiyatı", "İndirim Tipi", "İndirim %", "Durum", "Stok", "Birim Fiyat", "Birim", "Kategori", "Resim", "Link"]
-        ana_sheet.append_row(basliklar)
-
-    # 2. Günlük Yedek
-    gunluk_sheet = None
+    kontrol = KontrolNoktasi()
+    devam_edildi = kontrol.baslat(KATEGORILER, devam, tarama_id)
+    hatali = set()
+
+    def yazildi(etiket, basarili):
+        # Yazılamayan sayfadan sonrası kontrol noktasında ilerletilmez; devamda o sayfadan tekrar çekilir
+        tur, kat = etiket[0], etiket[1]
+        if not basarili: hatali.add(kat)
+        # Sayfa kontrol noktasında ilerlemese de satırları depodadır; günü toplamlar için işaretlenir
+        if tur == "sayfa" and basarili: kontrol.gunler_yazildi(etiket[4])
+        if kat in hatali: return
+        if tur == "sayfa": kontrol.sayfa_yazildi(kat, etiket[2], etiket[3])
+        elif etiket[2]: kontrol.kategori_bitti(kat)
+
+    # Sheets artık yalnızca isteğe bağlı kopya (Ana_Veritabani + günlük yedek sayfası)
+    # Fiyat alarmları her partide artımlı değerlendirilir (kural yoksa kapalı)
+    yazici = ToplulukYazici(depo, sheets_aktarimi_olustur(), parti_boyutu, yazildi=yazildi, alarm=alarm_motoru_olustur(depo))
+
+    oturum = oturum_al()
+    oturum.sayaclari_sifirla()
+    eszamanli = max(1, eszamanli or oturum.eszamanli)
+    taranacak = kontrol.eksikler()
+    onceki_urun = {kat: kontrol.kategori(kat)["urun"] for kat in taranacak}
+    if devam_edildi:
+        print(f"↩️ {kontrol.tarama_id} taramasına devam ediliyor: {len(taranacak)}/{len(KATEGORILER)} kategori eksik.")
+        for kat in KATEGORILER:
+            if kat not in taranacak and ilerleme: ilerleme(kat, kontrol.kategori(kat)["urun"])
+    print(f"⏳ {len(taranacak)} kategori taranıyor (eşzamanlı: {eszamanli}, parti: {yazici.parti_boyutu})...")
+    kuyruk = queue.Queue(maxsize=KUYRUK_BOYUTU or 2 * eszamanli)
+    dur = threading.Event()  # yazıcı hata verip durduysa üreticiler kuyruğa koymayı bırakır
+
+    def koy(oge):
+        # Dolu kuyrukta beklerken durma isteğini de gözler; durulduysa False döner
+        while not dur.is_set():
+            try:
+                kuyruk.put(oge, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def uret(kat):
+        adet = 0
+        tamam = False
+        bas = time.perf_counter()
+        try:
+            baslangic = kontrol.kategori(kat)["sayfa"] + 1
+            for sayfa, raw_products in sayfalari_uret(kat, oturum, baslangic=baslangic):
+                satirlar = sayfa_satirlari(raw_products, kat)
+                adet += len(satirlar)
+                # Kuyrukta beklenen süre yazıcının darboğaz olup olmadığını gösterir
+                bekleme = time.perf_counter()
+                if not koy(("sayfa", kat, (sayfa, satirlar))): return
+                olcum.say("migros_tarama_kuyruk_bekleme_saniye_toplam", time.perf_counter() - bekleme,
+                          "Üreticilerin dolu kuyrukta beklediği toplam süre")
+            tamam = True
+        except SayfaAlinamadi:
+            pass
+        except Exception as e:
+            print(f"⚠️ Hata ({kat}): {e}")
+        finally:
+            sure = time.perf_counter() - bas
+            olcum.ayarla("migros_tarama_kategori_suresi_saniye", sure, "Kategorinin son taramadaki süresi", kategori=kat)
+            olcum.ayarla("migros_tarama_kategori_urun", adet, "Kategoriden son taramada gelen ürün", kategori=kat)
+            olcum.olay("kategori", kategori=kat, urun=adet, tamam=tamam, sure_ms=round(sure * 1000, 2))
+            koy(("bitti", kat, (adet, tamam)))
+
     try:
-        sayfa_ismi = datetime.now().strftime("%d.%m.%Y - %H:%M")
-        gunluk_sheet = spreadsheet.add_worksheet(title=sayfa_ismi, rows="1000", cols="20")
-        basliklar = ["Tarih", "Ürün Adı", "Etiket Fiyatı", "Satış Fiyatı", "İndirim Tipi", "İndirim %", "Durum", "Stok", "Birim Fiyat", "Birim", "Kategori", "Resim", "Link"]
-        gunluk_sheet.append_row(basliklar)
-        print(f"📅 Yeni sayfa açıldı: {sayfa_ismi}")
-    except:
-        print("⚠️ Günlük sayfa oluşturulamadı.")
-
-    toplam_kayit = 0
-    
-    for kat in KATEGORILER:
-        print(f"⏳ {kat} taranıyor...")
-        veriler = veri_cek(kat)
-        
-        if veriler:
+        with ThreadPoolExecutor(max_workers=eszamanli) as havuz:
+            for kat in taranacak: havuz.submit(uret, kat)
+            kalan = len(taranacak)
             try:
-                # Ana veritabanına ekle
-                ana_sheet.append_rows(veriler, value_input_option='RAW')
-                # Günlük sayfaya ekle
-                if gunluk_sheet:
-                    gunluk_sheet.append_rows(veriler, value_input_option='RAW')
-                
-                print(f"💾 {kat} kaydedildi. ({len(veriler)} ürün)")
-                toplam_kayit += len(veriler)
-            except Exception as e:
-                print(f"❌ Yazma hatası ({kat}): {e}")
-        else:
-            print(f"⚠️ {kat} boş döndü.")
+                while kalan:
+                    tur, kat, veri = kuyruk.get()
+                    if tur == "sayfa":
+                        sayfa, satirlar = veri
+                        gunler = {str(s[0])[:10] for s in satirlar}
+                        yazici.ekle(satirlar, etiket=("sayfa", kat, sayfa, len(satirlar), gunler))
+                        continue
+                    kalan -= 1
+                    adet, tamam = veri
+                    # Kategori ancak tüm sayfaları yazıldıktan sonra kontrol noktasında "bitti" sayılır
+                    yazici.ekle([], etiket=("bitti", kat, tamam))
+                    if adet: print(f"💾 {kat} tarandı. ({adet} ürün)")
+                    else: print(f"⚠️ {kat} boş döndü.")
+                    if ilerleme: ilerleme(kat, onceki_urun[kat] + adet)
+            finally:
+                # Döngü hatayla çıktıysa havuz kapanırken üreticiler dolu kuyrukta takılı kalmasın
+                dur.set()
+                while True:
+                    try: kuyruk.get_nowait()
+                    except queue.Empty: break
+        yazici.bosalt()
+        kontrol.kapat()
+    finally:
+        # Detay grafiğinin günlük/haftalık toplamları yalnızca satırları depoya yazılmış günler için yeniden hesaplanır
+        # (devam edilen çalışmaların ve hatayla kesilen önceki çalışmaların günleri dahil)
+        seri_toplamlarini_guncelle(depo, kontrol)
+    toplam_kayit = yazici.toplam_urun
+    eksik = kontrol.eksikler()
+    if eksik:
+        print(f"⚠️ {len(eksik)} kategori eksik kaldı ({', '.join(eksik)}); `--devam` ile yalnızca eksikler çekilir.")
 
+    istatistik = oturum.istatistik()
+    istatistik["urun"] = toplam_kayit
+    istatistik["tarama_id"] = kontrol.tarama_id
+    istatistik["devam"] = devam_edildi
+    istatistik["eksik_kategoriler"] = eksik
+    istatistik["alarm"] = yazici.alarm.uretilen if yazici.alarm else 0
+    istatistik["sure_sn"] = round(time.perf_counter() - tarama_bas, 2)
+    olcum.ayarla("migros_tarama_suresi_saniye", istatistik["sure_sn"], "Son taramanın toplam süresi")
+    olcum.ayarla("migros_tarama_urun", toplam_kayit, "Son taramada yazılan ürün")
+    olcum.ayarla("migros_tarama_eksik_kategori", len(eksik), "Son taramada eksik kalan kategori")
+    olcum.ayarla("migros_tarama_bitis_zamani", time.time(), "Son taramanın bitiş zamanı (unix)")
+    olcum.olay("tarama", **istatistik)
+    olcum.metrikleri_yaz("tarama")
     print(f"🏁 İŞLEM TAMAMLANDI! Toplam {toplam_kayit} ürün güncellendi.")
+    print(f"📡 İstek: {istatistik['istek']} | Açılan bağlantı: {istatistik['baglanti']} | "
+          f"Yeniden deneme: {istatistik['yeniden_deneme']} | 304: {istatistik['degismedi_304']} | "
+          f"Aktarılan: {istatistik['bayt'] / 1024 / 1024:.1f} MB")
+    return istatistik
@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import migros_olcum as olcum
+from datetime import datetime
+
+from migros_depo import parquet_atomik_yaz, urun_id_doldur, depo_olustur, ParquetDepo
+
+# --- ZAMAN SERİSİ TOPLAMLARI ---
+# Detay grafiğinde gösterilecek en fazla nokta; daha uzun seriler ardışık dönemler birleştirilerek seyreltilir
+GRAFIK_NOKTASI = int(os.environ.get("MIGROS_GRAFIK_NOKTASI", "400"))
+SATIR_GRUBU = 8192  # tek ürün okumasında çözülen en fazla satır
+SERI_SEMASI = pa.schema([
+    ("Ürün ID", pa.string()), ("Dönem", pa.timestamp("s")), ("En Düşük", pa.float32()), ("En Yüksek", pa.float32()),
+    ("Kapanış", pa.float32()), ("Toplam", pa.float64()), ("Gözlem", pa.int32()), ("Son", pa.timestamp("s")),
+])
+SERI_KOLONLARI = SERI_SEMASI.names
+# Düzey -> dosya anahtarı (dönem başlangıcından): günlükler ay, haftalıklar yıl başına bir dosyada
+DUZEYLER = {"gunluk": "%Y-%m", "haftalik": "%Y"}
+
+def _ham_satirlar(ham):
+    # Ham fiyat gözlemlerini tek gözlemli toplam satırlarına çevirir (aynı katlama her düzeyde kullanılır)
+    ham = urun_id_doldur(ham)
+    fiyat = pd.to_numeric(ham["Satış Fiyatı"], errors="coerce").astype("float64")
+    return pd.DataFrame({"Ürün ID": ham["Ürün ID"].astype(str).values, "En Düşük": fiyat.values, "En Yüksek": fiyat.values,
+                         "Kapanış": fiyat.values, "Toplam": fiyat.values, "Gözlem": 1, "Son": ham["Tarih"].values})
+
+def _katla(satirlar, donem):
+    # Toplam satırlarını (Ürün ID, dönem) başına birleştirir: en düşük/en yüksek, son gözlemin fiyatı, toplam ve sayı.
+    # Girdi ham gözlem de (bkz. _ham_satirlar) daha ince bir düzeyin toplamları da olabilir
+    s = satirlar.assign(**{"Dönem": np.asarray(donem)}).sort_values("Son", kind="stable")
+    grup = s.groupby(["Ürün ID", "Dönem"], sort=True)
+    sonuc = grup.agg(**{"En Düşük": ("En Düşük", "min"), "En Yüksek": ("En Yüksek", "max"), "Kapanış": ("Kapanış", "last"),
+                        "Toplam": ("Toplam", "sum"), "Gözlem": ("Gözlem", "sum"), "Son": ("Son", "max")})
+    return sonuc.reset_index()[SERI_KOLONLARI]
+
+def bos_seri():
+    return SERI_SEMASI.empty_table().to_pandas()
+
+def hafta_basi(tarihler):
+    tarihler = pd.to_datetime(pd.Series(tarihler)).dt.normalize()
+    return tarihler - pd.to_timedelta(tarihler.dt.weekday, unit="D")
+
+def _indeks_yolu(yol):
+    return yol[:-len(".parquet")] + ".indeks.parquet"
+
+class SeriDosyasi:
+    # Ürün ID + dönem sıralı bir toplam dosyası ve yanındaki ofset indeksi (ürün → ilk satır, satır sayısı).
+    # Bir ürün okunurken yalnızca o satırları içeren satır grupları çözülür.
+    def __init__(self, yol):
+        for _ in range(3):
+            self.zaman = os.stat(yol).st_mtime_ns
+            self.dosya = pq.ParquetFile(yol)
+            indeks = pq.read_table(_indeks_yolu(yol))
+            # Dosya ile indeks aynı yazımdan mı (yazıcı ikisini arka arkaya değiştirir)
+            if indeks.schema.metadata == self.dosya.schema_arrow.metadata: break
+        else:
+            # Yazım sürerken üç kez de yarım kaldı: eşleşmeyen indeksle yanlış satırları okumaktansa hata ver
+            raise RuntimeError(f"{yol}: dosya ile indeks eşleşmiyor (yazım sürüyor olabilir)")
+        self.indeks = dict(zip(indeks.column("Ürün ID").to_pylist(),
+                               zip(indeks.column("Başlangıç").to_pylist(), indeks.column("Adet").to_pylist())))
+        meta = self.dosya.metadata
+        self.grup_baslari = np.cumsum([0] + [meta.row_group(i).num_rows for i in range(meta.num_row_groups)])
+        self._kilit = threading.Lock()
+
+    def urun(self, urun_id):
+        konum = self.indeks.get(urun_id)
+        if konum is None: return None
+        bas, adet = konum
+        ilk = int(np.searchsorted(self.grup_baslari, bas, side="right")) - 1
+        son = int(np.searchsorted(self.grup_baslari, bas + adet - 1, side="right")) - 1
+        with self._kilit:
+            tablo = self.dosya.read_row_groups(list(range(ilk, son + 1)))
+        return tablo.slice(bas - int(self.grup_baslari[ilk]), adet)
+
+_dosyalar = {}
+_dosya_kilidi = threading.Lock()
+
+def seri_dosyasi(yol):
+    # Süreç içinde açık dosya + indeks önbelleği; dosya yeniden yazılınca (mtime) tazelenir
+    try:
+        zaman = os.stat(yol).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    dosya = _dosyalar.get(yol)
+    if dosya is None or dosya.zaman != zaman:
+        dosya = SeriDosyasi(yol)
+        with _dosya_kilidi:
+            if len(_dosyalar) >= 128: _dosyalar.pop(next(iter(_dosyalar)))
+            _dosyalar[yol] = dosya
+    return dosya
+
+class SeriDeposu:
+    # Ürün başına önceden hesaplanmış günlük ve haftalık fiyat toplamları, ham verinin yanında:
+    #   veri/seriler/gunluk/2026-10.parquet (+ .indeks.parquet)   ay başına, Ürün ID + gün sıralı
+    #   veri/seriler/haftalik/2026.parquet  (+ .indeks.parquet)   yıl başına, Ürün ID + hafta (pazartesi) sıralı
+    # Tarama sonunda yalnızca taranan günler ve haftaları yeniden hesaplanır (aynı günü tekrar işlemek sonucu değiştirmez).
+    def __init__(self, depo, dizin=None):
+        self.depo = depo
+        self.dizin = dizin or os.path.join(depo.dizin, "seriler")
+
+    def hazir_mi(self):
+        # Toplamlar ancak tüm geçmişten kurulum tamamlanınca (işaret dosyası yazılınca) kullanılır
+        return os.path.exists(os.path.join(self.dizin, "kurulum.json"))
+
+    def yol(self, duzey, anahtar):
+        return os.path.join(self.dizin, duzey, f"{anahtar}.parquet")
+
+    def _oku(self, duzey, anahtar):
+        yol = self.yol(duzey, anahtar)
+        if not os.path.exists(yol): return bos_seri()
+        return pq.read_table(yol).to_pandas()
+
+    def _yaz(self, duzey, anahtar, df):
+        yol = self.yol(duzey, anahtar)
+        os.makedirs(os.path.dirname(yol), exist_ok=True)
+        df = df.sort_values(["Ürün ID", "Dönem"], kind="stable").reset_index(drop=True)
+        surum = {"surum": uuid.uuid4().hex}
+        tablo = pa.Table.from_pandas(df[SERI_KOLONLARI], schema=SERI_SEMASI, preserve_index=False)
+        kimlikler = df["Ürün ID"].to_numpy()
+        baslar = np.r_[0, np.flatnonzero(kimlikler[1:] != kimlikler[:-1]) + 1] if len(df) else np.array([], dtype="int64")
+        indeks = pa.table({"Ürün ID": pa.array(kimlikler[baslar], pa.string()), "Başlangıç": baslar.astype("int64"),
+                           "Adet": np.diff(np.r_[baslar, len(df)]).astype("int64")})
+        parquet_atomik_yaz(tablo.replace_schema_metadata(surum), yol, SATIR_GRUBU)
+        parquet_atomik_yaz(indeks.replace_schema_metadata(surum), _indeks_yolu(yol))
+
+    def _degistir(self, duzey, yeni, donemler):
+        # Dosyalardaki `donemler` satırlarını `yeni` ile değiştirir (dosya başına bir yeniden yazım)
+        donemler = pd.DatetimeIndex(donemler)
+        anahtarlar = pd.Series(donemler.strftime(DUZEYLER[duzey]), index=donemler)
+        yeni_anahtar = yeni["Dönem"].dt.strftime(DUZEYLER[duzey])
+        for anahtar in sorted(set(anahtarlar)):
+            eski = self._oku(duzey, anahtar)
+            eski = eski[~eski["Dönem"].isin(anahtarlar.index[anahtarlar.values == anahtar])]
+            parcalar = [p for p in (eski, yeni[yeni_anahtar == anahtar]) if not p.empty]
+            self._yaz(duzey, anahtar, pd.concat(parcalar, ignore_index=True) if parcalar else eski)
+
+    def guncelle(self, gunler):
+        # Verilen günlerin günlük toplamlarını ham veriden, içerdikleri haftalarınkini günlüklerden yeniden kurar
+        gunler = pd.DatetimeIndex(sorted({pd.Timestamp(g).normalize() for g in gunler}))
+        if gunler.empty: return 0
+        with olcum.sure_olc("migros_seri_guncelleme_saniye", "Günlük/haftalık toplamları güncelleme süresi",
+                            gunluge="seri_guncelleme") as alanlar:
+            ham = self.depo.oku(kolonlar=["Tarih", "Ürün ID", "Satış Fiyatı"], baslangic=gunler[0],
+                                bitis=gunler[-1] + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))
+            gun = pd.to_datetime(ham["Tarih"]).dt.normalize()
+            ham, gun = ham[gun.isin(gunler)], gun[gun.isin(gunler)]
+            gunluk = _katla(_ham_satirlar(ham), gun.values) if not ham.empty else bos_seri()
+            self._degistir("gunluk", gunluk, gunler)
+
+            haftalar = pd.DatetimeIndex(sorted(set(hafta_basi(gunler))))
+            aylar = sorted({h.strftime("%Y-%m") for h in haftalar} | {(h + pd.Timedelta(days=6)).strftime("%Y-%m") for h in haftalar})
+            gunlukler = pd.concat([self._oku("gunluk", ay) for ay in aylar], ignore_index=True)
+            hafta = hafta_basi(gunlukler["Dönem"]).values
+            gunlukler = gunlukler[np.isin(hafta, haftalar.values)]
+            self._degistir("haftalik", _katla(gunlukler, hafta_basi(gunlukler["Dönem"]).values), haftalar)
+            alanlar.update(gun=len(gunler), satir=len(gunluk))
+        return len(gunluk)
+
+    def kur(self):
+        # Mevcut tüm geçmişten toplamları baştan kurar (ilk kullanım / toplamlar silindiyse)
+        tarihler = self.depo.oku(kolonlar=["Tarih"])["Tarih"]
+        gunler = tarihler.dt.normalize().unique() if not tarihler.empty else []
+        satir = self.guncelle(gunler)
+        os.makedirs(self.dizin, exist_ok=True)
+        gecici = os.path.join(self.dizin, f".kurulum.{os.getpid()}.tmp")
+        with open(gecici, "w", encoding="utf-8") as f:
+            json.dump({"kurulum": datetime.now().isoformat(timespec="seconds"), "gun": len(gunler)}, f)
+        os.replace(gecici, os.path.join(self.dizin, "kurulum.json"))
+        return satir
+
+    def urun_serisi(self, urun_id, ilk, son, nokta=GRAFIK_NOKTASI):
+        # Ürünün ilk/son görülmesi arasındaki seriyi, en fazla `nokta` satırla döndürür.
+        # Aralık `nokta` günden kısaysa günlük, değilse haftalık toplamlar okunur; yine uzunsa seyreltilir.
+        if pd.isna(ilk) or pd.isna(son): return seyrelt(bos_seri(), nokta)
+        ilk, son = pd.Timestamp(ilk).normalize(), pd.Timestamp(son).normalize()
+        duzey = "gunluk" if (son - ilk).days < nokta else "haftalik"
+        bas = ilk if duzey == "gunluk" else hafta_basi([ilk]).iloc[0]
+        anahtarlar = pd.date_range(bas.replace(day=1), son, freq="MS").strftime(DUZEYLER[duzey]).unique()
+        tablolar = []
+        for anahtar in anahtarlar:
+            dosya = seri_dosyasi(self.yol(duzey, anahtar))
+            tablo = dosya.urun(str(urun_id)) if dosya else None
+            if tablo is not None: tablolar.append(tablo)
+        return seyrelt(pa.concat_tables(tablolar).to_pandas() if tablolar else bos_seri(), nokta)
+
+def seyrelt(seri, nokta=GRAFIK_NOKTASI):
+    # Tek ürünün serisini ardışık dönemleri birleştirerek en fazla `nokta` satıra indirir; Ortalama kolonunu ekler
+    if len(seri) > nokta:
+        kova = np.arange(len(seri)) // -(-len(seri) // nokta)
+        seri = _katla(seri, seri["Dönem"].groupby(kova).transform("first").values)
+    return seri.assign(Ortalama=seri["Toplam"] / seri["Gözlem"])
+
+def gunluk_seri(ham, nokta=GRAFIK_NOKTASI):
+    # Toplam dosyası olmayan depolar (Sheets) için: tek ürünün ham geçmişinden aynı biçimde seri
+    if ham.empty: return seyrelt(bos_seri(), nokta)
+    return seyrelt(_katla(_ham_satirlar(ham), pd.to_datetime(ham["Tarih"]).dt.normalize().values), nokta)
+
+def seri_deposu(depo=None, kur=False):
+    # Yerel (Parquet) depolar için toplam deposu; Sheets deposunda None. Toplamlar henüz kurulmadıysa `kur=True`
+    # (tarayıcı, tek çalışma kilidi altında) tüm geçmişten kurar, aksi halde (pano) None döner ve ham geçmiş süzülür
+    depo = depo if depo is not None else depo_olustur()
+    if not isinstance(depo, ParquetDepo): return None
+    seriler = SeriDeposu(depo)
+    if not seriler.hazir_mi():
+        if not kur: return None
+        seriler.kur()
+    return seriler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ürün başına günlük/haftalık fiyat toplamları")
+    parser.add_argument("--kur", action="store_true", help="Toplamları tüm geçmişten baştan kur")
+    args = parser.parse_args()
+    if args.kur:
+        depo = depo_olustur()
+        if isinstance(depo, ParquetDepo): print(f"📚 {SeriDeposu(depo).kur()} günlük toplam satırı yazıldı.")
+    else:
+        parser.print_help()
@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# --- VİTRİN SORGU MOTORU ---
+# Ürün özeti her veri sürümünde bir kez indekslenir: sıralamalar önceden hesaplanmış konum dizileri, filtreler
+# boolean maskelerdir. Bir sorgu maskeleri birleştirip hazır sıralamayı süzer ve yalnızca istenen sayfanın satırlarını
+# çerçeveye çevirir. Sonuç konumları parametre demeti başına saklanır; sayfa değiştirmek bir dilimlemedir.
+SIRALAMALAR = ("akilli", "fiyat_artan", "fiyat_azalan", "en_iyi")
+FILTRELER = (None, "dusen", "artan")
+HATIRA_BOYUTU = 128
+DEGISIM_ESIGI = 0.01  # kuruş altı fiyat farkları değişim sayılmaz
+
+def _sira(df, kolonlar, artan):
+    return df.sort_values(kolonlar, ascending=artan, kind="stable").index.to_numpy()
+
+def vitrin_dizileri(ozet):
+    # Özetten sorgu motorunun sıralama konumlarını, filtre maskelerini ve kategori/birim kodlarını hesaplar
+    df = ozet.reset_index(drop=True)
+    kategori = df["Kategori"].astype(str) if "Kategori" in df.columns else pd.Series("", index=df.index)
+    kategoriler = sorted(kategori.unique().tolist()) if len(df) else []
+    onceki_var = df["Önceki Fiyat"].notna().to_numpy()
+    fark = df["Fiyat Farkı"].to_numpy(dtype="float64", na_value=np.nan)
+    # "En İyi Fiyat": farklı birimler karşılaştırılamayacağı için önce sonuçlarda en yaygın birim (ör. aramada "süt" → L),
+    # her birim içinde birim fiyata göre artan; birim fiyatı bilinmeyenler sonda. Burada bilinmeyen/birim/fiyat sırası
+    # hazırlanır; yaygınlık sonuca bağlı olduğu için sorgu anında (kararlı sıralamayla) uygulanır
+    birim = df["Birim"].astype(str) if "Birim" in df.columns else pd.Series("", index=df.index)
+    birim_fiyat = pd.to_numeric(df.get("Birim Fiyat", pd.Series(np.nan, index=df.index)), errors="coerce")
+    bilinmiyor = (birim_fiyat.isna() | (birim_fiyat <= 0)).to_numpy()
+    birimler = sorted(birim.unique().tolist())
+    birim_kodu = pd.Categorical(birim, categories=birimler).codes
+    return {
+        "kategoriler": kategoriler,
+        "kategori_kodu": pd.Categorical(kategori, categories=kategoriler).codes,
+        "dusen": onceki_var & (fark < -DEGISIM_ESIGI),
+        "artan": onceki_var & (fark > DEGISIM_ESIGI),
+        "sira_akilli": _sira(df, ["İndirim %", "Ürün Adı"], [False, True]),
+        "sira_fiyat_artan": _sira(df, ["Satış Fiyatı"], [True]),
+        "sira_fiyat_azalan": _sira(df, ["Satış Fiyatı"], [False]),
+        "sira_en_iyi": pd.DataFrame({"b": bilinmiyor, "k": birim_kodu, "f": birim_fiyat})
+            .sort_values(["b", "k", "f"], kind="stable").index.to_numpy(),
+        "bilinmiyor": bilinmiyor,
+        "birim_kodu": birim_kodu,
+        "birim_sayisi": len(birimler),
+    }
+
+class VitrinSorgusu:
+    def __init__(self, ozet, arama_indeksi=None, diziler=None):
+        # `diziler` (bkz. `diziler()`) verilirse sıralamalar ve maskeler yeniden hesaplanmaz (anlık görüntüden yükleme)
+        self.ozet = ozet
+        self.arama_indeksi = arama_indeksi
+        self.adet = len(ozet)
+        d = diziler if diziler is not None else vitrin_dizileri(ozet)
+        self.kategoriler = list(d["kategoriler"])
+        self._kategori_kodu = d["kategori_kodu"]
+        self._filtre = {"dusen": d["dusen"], "artan": d["artan"]}
+        self._sira = {s: d[f"sira_{s}"] for s in SIRALAMALAR}
+        self._bilinmiyor = d["bilinmiyor"]
+        self._birim_kodu = d["birim_kodu"]
+        self._birim_sayisi = d["birim_sayisi"]
+        self._hatira = OrderedDict()
+        self._kilit = threading.Lock()
+
+    def diziler(self):
+        # Sorgu motorunun özetten türetilmiş, kalıcı hale getirilebilir dizileri
+        return {"kategoriler": self.kategoriler, "kategori_kodu": self._kategori_kodu, "dusen": self._filtre["dusen"],
+                "artan": self._filtre["artan"], **{f"sira_{s}": self._sira[s] for s in SIRALAMALAR},
+                "bilinmiyor": self._bilinmiyor, "birim_kodu": self._birim_kodu, "birim_sayisi": self._birim_sayisi}
+
+    def _konumlar(self, filtre, arama, kategori, siralama):
+        # Parametre demetinin sıralı sonuç konumları (özetteki satır numaraları)
+        maske = np.ones(self.adet, dtype=bool)
+        if filtre: maske &= self._filtre[filtre]
+        if kategori:
+            if kategori not in self.kategoriler: return np.array([], dtype="int64")
+            maske &= self._kategori_kodu == self.kategoriler.index(kategori)
+        if arama:
+            eslesen = self.arama_indeksi.ara(arama) if self.arama_indeksi is not None else []
+            konum = self.ozet.index.get_indexer(eslesen)
+            konum = konum[konum >= 0]
+            if siralama == "akilli":
+                # Aramada varsayılan sıra alaka düzeyidir
+                return konum[maske[konum]]
+            arama_maskesi = np.zeros(self.adet, dtype=bool)
+            arama_maskesi[konum] = True
+            maske &= arama_maskesi
+        sira = self._sira[siralama]
+        secili = sira[maske[sira]]
+        if siralama == "en_iyi" and len(secili):
+            kod = self._birim_kodu[secili]
+            yayginlik = np.bincount(kod, minlength=self._birim_sayisi)[kod]
+            secili = secili[np.lexsort((-yayginlik, self._bilinmiyor[secili]))]
+        return secili
+
+    def sorgula(self, filtre=None, arama="", kategori=None, siralama="akilli"):
+        # Sıralı sonuç konumlarını döndürür (en son kullanılan HATIRA_BOYUTU sorgu saklanır)
+        anahtar = (filtre, (arama or "").strip(), kategori or None, siralama)
+        with self._kilit:
+            konumlar = self._hatira.get(anahtar)
+            if konumlar is not None:
+                self._hatira.move_to_end(anahtar)
+                return konumlar
+        konumlar = self._konumlar(*anahtar)
+        konumlar.setflags(write=False)
+        with self._kilit:
+            self._hatira[anahtar] = konumlar
+            if len(self._hatira) > HATIRA_BOYUTU: self._hatira.popitem(last=False)
+        return konumlar
+
+    def sayfa(self, konumlar, sayfa, sayfa_basi):
+        # Yalnızca istenen sayfanın satırları çerçeveye çevrilir
+        return self.ozet.iloc[konumlar[sayfa * sayfa_basi:(sayfa + 1) * sayfa_basi]]
@@ -0,0 +1,90 @@
+import json
+import threading
+from collections import Counter
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+import migros_depo
+import migros_olcum as olcum
+import migros_scraper as ms
+from migros_depo import ParquetDepo
+from migros_http import HttpOturumu, HizSinirlayici
+
+class ApiTaklidi:
+    # /rest/search/screens/<slug>?page=N isteklerini bellekteki sayfalardan yanıtlayan yerel sunucu.
+    # `hatali` içindeki (slug, sayfa) çiftleri 404 döner; gelen istekler `istekler` sayacında tutulur.
+    def __init__(self, kategoriler, sayfa=3, urun=4):
+        self.sayfalar = {kat: [[_urun(k, p, i) for i in range(urun)] for p in range(1, sayfa + 1)]
+                         for k, kat in enumerate(kategoriler)}
+        self.hatali = set()
+        self.istekler = Counter()
+        self._kilit = threading.Lock()
+        taklit = self
+
+        class Yanitlayici(BaseHTTPRequestHandler):
+            def log_message(self, *args): pass
+
+            def do_GET(self):
+                adres = urlsplit(self.path)
+                slug = adres.path.rstrip("/").rsplit("/", 1)[-1]
+                sayfa = int(parse_qs(adres.query).get("page", ["1"])[0])
+                with taklit._kilit:
+                    taklit.istekler[(slug, sayfa)] += 1
+                if (slug, sayfa) in taklit.hatali:
+                    self.send_error(404)
+                    return
+                sayfalar = taklit.sayfalar.get(slug, [])
+                urunler = sayfalar[sayfa - 1] if sayfa <= len(sayfalar) else []
+                govde = json.dumps({"data": {"searchInfo": {
+                    "storeProductInfos": urunler, "pageCount": len(sayfalar),
+                    "hitCount": sum(len(s) for s in sayfalar)}}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(govde)))
+                self.end_headers()
+                self.wfile.write(govde)
+
+        self.sunucu = ThreadingHTTPServer(("127.0.0.1", 0), Yanitlayici)
+        self.sunucu.daemon_threads = True
+        self.adres = f"http://127.0.0.1:{self.sunucu.server_address[1]}"
+        threading.Thread(target=self.sunucu.serve_forever, daemon=True).start()
+
+    def urun_sayisi(self):
+        return sum(len(s) for sayfalar in self.sayfalar.values() for s in sayfalar)
+
+def _urun(k, p, i):
+    return {"id": f"{k}-{p}-{i}", "name": f"Ürün {k}-{p}-{i} 500 Gr", "regularPrice": 1000, "shownPrice": 900,
+            "badges": [], "images": [], "prettyName": f"urun-{k}-{p}-{i}-p-{k:03x}{p:03x}{i:04x}"}
+
+class SabitSaat(datetime):
+    # Tarayıcının damgaladığı zaman; testler günler arası taramaları `simdi`yi değiştirerek kurar
+    simdi = datetime(2026, 10, 1, 10, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.simdi
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # Tarayıcıyı yerel sunucuya, depoyu ve kontrol noktasını geçici dizine yönlendirir
+    kategoriler = ["meyve-sebze-c-2", "icecek-c-c", "bebek-c-8"]
+    taklit = ApiTaklidi(kategoriler)
+    depo_dizini = str(tmp_path / "veri")
+    monkeypatch.setattr(ms, "API_TABANI", taklit.adres)
+    monkeypatch.setattr(ms, "KATEGORILER", kategoriler)
+    monkeypatch.setattr(ms, "PARCA_ISCI", 0)
+    monkeypatch.setattr(ms, "depo_olustur", lambda: ParquetDepo(depo_dizini))
+    monkeypatch.setattr(ms, "sheets_aktarimi_olustur", lambda: None)
+    monkeypatch.setattr(ms, "alarm_motoru_olustur", lambda depo: None)
+    monkeypatch.setattr(ms, "VARSAYILAN_OTURUM", HttpOturumu(sinirlayici=HizSinirlayici(1e9), deneme=1))
+    monkeypatch.setattr(ms.KontrolNoktasi.__init__, "__defaults__", (str(tmp_path / "veri" / "tarama_kontrol.json"),))
+    monkeypatch.setattr(ms, "datetime", SabitSaat)
+    monkeypatch.setattr(migros_depo, "KAYIT_ARALIGI", 1)
+    monkeypatch.setattr(olcum, "OLCUM_GUNLUGU", "")
+    monkeypatch.setattr(olcum, "OLCUM_DIZINI", str(tmp_path / "olcum"))
+    taklit.depo_dizini = depo_dizini
+    yield taklit
+    taklit.sunucu.shutdown()
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from migros_alarm import BellekBildirimi, alarm_motoru_olustur
+from migros_depo import KOLONLAR, ParquetDepo, ToplulukYazici, satirlari_cerceveye
+from migros_parca import IsKuyrugu, birlestir
+
+def _satirlar(tarih, fiyatlar):
+    satirlar = []
+    for i, fiyat in enumerate(fiyatlar):
+        satir = dict.fromkeys(KOLONLAR, "")
+        satir.update({"Tarih": tarih, "Ürün Adı": f"Ürün {i}", "Etiket Fiyatı": fiyat, "Satış Fiyatı": fiyat,
+                      "İndirim %": 0, "Birim Fiyat": 0, "Kategori": "meyve-sebze-c-2", "Durum": "Aktif",
+                      "Stok": "Var", "Link": f"https://www.migros.com.tr/urun-{i}-p-{i:x}", "Ürün ID": f"{i:x}"})
+        satirlar.append([satir[k] for k in KOLONLAR])
+    return satirlar
+
+def _tara(depo, satirlar, kurallar, parti_boyutu):
+    bildirim = BellekBildirimi()
+    yazici = ToplulukYazici(depo, parti_boyutu=parti_boyutu,
+                            alarm=alarm_motoru_olustur(depo, kurallar=kurallar, bildirim=bildirim))
+    yazici.ekle(satirlar)
+    yazici.bosalt()
+    return bildirim.alarmlar
+
+def test_ilk_partideki_dususler(tmp_path):
+    # Motor tarama başında kurulur; ilk parti özete işlendikten sonra da düşüşler kaçırılmaz
+    kurallar = [{"id": "k1", "ad": "Her düşüş"}]
+    _tara(ParquetDepo(str(tmp_path)), _satirlar("2026-10-01 10:00:00", [100.0] * 5), kurallar, 3)
+    alarmlar = _tara(ParquetDepo(str(tmp_path)), _satirlar("2026-10-02 10:00:00", [50.0] * 5), kurallar, 3)
+    assert sorted(a["urun_id"] for a in alarmlar) == [f"{i:x}" for i in range(5)]
+    assert all(a["onceki_fiyat"] == 100.0 and a["fiyat"] == 50.0 for a in alarmlar)
+
+def test_ayni_tarama_tekrar_alarm_uretmez(tmp_path):
+    kurallar = [{"id": "k1", "ad": "Her düşüş"}]
+    _tara(ParquetDepo(str(tmp_path)), _satirlar("2026-10-01 10:00:00", [100.0] * 5), kurallar, 3)
+    _tara(ParquetDepo(str(tmp_path)), _satirlar("2026-10-02 10:00:00", [50.0] * 5), kurallar, 3)
+    assert _tara(ParquetDepo(str(tmp_path)), _satirlar("2026-10-02 10:00:00", [50.0] * 5), kurallar, 3) == []
+
+def test_parcali_birlestirmede_dususler(tmp_path):
+    # Parçalı taramada tüm tarama tek yazımda birleştirilir; alarmlar yine önceki özete göre değerlendirilir
+    kurallar = [{"id": "k1", "ad": "Her düşüş"}]
+    depo = ParquetDepo(str(tmp_path / "veri"))
+    _tara(depo, _satirlar("2026-10-01 10:00:00", [100.0] * 5), kurallar, 3)
+    kuyruk = IsKuyrugu.olustur("t1", datetime(2026, 10, 2, 10), ["meyve-sebze-c-2"], kok=str(tmp_path / "parcalar"))
+    ad, _ = kuyruk.al()
+    kuyruk.bitir(ad, satirlari_cerceveye(_satirlar("2026-10-02 10:00:00", [50.0] * 5)))
+    bildirim = BellekBildirimi()
+    birlestir(kuyruk, depo, alarm=alarm_motoru_olustur(depo, kurallar=kurallar, bildirim=bildirim))
+    assert len(bildirim.alarmlar) == 5
@@ -0,0 +1,48 @@
+from migros_arama import AramaIndeksi, tr_normalize
+
+ADLAR = {
+    "a": "Pınar Süt 1 L",
+    "b": "Sütaş Ayran 200 Ml",
+    "c": "IŞIK Çikolatalı Gofret",
+    "d": "İçim Yarım Yağlı Süt 1 L",
+    "e": "Ülker Çikolata 80 Gr",
+}
+
+def _indeks():
+    return AramaIndeksi(list(ADLAR.values()), list(ADLAR))
+
+def test_turkce_normalizasyon():
+    assert tr_normalize("IŞIK") == tr_normalize("isik") == "isik"
+    assert tr_normalize("İÇİM Süt-1L") == "icim sut 1l"
+
+def test_tam_kelime_onekten_once():
+    # "süt" tam kelime olan ürünler "sütaş"tan önce; eşitlikte kısa ad önce
+    assert _indeks().ara("sut") == ["a", "d", "b"]
+
+def test_tum_kelimeler_eslesmeli():
+    assert _indeks().ara("süt yağlı") == ["d"]
+    assert _indeks().ara("süt gofret") == []
+
+def test_buyuk_harf_ve_aksan_duyarsiz():
+    assert _indeks().ara("isik") == ["c"]
+    assert _indeks().ara("ICIM") == ["d"]
+
+def test_yazim_hatasi_toleransi():
+    # "cikolta" bir harf eksik: "cikolata" bulanık eşleşir, "cikolatali" (3 harf uzak) eşleşmez
+    assert _indeks().ara("cikolta") == ["e"]
+    # Tam kelime önekten önce
+    assert _indeks().ara("cikolata") == ["e", "c"]
+    # Kısa kelimelerde hata toleransı yok
+    assert _indeks().ara("sit") == []
+
+def test_limit_ve_bos_sorgu():
+    assert _indeks().ara("sut", limit=1) == ["a"]
+    assert _indeks().ara("  ") == []
+    assert AramaIndeksi([]).ara("sut") == []
+
+def test_dizilerden_ayni_sonuc():
+    # Anlık görüntüden yüklenen indeks yeniden kurulan ile aynı sonucu verir
+    indeks = _indeks()
+    yuklenen = AramaIndeksi.dizilerden(indeks.diziler(), list(ADLAR))
+    for sorgu in ["sut", "cikolta", "ayran 200", "yarim"]:
+        assert yuklenen.ara(sorgu) == indeks.ara(sorgu)
@@ -0,0 +1,42 @@
+import math
+
+import pandas as pd
+import pytest
+
+from migros_birim import birimleri_coz, birim_fiyati_hesapla
+
+@pytest.mark.parametrize("ad, miktar, birim", [
+    ("Toz Şeker 1.000 Gr", 1.0, "KG"),
+    ("Peynir 1.500 Gr", 1.5, "KG"),
+    ("Sırma Su 1,5 L", 1.5, "L"),
+    ("Süt 0.750 L", 0.75, "L"),
+    ("Kola 2.5 Lt", 2.5, "L"),
+    ("Ayran 6x200 ml", 1.2, "L"),
+    ("Un 2x1.000 Gr", 2.0, "KG"),
+    ("Doğadan Çay 20'li", 20.0, "ADET"),
+    ("Uno Ekmek 500 Gr", 0.5, "KG"),
+    # Sondaki çoklu paket miktarla çarpılır
+    ("Su 330 Ml 6'lı", 1.98, "L"),
+    ("Sırma Su 1,5 L 6 LI", 9.0, "L"),
+    ("Ayran 200 ml x 6", 1.2, "L"),
+    # Kesme işaretsiz adet ekleri
+    ("Yumurta 32 li", 32.0, "ADET"),
+    ("Su Bardağı 6 lı", 6.0, "ADET"),
+    ("Peçete 100 lu", 100.0, "ADET"),
+    ("Kalem 3 lü", 3.0, "ADET"),
+])
+def test_miktar_ve_birim(ad, miktar, birim):
+    sonuc = birimleri_coz([ad]).iloc[0]
+    assert math.isclose(sonuc["Miktar"], miktar)
+    assert sonuc["Birim"] == birim
+
+def test_cozulemeyen_ad():
+    sonuc = birimleri_coz(["Hediye Kartı", "Domates 0 Gr"])
+    assert sonuc["Miktar"].isna().all()
+    assert sonuc["Birim"].isna().all()
+
+def test_binlik_gruplu_birim_fiyat():
+    df = pd.DataFrame({"Ürün Adı": ["Toz Şeker 1.000 Gr", "Su 1,5 L"], "Satış Fiyatı": [40.0, 15.0]})
+    sonuc = birim_fiyati_hesapla(df)
+    assert sonuc["Birim Fiyat"].tolist() == pytest.approx([40.0, 10.0])
+    assert sonuc["Birim"].tolist() == ["KG", "L"]
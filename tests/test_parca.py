@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from migros_depo import KOLONLAR, ParquetDepo, satirlari_cerceveye
+from migros_parca import IsKuyrugu, birlestir
+
+def _satirlar(tarih, adet, kimlik=True):
+    satirlar = []
+    for i in range(adet):
+        satir = dict.fromkeys(KOLONLAR, "")
+        satir.update({"Tarih": tarih, "Ürün Adı": f"Ürün {i}", "Etiket Fiyatı": 10.0, "Satış Fiyatı": 10.0,
+                      "İndirim %": 0, "Birim Fiyat": 0, "Kategori": "meyve-sebze-c-2", "Durum": "Aktif",
+                      "Stok": "Var", "Link": f"https://www.migros.com.tr/urun-{i}-p-{i:x}",
+                      "Ürün ID": f"{i:x}" if kimlik else ""})
+        satirlar.append([satir[k] for k in KOLONLAR])
+    return satirlar
+
+def _kuyruk(tmp_path, *parcalar):
+    kuyruk = IsKuyrugu.olustur("t1", datetime(2026, 10, 2, 10), ["meyve-sebze-c-2"], kok=str(tmp_path / "parcalar"))
+    for i, satirlar in enumerate(parcalar):
+        if i: kuyruk.ekle("meyve-sebze-c-2", 1 + 10 * i, None)
+        ad, _ = kuyruk.al()
+        kuyruk.bitir(ad, satirlari_cerceveye(satirlar))
+    return kuyruk
+
+def test_kimliksiz_urunler_tek_satira_inmez(tmp_path):
+    # Kimliği boş gelen ürünler linkteki koddan ayırt edilir
+    kuyruk = _kuyruk(tmp_path, _satirlar("2026-10-02 10:00:00", 5, kimlik=False))
+    df, _ = birlestir(kuyruk, ParquetDepo(str(tmp_path / "veri")))
+    assert sorted(df["Ürün ID"]) == [f"{i:x}" for i in range(5)]
+
+def test_iki_kez_taranan_birim_tekrar_yazilmaz(tmp_path):
+    # Zaman aşımıyla iki işçinin taradığı sayfalar: ürün kategori başına bir kez yazılır
+    satirlar = _satirlar("2026-10-02 10:00:00", 5)
+    df, _ = birlestir(_kuyruk(tmp_path, satirlar, satirlar), ParquetDepo(str(tmp_path / "veri")))
+    assert len(df) == 5
@@ -0,0 +1,81 @@
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import migros_scraper as ms
+from migros_depo import ParquetDepo
+from migros_seri import SeriDeposu
+
+def _seriler(api):
+    # Toplamlar önceden kurulmuş olsun; yoksa ilk tarama tüm geçmişten kurar ve gün takibi sınanmış olmaz
+    seriler = SeriDeposu(ParquetDepo(api.depo_dizini))
+    seriler.kur()
+    return seriler
+
+def _seri_gunleri(seriler):
+    gunluk = seriler._oku("gunluk", "2026-10")
+    return sorted(pd.to_datetime(gunluk["Dönem"]).dt.strftime("%Y-%m-%d").unique())
+
+def _kontrol(api):
+    with open(os.path.join(api.depo_dizini, "tarama_kontrol.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def test_hatayla_kesilen_taramanin_gunleri_guncellenir(api):
+    # İlk kategori yazıldıktan sonra tarama hatayla kesilse de yazılan günün toplamları güncellenir
+    seriler = _seriler(api)
+
+    def ilerleme(kat, adet): raise RuntimeError("kesildi")
+
+    with pytest.raises(RuntimeError):
+        ms.calistir(eszamanli=1, ilerleme=ilerleme, parti_boyutu=1)
+    assert _seri_gunleri(seriler) == ["2026-10-01"]
+    assert _kontrol(api)["seri_bekleyen"] == []
+
+def test_guncellenemeyen_gunler_devam_eden_taramaya_kalir(api, monkeypatch):
+    # 1 Ekim'deki taramada toplamlar güncellenemez ve bir kategori eksik kalır; 3 Ekim'de devam eden tarama
+    # kendi gününün yanında 1 Ekim'i de günceller
+    seriler = _seriler(api)
+    guncelle = SeriDeposu.guncelle
+
+    def bozuk(self, gunler): raise OSError("disk dolu")
+
+    monkeypatch.setattr(SeriDeposu, "guncelle", bozuk)
+    api.hatali.add(("icecek-c-c", 2))
+    ms.calistir(eszamanli=2)
+    assert _kontrol(api)["seri_bekleyen"] == ["2026-10-01"]
+
+    monkeypatch.setattr(SeriDeposu, "guncelle", guncelle)
+    monkeypatch.setattr(ms.datetime, "simdi", datetime(2026, 10, 3, 10, 0))
+    api.hatali.clear()
+    ms.calistir(eszamanli=2, devam=True)
+    assert _seri_gunleri(seriler) == ["2026-10-01", "2026-10-03"]
+    kontrol = _kontrol(api)
+    assert kontrol["durum"] == "tamamlandi" and kontrol["seri_bekleyen"] == []
+
+def test_eszamanli_tarama_tum_sayfalari_bir_kez_ceker(api):
+    # Kategoriler iş parçacıklarında eşzamanlı çekilir; her sayfa bir kez istenir, her ürün bir kez yazılır
+    istatistik = ms.calistir(eszamanli=3)
+    beklenen = {(kat, s) for kat, sayfalar in api.sayfalar.items() for s in range(1, len(sayfalar) + 1)}
+    assert set(api.istekler) == beklenen and set(api.istekler.values()) == {1}
+    assert istatistik["urun"] == api.urun_sayisi() and istatistik["eksik_kategoriler"] == []
+    df = ParquetDepo(api.depo_dizini).oku()
+    assert len(df) == df["Ürün ID"].nunique() == api.urun_sayisi()
+
+def test_devam_yalnizca_eksik_sayfalari_ceker(api):
+    # 2. sayfası 404 dönen kategori eksik kalır; `--devam` yalnızca o sayfadan sonrasını çeker
+    api.hatali.add(("icecek-c-c", 2))
+    istatistik = ms.calistir(eszamanli=3)
+    assert istatistik["eksik_kategoriler"] == ["icecek-c-c"]
+    assert _kontrol(api)["kategoriler"]["icecek-c-c"]["sayfa"] == 1
+
+    api.hatali.clear()
+    api.istekler.clear()
+    istatistik = ms.calistir(eszamanli=3, devam=True)
+    assert istatistik["devam"] and istatistik["eksik_kategoriler"] == []
+    assert set(api.istekler) == {("icecek-c-c", 2), ("icecek-c-c", 3)}
+    assert _kontrol(api)["durum"] == "tamamlandi"
+    df = ParquetDepo(api.depo_dizini).oku()
+    assert df["Ürün ID"].nunique() == api.urun_sayisi()
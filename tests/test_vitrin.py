@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import migros_vitrin
+from migros_arama import AramaIndeksi
+from migros_vitrin import VitrinSorgusu
+
+def _ozet():
+    return pd.DataFrame({
+        "Ürün Adı": ["Pınar Süt 1 L", "İçim Süt 500 Ml", "Sütaş Ayran", "Ülker Gofret", "Elma 1 Kg"],
+        "Kategori": ["sut-c-6", "sut-c-6", "sut-c-6", "atistirmalik-c-113", "meyve-sebze-c-2"],
+        "Satış Fiyatı": [30.0, 20.0, 10.0, 5.0, 25.0],
+        "Önceki Fiyat": [35.0, 20.0, np.nan, 4.0, 30.0],
+        "Fiyat Farkı": [-5.0, 0.0, np.nan, 1.0, -5.0],
+        "İndirim %": [10, 0, 5, 0, 20],
+        "Birim": ["L", "L", "ADET", "ADET", "KG"],
+        "Birim Fiyat": [30.0, 40.0, np.nan, 5.0, 25.0],
+    }, index=pd.Index(["a", "b", "c", "d", "e"], name="Ürün ID"))
+
+def _vitrin(ozet=None):
+    ozet = _ozet() if ozet is None else ozet
+    return VitrinSorgusu(ozet, AramaIndeksi(ozet["Ürün Adı"].tolist(), ozet.index.tolist()))
+
+def _idler(vitrin, **sorgu):
+    return vitrin.ozet.index[vitrin.sorgula(**sorgu)].tolist()
+
+def test_siralamalar():
+    vitrin = _vitrin()
+    assert _idler(vitrin, siralama="akilli")[:3] == ["e", "a", "c"]
+    assert _idler(vitrin, siralama="fiyat_artan") == ["d", "c", "b", "e", "a"]
+    assert _idler(vitrin, siralama="fiyat_azalan") == ["a", "e", "b", "c", "d"]
+    # En iyi fiyat: yaygın birimler önce, birim içinde birim fiyata göre, birim fiyatı bilinmeyen sonda
+    assert _idler(vitrin, siralama="en_iyi") == ["d", "a", "b", "e", "c"]
+
+def test_filtreler_ve_kategori():
+    vitrin = _vitrin()
+    assert _idler(vitrin, filtre="dusen", siralama="fiyat_artan") == ["e", "a"]
+    assert _idler(vitrin, filtre="artan") == ["d"]
+    assert _idler(vitrin, kategori="sut-c-6", siralama="fiyat_azalan") == ["a", "b", "c"]
+    assert _idler(vitrin, kategori="yok-c-0") == []
+
+def test_arama_filtreyle_birlesir():
+    vitrin = _vitrin()
+    # Aramada varsayılan sıra alaka düzeyidir (tam kelime, sonra kısa ad)
+    assert _idler(vitrin, arama="süt") == ["a", "b", "c"]
+    assert _idler(vitrin, arama="süt", siralama="fiyat_artan") == ["c", "b", "a"]
+    assert _idler(vitrin, arama="süt", filtre="dusen") == ["a"]
+    assert _idler(vitrin, arama="süt", kategori="meyve-sebze-c-2") == []
+    assert _idler(VitrinSorgusu(vitrin.ozet), arama="süt") == []
+
+def test_sorgu_hatirasi(monkeypatch):
+    monkeypatch.setattr(migros_vitrin, "HATIRA_BOYUTU", 2)
+    vitrin = _vitrin()
+    ilk = vitrin.sorgula(arama="süt")
+    # Aynı parametreler (boşluklar dahil) hatıradan, salt okunur dizi olarak döner
+    assert vitrin.sorgula(arama="  süt ") is ilk
+    assert not ilk.flags.writeable
+    with pytest.raises(ValueError):
+        ilk[0] = 0
+    vitrin.sorgula(filtre="dusen")
+    vitrin.sorgula(filtre="artan")
+    # En eski sorgu hatıradan düşer; yeniden hesaplanan sonuç aynıdır
+    assert len(vitrin._hatira) == 2
+    yeniden = vitrin.sorgula(arama="süt")
+    assert yeniden is not ilk and yeniden.tolist() == ilk.tolist()
+
+def test_sayfalama():
+    vitrin = _vitrin()
+    konumlar = vitrin.sorgula(siralama="fiyat_artan")
+    assert vitrin.sayfa(konumlar, 0, 2).index.tolist() == ["d", "c"]
+    assert vitrin.sayfa(konumlar, 2, 2).index.tolist() == ["a"]
+    assert vitrin.sayfa(konumlar, 3, 2).empty
+
+def test_dizilerden_ayni_sonuc():
+    # Anlık görüntüden yüklenen diziler yeniden hesaplananlarla aynı sonuçları verir
+    vitrin = _vitrin()
+    yuklenen = VitrinSorgusu(vitrin.ozet, vitrin.arama_indeksi, diziler=vitrin.diziler())
+    for sorgu in [{}, {"siralama": "en_iyi"}, {"filtre": "dusen"}, {"kategori": "sut-c-6"}, {"arama": "süt"}]:
+        assert yuklenen.sorgula(**sorgu).tolist() == vitrin.sorgula(**sorgu).tolist()
+
+def test_bos_ozet():
+    vitrin = _vitrin(_ozet().iloc[:0])
+    assert vitrin.kategoriler == []
+    assert _idler(vitrin, siralama="en_iyi") == []
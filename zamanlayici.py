@@ -0,0 +1,193 @@
+from datetime import datetime
+import argparse
+import json
+import os
+import subprocess
+import sys
+import uuid
+from contextlib import contextmanager
+
+from migros_depo import DEPO_DIZINI
+import migros_olcum as olcum
+
+try:
+    import fcntl
+except ImportError:  # Windows: kilit dosyası varlığına göre çalışır
+    fcntl = None
+
+# --- ZAMANLAYICI AYARLARI ---
+# Standart 5 alanlı cron ifadesi (dakika saat gün ay haftanın-günü)
+TARAMA_CRON = os.environ.get("MIGROS_TARAMA_CRON", "0 */6 * * *")
+DURUM_DOSYASI = os.path.join(DEPO_DIZINI, "tarama_durumu.json")
+KILIT_DOSYASI = os.path.join(DEPO_DIZINI, "tarama.kilit")
+# Panodan arka planda başlatılan taramaların çıktısı (bu boyutu aşınca bir önceki `.1` olarak saklanır)
+GUNLUK_DOSYASI = os.path.join(DEPO_DIZINI, "tarama.log")
+GUNLUK_SINIRI = 5 * 1024 * 1024
+
+class TaramaZatenCalisiyor(Exception):
+    pass
+
+# --- DURUM DOSYASI ---
+def durum_oku():
+    # UI'nin sorguladığı iş durumu; hiç tarama yapılmadıysa boş sözlük döner
+    try:
+        with open(DURUM_DOSYASI, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def durum_yaz(**alanlar):
+    durum = durum_oku()
+    durum.update(alanlar)
+    os.makedirs(os.path.dirname(DURUM_DOSYASI) or ".", exist_ok=True)
+    gecici = f"{DURUM_DOSYASI}.{os.getpid()}.tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        json.dump(durum, f, ensure_ascii=False)
+    os.replace(gecici, DURUM_DOSYASI)
+    return durum
+
+def calisiyor_mu():
+    # Kilide dokunmadan bakar (kilidi deneyerek yoklamak, o an başlayan taramayı atlatırdı): durum dosyasında
+    # "calisiyor" yazan süreç hâlâ yaşıyorsa tarama sürüyordur. Windows'ta kilit dosyasının varlığına bakılır.
+    if fcntl is None: return os.path.exists(KILIT_DOSYASI)
+    durum = durum_oku()
+    if durum.get("durum") != "calisiyor" or not durum.get("pid"): return False
+    try:
+        os.kill(int(durum["pid"]), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # başka kullanıcının süreci
+    return True
+
+# --- TEK ÇALIŞMA KİLİDİ ---
+@contextmanager
+def tarama_kilidi():
+    # Aynı anda yalnızca bir tarama çalışabilir; süreç çökerse işletim sistemi kilidi bırakır
+    os.makedirs(os.path.dirname(KILIT_DOSYASI) or ".", exist_ok=True)
+    if fcntl is None:
+        try:
+            fd = os.open(KILIT_DOSYASI, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            raise TaramaZatenCalisiyor()
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(KILIT_DOSYASI)
+        return
+    f = open(KILIT_DOSYASI, "a")
+    try:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise TaramaZatenCalisiyor()
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    finally:
+        f.close()
+
+# --- İŞ ---
+def tarama_isi(devam=False, parca=None):
+    # Kilidi alır, ilerlemeyi durum dosyasına yazarak bir tam tarama çalıştırır.
+    # `devam=True` yarıda kalan son taramanın yalnızca eksik sayfalarını çeker; `parca` işçi süreç sayısıdır.
+    from migros_scraper import calistir, KATEGORILER
+    try:
+        with tarama_kilidi():
+            tarama_id = uuid.uuid4().hex[:12]
+            urun = 0
+            biten = []
+            durum_yaz(durum="calisiyor", tarama_id=tarama_id, pid=os.getpid(),
+                      baslangic=datetime.now().isoformat(timespec="seconds"), bitis=None, hata=None,
+                      kategori_toplam=len(KATEGORILER), kategori_biten=0, urun=0, son_kategori=None)
+
+            def ilerleme(kategori, adet):
+                nonlocal urun
+                urun += adet
+                biten.append(kategori)
+                durum_yaz(kategori_biten=len(biten), urun=urun, son_kategori=kategori)
+
+            try:
+                istatistik = calistir(ilerleme=ilerleme, devam=devam, tarama_id=tarama_id, parca=parca)
+                # Depo açılamazsa tarama hiç yapılmamıştır; `son_basarili` ilerlememeli
+                if istatistik is None: raise RuntimeError("Depo bağlantısı başarısız")
+            except Exception as e:
+                durum_yaz(durum="hata", hata=str(e), bitis=datetime.now().isoformat(timespec="seconds"))
+                olcum.say("migros_tarama_hata_toplam", aciklama="Hatayla biten tarama sayısı")
+                olcum.olay("tarama_hatasi", tarama_id=tarama_id, hata=str(e))
+                olcum.metrikleri_yaz("tarama")
+                raise
+            bitis = datetime.now().isoformat(timespec="seconds")
+            tarama_id = istatistik.get("tarama_id", tarama_id)
+            anlik_goruntu_yaz(bitis)
+            # `son_basarili` panonun veri sürümüdür; değişince önbellekler yenilenir
+            durum_yaz(durum="eksik" if istatistik.get("eksik_kategoriler") else "tamamlandi",
+                      bitis=bitis, son_basarili=bitis, tarama_id=tarama_id, son_tarama_id=tarama_id,
+                      urun=istatistik.get("urun", urun), istatistik=istatistik)
+    except TaramaZatenCalisiyor:
+        print("⚠️ Başka bir tarama zaten çalışıyor, bu tetikleme atlandı.")
+
+def anlik_goruntu_yaz(surum):
+    # Pano soğuk başlangıcı için bellek eşlemeli anlık görüntü (sürüm = son_basarili); başarısızsa pano depodan yükler
+    from migros_anlik import ANLIK_AKTIF, anlik_yaz
+    from migros_depo import depo_olustur
+    if not ANLIK_AKTIF: return
+    try:
+        depo = depo_olustur()
+        if depo is not None: anlik_yaz(depo, surum)
+    except Exception as e:
+        print(f"⚠️ Anlık görüntü yazılamadı: {e}")
+        olcum.say("migros_anlik_hata_toplam", aciklama="Okunamayan/yazılamayan anlık görüntü")
+
+def arka_planda_baslat(devam=False):
+    # Taramayı Streamlit sürecinden bağımsız ayrı bir süreçte başlatır
+    # Çıktı durum dosyasının yanındaki günlüğe eklenir; çöken taramanın izi orada kalır
+    if calisiyor_mu(): return False
+    betik = os.path.abspath(__file__)
+    os.makedirs(os.path.dirname(GUNLUK_DOSYASI) or ".", exist_ok=True)
+    try:
+        if os.path.getsize(GUNLUK_DOSYASI) > GUNLUK_SINIRI: os.replace(GUNLUK_DOSYASI, GUNLUK_DOSYASI + ".1")
+    except OSError:
+        pass
+    with open(GUNLUK_DOSYASI, "a", encoding="utf-8") as gunluk:
+        gunluk.write(f"\n=== {datetime.now().isoformat(timespec='seconds')} arka plan taraması{' (devam)' if devam else ''} ===\n")
+        gunluk.flush()
+        subprocess.Popen([sys.executable, "-u", betik, "--simdi"] + (["--devam"] if devam else []), cwd=os.getcwd(),
+                         start_new_session=True, stdout=gunluk, stderr=subprocess.STDOUT)
+    return True
+
+def zamanlayiciyi_baslat(cron=TARAMA_CRON):
+    from apscheduler.schedulers.blocking import BlockingScheduler
+    from apscheduler.triggers.cron import CronTrigger
+    zamanlayici = BlockingScheduler()
+    # max_instances=1 + coalesce: kaçırılan tetiklemeler üst üste binmez
+    zamanlayici.add_job(tarama_isi, CronTrigger.from_crontab(cron), id="tarama",
+                        max_instances=1, coalesce=True, misfire_grace_time=3600)
+    print(f"⏰ Zamanlayıcı başladı ({cron}).")
+    zamanlayici.start()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migros tarama zamanlayıcısı")
+    parser.add_argument("--simdi", action="store_true", help="Tek bir taramayı hemen çalıştır ve çık")
+    parser.add_argument("--devam", "--resume", action="store_true",
+                        help="Yarıda kalan son taramayı kontrol noktasından sürdür (yalnızca eksik sayfalar çekilir)")
+    parser.add_argument("--parca", type=int, default=None,
+                        help="Taramayı bu kadar işçi süreçte parçalı çalıştır (varsayılan: MIGROS_PARCA_ISCI, 0: tek süreç)")
+    parser.add_argument("--metrik-portu", type=int, default=0,
+                        help="Zamanlayıcı çalışırken /metrics uç noktasını bu portta sun (0: kapalı)")
+    parser.add_argument("--cron", default=TARAMA_CRON, help="Cron ifadesi (varsayılan: MIGROS_TARAMA_CRON)")
+    args = parser.parse_args()
+    if args.simdi or args.devam:
+        try:
+            tarama_isi(devam=args.devam, parca=args.parca)
+        except Exception as e:
+            # Taramanın kendisi hatayı zaten yazmış olabilir; kilitten önce ya da tarama bittikten sonra çökerse
+            # (ör. içe aktarma, anlık görüntü) burada yazılır. Başka bir sürecin süren taramasının durumu ezilmez.
+            if durum_oku().get("pid") == os.getpid() or not calisiyor_mu():
+                durum_yaz(durum="hata", hata=f"{type(e).__name__}: {e}", bitis=datetime.now().isoformat(timespec="seconds"))
+            raise
+    else:
+        if args.metrik_portu: olcum.metrik_sunucusu_baslat(args.metrik_portu)
+        zamanlayiciyi_baslat(args.cron)